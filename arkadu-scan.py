@@ -6,14 +6,36 @@ Noah's Ark ⊗ Xanadu for Resurrecting Atlantis
 Excavates media artifacts, documents provenance, maps circulation networks.
 """
 
+import argparse
 import os
-import json
+import sys
 import mimetypes
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict
+from array import array
 import re
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'kern'))
+from walker import Stage, run_stages
+from exclude import NO_EXCLUDES
+from artifact_table import ArtifactTable
+from framed import add_compress_args
+from manifest import ManifestWriter
+
+# Media file extensions by artifact type
+MEDIA_EXTENSIONS = {
+    'images': ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'],
+    'videos': ['.mp4', '.mov', '.avi', '.webm', '.mkv'],
+    'audio': ['.mp3', '.wav', '.ogg', '.m4a']
+}
+
+EXTENSION_TYPES = {
+    ext: artifact_type
+    for artifact_type, extensions in MEDIA_EXTENSIONS.items()
+    for ext in extensions
+}
+
 class MediaArchaeologist:
     """
     A Media Archaeologist [investigates] <media> <artifacts> across <time>
@@ -21,60 +43,68 @@ class MediaArchaeologist:
     
     def __init__(self, root_path):
         self.root = Path(root_path)
+        
+        # Media files live in one compact table and rows holds their row
+        # numbers per type; artifacts builds the records only when read
+        self.table = ArtifactTable(extra=('type', 'animal', 'stratum'))
+        self.rows = {
+            'images': array('i'),
+            'videos': array('i'),
+            'audio': array('i')
+        }
         self.artifacts = {
-            'images': [],
-            'videos': [],
-            'audio': []
+            artifact_type: self.table.records(self.artifact_record, rows)
+            for artifact_type, rows in self.rows.items()
         }
         self.provenance = defaultdict(list)  # file -> used_by mapping
-        self.strata = defaultdict(list)  # animal -> artifacts
+        self.strata = Counter()  # animal -> artifact count
         self.circulation = defaultdict(list)  # html -> media mapping
         
     def excavate(self):
         """[excavate] all <technocultural strata>"""
         print("🔍 EXCAVATING MEDIA STRATA...")
         
-        # Find all media files
-        media_extensions = {
-            'images': ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'],
-            'videos': ['.mp4', '.mov', '.avi', '.webm', '.mkv'],
-            'audio': ['.mp3', '.wav', '.ogg', '.m4a']
-        }
-        
-        for artifact_type, extensions in media_extensions.items():
-            for ext in extensions:
-                files = self.root.rglob(f'*{ext}')
-                for file_path in files:
-                    self.catalog_artifact(file_path, artifact_type)
-        
-        # Find all HTML files and scan for references
-        html_files = self.root.rglob('*.html')
-        for html_file in html_files:
-            self.map_circulation(html_file)
+        # One walk catalogs media and scans HTML for references
+        run_stages(self.root, self.stages(), exclude=NO_EXCLUDES)
         
         print(f"✓ Discovered {len(self.artifacts['images'])} images")
         print(f"✓ Discovered {len(self.artifacts['videos'])} videos")
         print(f"✓ Discovered {len(self.artifacts['audio'])} audio files")
         print(f"✓ Mapped {len(self.circulation)} HTML circulation nodes")
         
-    def catalog_artifact(self, file_path, artifact_type):
+    def stages(self):
+        """Walker stages that feed this archaeologist from a shared walk"""
+        return [MediaStage(self), CirculationStage(self)]
+    
+    def catalog_artifact(self, file_path, artifact_type, stat=None):
         """[document] <artifact> with <metadata>"""
         rel_path = file_path.relative_to(self.root)
-        stat = file_path.stat()
+        stat = stat or file_path.stat()
+        animal = self.infer_animal(rel_path)
         
-        artifact = {
-            'path': str(rel_path),
-            'absolute_path': str(file_path),
-            'size': stat.st_size,
-            'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-            'type': file_path.suffix.upper().strip('.'),
-            'animal': self.infer_animal(rel_path),
-            'stratum': self.infer_stratum(rel_path),
-            'used_by': []
+        row = self.table.add(rel_path.parts, stat.st_size, stat.st_mtime,
+                             type=file_path.suffix.upper().strip('.'), animal=animal,
+                             stratum=self.infer_stratum(rel_path))
+        self.rows[artifact_type].append(row)
+        self.strata[animal] += 1
+    
+    def artifact_record(self, view):
+        """The manifest record of a cataloged artifact"""
+        path = view.path
+        return {
+            'path': path,
+            'absolute_path': str(self.root / path),
+            'size': view.size,
+            'modified': datetime.fromtimestamp(view.mtime).isoformat(),
+            'type': view['type'],
+            'animal': view['animal'],
+            'stratum': view['stratum'],
+            'used_by': self.provenance.get(path, [])
         }
-        
-        self.artifacts[artifact_type].append(artifact)
-        self.strata[artifact['animal']].append(artifact)
+    
+    def is_linked(self, row):
+        """Is this artifact referenced by any HTML file?"""
+        return self.table.path(row) in self.provenance
         
     def infer_animal(self, path):
         """Infer which animal kingdom this artifact belongs to"""
@@ -148,84 +178,70 @@ class MediaArchaeologist:
         except:
             return ref
     
-    def link_provenance(self):
-        """Link provenance data back to artifacts"""
-        all_artifacts = (self.artifacts['images'] + 
-                        self.artifacts['videos'] + 
-                        self.artifacts['audio'])
-        
-        for artifact in all_artifacts:
-            path = artifact['path']
-            if path in self.provenance:
-                artifact['used_by'] = self.provenance[path]
-    
     def analyze_github_strategy(self):
         """Analyze size constraints and recommend GitHub strategy"""
-        all_artifacts = (self.artifacts['images'] + 
-                        self.artifacts['videos'] + 
-                        self.artifacts['audio'])
+        sizes = self.table.size  # every cataloged artifact
         
-        total_size = sum(a['size'] for a in all_artifacts)
-        video_size = sum(a['size'] for a in self.artifacts['videos'])
-        large_files = [a for a in all_artifacts if a['size'] > 100_000_000]
-        very_large_files = [a for a in all_artifacts if a['size'] > 50_000_000]
+        total_size = sum(sizes)
+        video_size = sum(sizes[row] for row in self.rows['videos'])
+        large_files = sum(1 for size in sizes if size > 100_000_000)
+        very_large_files = sum(1 for size in sizes if size > 50_000_000)
         
         analysis = {
             'total_size': total_size,
             'total_size_mb': round(total_size / 1_000_000, 2),
             'video_size_mb': round(video_size / 1_000_000, 2),
-            'total_files': len(all_artifacts),
-            'large_files_over_100mb': len(large_files),
-            'large_files_over_50mb': len(very_large_files),
-            'github_limit_exceeded': len(large_files) > 0,
+            'total_files': len(sizes),
+            'large_files_over_100mb': large_files,
+            'large_files_over_50mb': very_large_files,
+            'github_limit_exceeded': large_files > 0,
             'recommendation': self.generate_recommendation(total_size, large_files, very_large_files)
         }
         
         return analysis
     
     def generate_recommendation(self, total_size, large_files, very_large_files):
-        """Generate storage strategy recommendation"""
+        """Generate storage strategy recommendation (file counts over 100/50 MB)"""
         if total_size < 100_000_000:  # < 100 MB
             return "PROJECT_SMALL: Safe to push all media to GitHub"
         elif total_size < 1_000_000_000 and not large_files:  # < 1 GB, no huge files
             return "USE_GIT_LFS: Use Git LFS for videos, keep images in repo"
-        elif len(large_files) > 0:
+        elif large_files > 0:
             return "EXTERNAL_REQUIRED: Files >100MB detected. Must use external hosting or split files"
         else:
             return "HYBRID_APPROACH: Keep selective media in Git, host full collection externally"
     
-    def export_manifest(self, output_path='media-manifest.json'):
-        """Export complete manifest as JSON"""
-        self.link_provenance()
-        
-        manifest = {
-            'generated': datetime.now().isoformat(),
-            'project': 'Resurrecting Atlantis - ARKADU Scan',
-            'artifacts': self.artifacts,
-            'strata': {k: len(v) for k, v in self.strata.items()},
-            'circulation': dict(self.circulation),
-            'provenance': dict(self.provenance),
-            'github_analysis': self.analyze_github_strategy(),
-            'stats': {
+    def export_manifest(self, output_path='media-manifest.json', compression=None, indent=2):
+        """
+        Stream the complete manifest to JSON section by section (see
+        kern/manifest.py); indent=None skips pretty-printing. Returns the
+        path written (framed .gz/.zst with compression).
+        """
+        with ManifestWriter(self.root / output_path, indent, compression) as writer:
+            writer.field('generated', datetime.now().isoformat())
+            writer.field('project', 'Resurrecting Atlantis - ARKADU Scan')
+            writer.begin_object('artifacts')
+            for artifact_type, records in self.artifacts.items():
+                writer.array(artifact_type, records)
+            writer.end()
+            writer.field('strata', dict(self.strata))
+            writer.mapping('circulation', self.circulation.items())
+            writer.mapping('provenance', self.provenance.items())
+            writer.field('github_analysis', self.analyze_github_strategy())
+            writer.field('stats', {
                 'total_images': len(self.artifacts['images']),
                 'total_videos': len(self.artifacts['videos']),
                 'total_audio': len(self.artifacts['audio']),
                 'html_files': len(self.circulation),
-                'orphaned_artifacts': len([a for artifacts in self.artifacts.values() 
-                                          for a in artifacts if not a.get('used_by')])
-            }
-        }
-        
-        output_file = self.root / output_path
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(manifest, f, indent=2)
+                'orphaned_artifacts': sum(1 for row in range(len(self.table))
+                                          if not self.is_linked(row))
+            })
         
-        print(f"\n💾 Manifest exported to: {output_file}")
-        return manifest
+        print(f"\n💾 Manifest exported to: {writer.path}")
+        return writer.path
     
     def print_report(self):
         """Print excavation report to console"""
-        self.link_provenance()
         analysis = self.analyze_github_strategy()
         
         print("\n" + "="*70)
@@ -240,15 +256,13 @@ class MediaArchaeologist:
         print(f"  HTML Files:   {len(self.circulation)}")
         
         print(f"\n🦁 ANIMAL KINGDOMS (Strata)")
-        for animal, artifacts in sorted(self.strata.items(), key=lambda x: len(x[1]), reverse=True):
-            if artifacts:
-                print(f"  {animal:15} → {len(artifacts)} artifacts")
+        for animal, count in sorted(self.strata.items(), key=lambda x: x[1], reverse=True):
+            if count:
+                print(f"  {animal:15} → {count} artifacts")
         
         print(f"\n🔗 PROVENANCE")
-        linked = len([a for artifacts in self.artifacts.values() 
-                     for a in artifacts if a.get('used_by')])
-        orphaned = len([a for artifacts in self.artifacts.values() 
-                       for a in artifacts if not a.get('used_by')])
+        linked = sum(1 for row in range(len(self.table)) if self.is_linked(row))
+        orphaned = len(self.table) - linked
         print(f"  Linked artifacts:    {linked}")
         print(f"  Orphaned artifacts:  {orphaned}")
         
@@ -262,17 +276,44 @@ class MediaArchaeologist:
         print("\n" + "="*70)
 
 
-if __name__ == '__main__':
-    import sys
+class MediaStage(Stage):
+    """[catalog] <media> as the walker passes it"""
+    
+    def __init__(self, archaeologist):
+        self.archaeologist = archaeologist
     
-    root_dir = sys.argv[1] if len(sys.argv) > 1 else '.'
+    def on_file(self, entry):
+        artifact_type = EXTENSION_TYPES.get(entry.suffix)
+        if artifact_type:
+            self.archaeologist.catalog_artifact(Path(entry.path), artifact_type, entry.stat)
+
+
+class CirculationStage(Stage):
+    """[map] <circulation> from each HTML file the walker passes"""
+    
+    def __init__(self, archaeologist):
+        self.archaeologist = archaeologist
+    
+    def on_file(self, entry):
+        if entry.suffix == '.html':
+            self.archaeologist.map_circulation(Path(entry.path))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ARKADU media archaeology scan')
+    parser.add_argument('root', nargs='?', default='.', help='archive root to excavate')
+    parser.add_argument('--compact', action='store_true',
+                        help='write the manifest without pretty-printing')
+    add_compress_args(parser)
+    args = parser.parse_args()
     
     print("🏛️  ARKADU — Media Archaeology Engine")
     print("    Noah's Ark ⊗ Xanadu\n")
     
-    archaeologist = MediaArchaeologist(root_dir)
+    archaeologist = MediaArchaeologist(args.root)
     archaeologist.excavate()
     archaeologist.print_report()
-    archaeologist.export_manifest()
+    archaeologist.export_manifest(compression=args.compress,
+                                  indent=None if args.compact else 2)
     
     print("\n✓ Excavation complete. Review media-manifest.json for full details.")
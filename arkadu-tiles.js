@@ -0,0 +1,32 @@
+// ARKADU tile loader for the viewers
+// Reads sys/tiles/ (written by kern/tiles.py, fused_scan.py --tiles): index.json
+// holds the kingdoms and their rollups; a child with .node is split further and
+// its node is fetched on demand, a child with .shard is one JSONL file holding
+// the records of its whole subtree. Every tile but index.json is named by its
+// content hash, so it is requested from the network at most once.
+const ArkaduTiles={
+base:'/sys/tiles/',
+tiles:new Map(),
+get(name,parse){
+if(!this.tiles.has(name)){
+const p=fetch(this.base+name,{cache:name==='index.json'?'no-cache':'force-cache'})
+.then(r=>{if(!r.ok)throw new Error(`${this.base}${name}: HTTP ${r.status}`);return r.text();})
+.then(parse);
+p.catch(()=>this.tiles.delete(name));
+this.tiles.set(name,p);
+}
+return this.tiles.get(name);
+},
+index(){return this.get('index.json',JSON.parse);},
+node(name){return this.get(name,JSON.parse);},
+shard(name){return this.get(name,t=>t.split('\n').filter(l=>l.trim()).map(l=>JSON.parse(l)));},
+// Records directly in a split chamber (node.files)
+async files(node){return (await Promise.all(node.files.map(n=>this.shard(n)))).flat();},
+// Every record below a node or a child summary; only for viewers that really need them all
+async records(t){
+if(t.shard)return this.shard(t.shard);
+const node=t.node?await this.node(t.node):t;
+const parts=await Promise.all([this.files(node),...node.children.map(c=>this.records(c))]);
+return parts.flat();
+}
+};
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+ARKADU Columnar Benchmark
+Load time and peak RSS for primitive records as JSONL vs Parquet.
+
+The records of sys/primitive.jsonl are repeated (with renamed files) up to
+--records, written as JSONL and, via kern/columnar.py, as Parquet. Each
+reader then runs in its own interpreter so its peak RSS is its own:
+
+  jsonl             every line json.loads'ed into a list (what the tools do now)
+  parquet           read_records(): full records, same shape as the JSONL
+  parquet-project   read_records(path, ['path', 'size', 'ext']) (scale-verify)
+  parquet-columns   read_columns(path, ['size', 'ext']): plain value lists
+
+Peak MB is measured above the interpreter's RSS after its imports.
+
+Usage:
+  python3 ARKADU/bench/columnar.py --records 1000000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'kern'))
+from columnar import export_jsonl, read_columns, read_records
+
+SYS_DIR = Path(__file__).resolve().parent.parent / 'sys'
+
+READERS = ['jsonl', 'parquet', 'parquet-project', 'parquet-columns']
+
+
+def rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def write_records(template_path, out_path, n):
+    """Repeat the template records, renaming files, until there are n."""
+    with open(template_path) as f:
+        templates = [json.loads(line) for line in f if line.strip()]
+    written = 0
+    with open(out_path, 'w') as out:
+        copy = 0
+        while written < n:
+            for record in templates[:n - written]:
+                if copy:
+                    record = dict(record)
+                    stem, dot, ext = record['path'].rpartition('.')
+                    record['path'] = f"{stem}_{copy}{dot}{ext}" if dot else f"{ext}_{copy}"
+                    record['name'] = os.path.basename(record['path'])
+                out.write(json.dumps(record) + '\n')
+            written += min(len(templates), n - written)
+            copy += 1
+    return written
+
+
+def load(reader, jsonl_path, parquet_path):
+    """Run one reader; returns the number of records it loaded."""
+    if reader == 'jsonl':
+        with open(jsonl_path) as f:
+            return len([json.loads(line) for line in f])
+    if reader == 'parquet':
+        return len(list(read_records(parquet_path)))
+    if reader == 'parquet-project':
+        return len(list(read_records(parquet_path, ['path', 'size', 'ext'])))
+    if reader == 'parquet-columns':
+        return len(read_columns(parquet_path, ['size', 'ext'])['size'])
+    raise ValueError(f'unknown reader {reader}')
+
+
+def child_main(reader, jsonl_path, parquet_path):
+    before = rss_mb()
+    start = time.perf_counter()
+    count = load(reader, jsonl_path, parquet_path)
+    seconds = time.perf_counter() - start
+    print(json.dumps({'seconds': seconds, 'peak_mb': rss_mb() - before, 'records': count}))
+
+
+def spawn(reader, jsonl_path, parquet_path):
+    cmd = [sys.executable, str(Path(__file__).resolve()), '--child', reader,
+           '--jsonl', str(jsonl_path), '--parquet', str(parquet_path)]
+    completed = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSONL vs Parquet load time and memory')
+    parser.add_argument('--records', type=int, default=1_000_000, help='primitive records')
+    parser.add_argument('--template', type=Path, default=SYS_DIR / 'primitive.jsonl',
+                        help='primitive.jsonl whose records are repeated')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per reader; the fastest is reported (default: 3)')
+    parser.add_argument('--child', choices=READERS, help=argparse.SUPPRESS)
+    parser.add_argument('--jsonl', help=argparse.SUPPRESS)
+    parser.add_argument('--parquet', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args.child, args.jsonl, args.parquet)
+        return
+
+    with tempfile.TemporaryDirectory(prefix='arkadu-columnar-') as tmp:
+        jsonl_path = Path(tmp) / 'primitive.jsonl'
+        parquet_path = Path(tmp) / 'primitive.parquet'
+        n = write_records(args.template, jsonl_path, args.records)
+        start = time.perf_counter()
+        export_jsonl(jsonl_path, parquet_path, 'primitive')
+        export_seconds = time.perf_counter() - start
+
+        print("ARKADU Columnar Benchmark")
+        print("=" * 60)
+        print(f"{n:,} records: JSONL {jsonl_path.stat().st_size / 1024 / 1024:.1f} MB, "
+              f"Parquet {parquet_path.stat().st_size / 1024 / 1024:.1f} MB "
+              f"(export {export_seconds:.1f}s)")
+        print("-" * 60)
+        print(f"{'reader':18s} {'seconds':>8s} {'peak MB':>8s} {'vs jsonl':>9s}")
+
+        baseline = None
+        for reader in READERS:
+            runs = [spawn(reader, jsonl_path, parquet_path) for _ in range(max(1, args.repeat))]
+            result = min(runs, key=lambda run: run['seconds'])
+            if result['records'] != n:
+                raise RuntimeError(f"{reader} loaded {result['records']} of {n} records")
+            baseline = baseline or result['seconds']
+            print(f"{reader:18s} {result['seconds']:8.2f} {result['peak_mb']:8.1f} "
+                  f"{baseline / result['seconds']:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+ARKADU Compression Benchmark
+Size and throughput of plain vs framed gzip/zstd output (kern/framed.py).
+
+Two inputs, built from sys/primitive.jsonl repeated up to --records:
+  jsonl   one record per line, like sys/*.jsonl
+  json    the same records as one indent=2 document, like deep/*.json
+
+For each format it reports:
+  write     FramedWriter (plain: open().write) throughput, uncompressed MB/s
+  size      bytes on disk and ratio to plain
+  stream    one sequential decompressing pass (gzip.open / zstd stream_reader)
+  blocks    FramedReader.blocks() with 1 thread, then with --workers threads
+
+Throughput is uncompressed MB per second, best of --repeat runs.
+
+Usage:
+  python3 ARKADU/bench/compression.py --records 1000000 --workers 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'kern'))
+from framed import COMPRESSIONS, FramedReader, framed_path, open_binary, open_output, zstandard
+
+SYS_DIR = Path(__file__).resolve().parent.parent / 'sys'
+
+
+def make_inputs(template_path, n):
+    """(jsonl text, json text) of n records repeated from the template."""
+    with open(template_path) as f:
+        templates = [json.loads(line) for line in f if line.strip()]
+    records = []
+    copy = 0
+    while len(records) < n:
+        for record in templates[:n - len(records)]:
+            if copy:
+                record = dict(record, path=f"{record['path']}_{copy}")
+            records.append(record)
+        copy += 1
+    jsonl = ''.join(json.dumps(record) + '\n' for record in records)
+    return jsonl, json.dumps(records, indent=2)
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def write(path, compression, text):
+    # Written in record-sized pieces, as the scanners do
+    with open_output(path, compression) as f:
+        for line in text.splitlines(keepends=True):
+            f.write(line)
+
+
+def stream(path):
+    with open_binary(path) as f:
+        while f.read(1 << 20):
+            pass
+
+
+def blocks(path, workers):
+    for _ in FramedReader(path, workers).blocks():
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Framed compression size and throughput')
+    parser.add_argument('--records', type=int, default=200_000, help='primitive records')
+    parser.add_argument('--template', type=Path, default=SYS_DIR / 'primitive.jsonl',
+                        help='primitive.jsonl whose records are repeated')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='decompression threads for the parallel read (default: CPUs)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per measurement; the fastest is reported (default: 3)')
+    args = parser.parse_args()
+
+    formats = [None] + [c for c in COMPRESSIONS if c != 'zstd' or zstandard is not None]
+    inputs = dict(zip(('jsonl', 'json'), make_inputs(args.template, args.records)))
+
+    print("ARKADU Compression Benchmark")
+    print("=" * 78)
+    print(f"{args.records:,} records, {args.workers} decompression threads "
+          f"({os.cpu_count()} CPUs)")
+    if zstandard is None:
+        print("  (zstandard not installed: zstd skipped)")
+    print("-" * 78)
+    print(f"{'input':6s} {'format':6s} {'MB':>8s} {'ratio':>6s} {'write':>8s} "
+          f"{'stream':>8s} {'blocks':>8s} {'blocks×' + str(args.workers):>9s}   MB/s")
+
+    with tempfile.TemporaryDirectory(prefix='arkadu-compression-') as tmp:
+        for name, text in inputs.items():
+            raw_mb = len(text.encode('utf-8')) / 1024 / 1024
+            for compression in formats:
+                base = Path(tmp) / f'{name}.{name}'
+                path = framed_path(base, compression)
+                write_s = best(lambda: write(base, compression, text), args.repeat)
+                size_mb = os.path.getsize(path) / 1024 / 1024
+                stream_s = best(lambda: stream(path), args.repeat)
+                if compression:
+                    serial_s = best(lambda: blocks(path, 1), args.repeat)
+                    parallel_s = best(lambda: blocks(path, args.workers), args.repeat)
+                    block_cols = f"{raw_mb / serial_s:8.0f} {raw_mb / parallel_s:9.0f}"
+                else:
+                    block_cols = f"{'-':>8s} {'-':>9s}"
+                print(f"{name:6s} {compression or 'plain':6s} {size_mb:8.1f} "
+                      f"{raw_mb / size_mb:5.1f}x {raw_mb / write_s:8.0f} "
+                      f"{raw_mb / stream_s:8.0f} {block_cols}")
+
+
+if __name__ == '__main__':
+    main()
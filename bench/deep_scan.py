@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+ARKADU Deep Scan Benchmark
+Serial vs process-pool analysis of .py and .json files on a synthetic corpus.
+
+File sizes are skewed (a few large files, many small ones) like a real
+archive, which is what the size-balanced chunking is for. Every parallel
+run is checked against the serial result.
+
+Usage:
+  python3 ARKADU/bench/deep_scan.py --py 400 --json 200 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'kern'))
+from deep_scan import scan_files
+
+PY_BLOCK = '''
+import json
+import subprocess
+from pathlib import Path
+
+def render_{n}(shot):
+    """Render shot {n} to video."""
+    frames = Path("CAT/WHISKER/MEDIA/frames_{n}")
+    subprocess.run(["ffmpeg", "-i", str(frames / "%04d.png"), "out_{n}.mp4"])
+    with open("sys/render_{n}.json", "w") as f:
+        json.dump({{"shot": shot, "source": "DOG/PAW/RAW/take_{n}.png"}}, f)
+    return json.load(open("HORSE/MANE/prompts_{n}.json"))
+'''
+
+
+def build_corpus(root, n_py, n_json, seed=7):
+    """Write n_py Python and n_json JSON files with skewed sizes."""
+    rng = random.Random(seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    py_files, json_files = [], []
+
+    for i in range(n_py):
+        blocks = int(rng.paretovariate(1.2) * 5)
+        path = root / f'script_{i:04d}.py'
+        path.write_text('"""Synthetic render script."""\n' +
+                        ''.join(PY_BLOCK.format(n=i * 1000 + b) for b in range(blocks)))
+        py_files.append(path)
+
+    for i in range(n_json):
+        entries = int(rng.paretovariate(1.2) * 50)
+        path = root / f'prompts_{i:04d}.json'
+        path.write_text(json.dumps([
+            {'operativeEkphrasis': f'A cat walks through frame {j} ' * 4,
+             'file': f'CAT/WHISKER/MEDIA/WGY{j:03d}_RI__shot__{i}_{j}.png'}
+            for j in range(entries)
+        ], indent=2))
+        json_files.append(path)
+
+    return py_files, json_files
+
+
+def time_scan(py_files, json_files, workers, blob_dir):
+    start = time.perf_counter()
+    py = scan_files('python', py_files, workers, progress=False, blob_dir=blob_dir)
+    js = scan_files('json', json_files, workers, progress=False, blob_dir=blob_dir)
+    return time.perf_counter() - start, (py, js)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deep scan serial vs --workers')
+    parser.add_argument('--py', type=int, default=400, help='synthetic .py files')
+    parser.add_argument('--json', type=int, default=200, help='synthetic .json files')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='arkadu-deep-') as root:
+        py_files, json_files = build_corpus(root, args.py, args.json)
+        total = sum(p.stat().st_size for p in py_files + json_files)
+
+        print("ARKADU Deep Scan Benchmark")
+        print("=" * 60)
+        print(f"Corpus: {len(py_files)} .py + {len(json_files)} .json files, "
+              f"{total / 1e6:.1f} MB")
+        print("-" * 60)
+        print(f"{'workers':>7s} {'seconds':>9s} {'files/s':>9s} {'speedup':>8s}  result")
+
+        baseline_time, baseline = None, None
+        for workers in args.workers:
+            # A fresh blob store per run, so every run writes all its blobs
+            blob_dir = Path(root) / f'blobs-{workers}'
+            elapsed, result = time_scan(py_files, json_files, workers, blob_dir)
+            if baseline_time is None:
+                baseline_time, baseline = elapsed, result
+            same = 'same' if result == baseline else 'DIFFERS'
+            rate = (len(py_files) + len(json_files)) / elapsed
+            print(f"{workers:7d} {elapsed:9.2f} {rate:9.0f} {baseline_time / elapsed:7.1f}x  {same}")
+
+
+if __name__ == '__main__':
+    main()
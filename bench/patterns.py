@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+ARKADU Pattern Registry Benchmark
+detect_pattern cost per filename as schemas are added.
+
+The registry from kern/patterns.json is extended with synthetic schemas
+(clapper/slideshow style names with their own prefixes) and timed on the
+same synthetic filenames against a plain sequential regex loop. Both must
+give identical results; the registry's cost should stay flat while the
+sequential loop grows with the schema count.
+
+Usage:
+  python3 ARKADU/bench/patterns.py --names 1000000 --schemas 0 4 8 16 32
+"""
+
+import argparse
+import json
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'kern'))
+from patterns import PATTERNS_PATH, UNKNOWN, PatternRegistry, Schema
+
+UUID = '0d5e6f3a-1b2c-4d5e-8f90-a1b2c3d4e5f6'
+
+
+def synthetic_schema(k):
+    """A clapper-style schema with its own literal prefix, e.g. SLB07_0042_take3.mov"""
+    prefix = string.ascii_uppercase[(k * 7) % 26] + string.ascii_uppercase[k // 26 % 26] + f'{k:02d}_'
+    return {
+        'name': f'SYNTH_{k:02d}',
+        'prefix': prefix,
+        'regex': prefix + r'(?P<scene>\d+)_take(?P<take>\d+)'
+    }
+
+
+def synthetic_names(n, max_schemas, seed=11):
+    """Filenames: real CAT/HORSE schemas, synthetic schemas, and misses."""
+    rng = random.Random(seed)
+    names = []
+    for i in range(n):
+        roll = rng.random()
+        if roll < 0.35:
+            names.append(f'WGY{i % 1000:03d}_RI__Memory__POET_and_X_{UUID}_{i % 4}.png')
+        elif roll < 0.45:
+            names.append(f'{i % 99:02d}_SH_OutOfLife_{i:06d}_header_prompt.mp4')
+        elif roll < 0.75:
+            prefix = synthetic_schema(rng.randrange(max_schemas))['prefix'] if max_schemas else 'X_'
+            names.append(f'{prefix}{i % 500:04d}_take{i % 9}.mov')
+        else:
+            names.append(rng.choice(['index.html', 'render.py', 'notes.md', 'frame_0001.png',
+                                     '2025-05-28 clip.mp4', 'WGY_draft.png', '7_up.json']))
+    return names
+
+
+class Sequential:
+    """The old approach: try every schema's regex in order."""
+
+    def __init__(self, specs):
+        self.schemas = [Schema(spec, i) for i, spec in enumerate(specs)]
+
+    def match(self, filename):
+        for schema in self.schemas:
+            m = schema.regex.match(filename)
+            if m is not None:
+                record = {'schema': schema.name}
+                record.update(m.groupdict())
+                return record
+        return dict(UNKNOWN)
+
+
+def time_match(matcher, names):
+    start = time.perf_counter()
+    results = [matcher.match(name) for name in names]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pattern lookup cost vs schema count')
+    parser.add_argument('--names', type=int, default=1_000_000, help='synthetic filenames')
+    parser.add_argument('--schemas', type=int, nargs='+', default=[0, 4, 8, 16, 32],
+                        help='synthetic schemas added to kern/patterns.json')
+    args = parser.parse_args()
+
+    with open(PATTERNS_PATH) as f:
+        base = json.load(f)['schemas']
+    names = synthetic_names(args.names, max(args.schemas))
+
+    print("ARKADU Pattern Registry Benchmark")
+    print("=" * 60)
+    print(f"{len(names)} filenames, {len(base)} configured schemas + synthetic")
+    print("-" * 60)
+    print(f"{'schemas':>7s} {'registry ns':>12s} {'sequential ns':>14s}  result")
+
+    for extra in args.schemas:
+        specs = base + [synthetic_schema(k) for k in range(extra)]
+        registry = PatternRegistry(specs)
+        reg_time, reg_results = time_match(registry, names)
+        seq_time, seq_results = time_match(Sequential(specs), names)
+        same = 'same' if reg_results == seq_results else 'DIFFERS'
+        print(f"{len(specs):7d} {reg_time / len(names) * 1e9:12.0f} "
+              f"{seq_time / len(names) * 1e9:14.0f}  {same}")
+
+    top = ', '.join(f"{name} {n}" for name, n in registry.hits.most_common(4))
+    print("-" * 60)
+    print(f"Hits (last run): {top}, ...")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+ARKADU Benchmark Suite
+Times every scanner stage on a synthetic archive and compares the result
+with stored baselines (bench/baselines.json).
+
+Each stage runs in its own Python subprocess so its peak RSS is its own,
+not the high-water mark of earlier stages. Throughput is reported as
+archive files per second for every stage, so stages are comparable.
+
+Stages (in run order):
+  fused_scan        single-walk scan; also writes the primitive.jsonl used below
+  scan_primitive    kern/primitive_scan.scan_primitive
+  scan_taxonomy     kern/taxonomy_scan.scan_taxonomy
+  ekphrasis_chains  kern/ekphrasis_trace.build_ekphrasis_chains
+  deep_scan         kern/deep_scan.run_deep_scan
+  excavate          arkadu-scan.py MediaArchaeologist.excavate
+  scale_verify      scale-verify.py
+  genoma_sequencer  genoma-sequencer.py
+
+Usage:
+  python3 ARKADU/bench/run.py --files 10000                  # generate, run, compare
+  python3 ARKADU/bench/run.py --archive /data/arkadu-1m      # reuse an existing archive
+  python3 ARKADU/bench/run.py --files 10000 --save-baseline  # record new baselines
+  python3 ARKADU/bench/run.py --files 10000 --check          # exit 1 on regression
+
+Timings are best of --repeat runs; baselines are only comparable on the
+machine that recorded them, so re-record after moving hosts.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ARKADU_DIR = Path(__file__).resolve().parent.parent
+KERN_DIR = ARKADU_DIR / 'kern'
+BASELINES_PATH = Path(__file__).resolve().parent / 'baselines.json'
+
+STAGES = [
+    'fused_scan',
+    'scan_primitive',
+    'scan_taxonomy',
+    'ekphrasis_chains',
+    'deep_scan',
+    'excavate',
+    'scale_verify',
+    'genoma_sequencer',
+]
+
+# Stages that read the primitive.jsonl written by fused_scan
+NEEDS_PRIMITIVE = {'scale_verify', 'genoma_sequencer'}
+
+
+# Child side: run one stage in this process
+
+def load_script(filename):
+    """Import a hyphenated top-level script (scale-verify.py, ...) as a module."""
+    spec = importlib.util.spec_from_file_location(filename.replace('-', '_')[:-3],
+                                                  ARKADU_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_stage(stage, archive, work):
+    """Run one stage; returns the number of items it produced (or None)."""
+    sys.path.insert(0, str(KERN_DIR))
+    primitive = work / 'sys' / 'primitive.jsonl'
+
+    if stage == 'fused_scan':
+        from fused_scan import fused_scan
+        stats, _ = fused_scan(archive, work / 'sys', manifest_path='')
+        return stats.files
+
+    if stage == 'scan_primitive':
+        from primitive_scan import scan_primitive
+        return sum(1 for _ in scan_primitive(archive))
+
+    if stage == 'scan_taxonomy':
+        from taxonomy_scan import scan_taxonomy
+        artifacts, chambers = scan_taxonomy(archive)
+        return len(artifacts)
+
+    if stage == 'ekphrasis_chains':
+        from ekphrasis_trace import build_ekphrasis_chains
+        os.chdir(archive)
+        return len(build_ekphrasis_chains())
+
+    if stage == 'deep_scan':
+        from deep_scan import run_deep_scan
+        os.chdir(archive)
+        # Analyses and blobs go under work, never into the archive; start
+        # empty each run so repeats don't reuse the previous run's blobs
+        out_dir = work / 'deep'
+        shutil.rmtree(out_dir, ignore_errors=True)
+        try:
+            run_deep_scan(out_dir=out_dir)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+        return None
+
+    if stage == 'excavate':
+        archaeologist = load_script('arkadu-scan.py').MediaArchaeologist(archive)
+        archaeologist.excavate()
+        return sum(len(found) for found in archaeologist.artifacts.values())
+
+    if stage == 'scale_verify':
+        load_script('scale-verify.py').main([
+            '--primitive', str(primitive),
+            '--output', str(work / 'sys' / 'scale-verification.json')])
+        return None
+
+    if stage == 'genoma_sequencer':
+        load_script('genoma-sequencer.py').main([
+            '--primitive', str(primitive),
+            '--output', str(work / 'sys' / 'genoma-sequences.json'),
+            '--repo-root', str(archive / 'ARKADU')])
+        return None
+
+    raise ValueError(f'unknown stage {stage}')
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def child_main(stage, archive, work, result_path):
+    """Entry point of the per-stage subprocess: time the stage, report JSON."""
+    archive, work = Path(archive).resolve(), Path(work).resolve()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        items = run_stage(stage, archive, work)
+    seconds = time.perf_counter() - start
+    with open(result_path, 'w') as f:
+        json.dump({'seconds': seconds, 'peak_rss_mb': peak_rss_mb(), 'items': items}, f)
+
+
+# Parent side: orchestrate subprocesses, compare with baselines
+
+def spawn_stage(stage, archive, work):
+    """Run a stage in a fresh interpreter and return its measurements."""
+    result_path = work / f'{stage}.result.json'
+    cmd = [sys.executable, str(Path(__file__).resolve()), '--child', stage,
+           '--archive', str(archive), '--work', str(work), '--result', str(result_path)]
+    completed = subprocess.run(cmd, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f'{stage} failed:\n{completed.stderr}')
+    with open(result_path) as f:
+        return json.load(f)
+
+
+def count_files(archive):
+    sys.path.insert(0, str(KERN_DIR))
+    from walker import walk
+    from exclude import NO_EXCLUDES
+    return sum(1 for entry in walk(archive, exclude=NO_EXCLUDES) if not entry.is_dir)
+
+
+def load_baselines():
+    if not BASELINES_PATH.exists():
+        return {}
+    with open(BASELINES_PATH) as f:
+        return json.load(f)
+
+
+def save_baselines(baselines):
+    with open(BASELINES_PATH, 'w') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(result, baseline, tolerance):
+    """Return (vs-baseline text, regressed?) for one stage."""
+    if baseline is None:
+        return 'no baseline', False
+    speed = result['files_per_sec'] / baseline['files_per_sec']
+    memory = result['peak_rss_mb'] / baseline['peak_rss_mb']
+    regressed = speed < 1 - tolerance or memory > 1 + tolerance
+    flag = 'REGRESSION' if regressed else 'ok'
+    return f'{speed:5.2f}x speed {memory:5.2f}x RSS  {flag}', regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ARKADU per-stage benchmark suite')
+    parser.add_argument('--files', type=int, default=10_000,
+                        help='size of the synthetic archive to generate (default: 10000)')
+    parser.add_argument('--archive', type=Path, help='benchmark an existing archive instead')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per stage; the fastest is reported (default: 3)')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown / RSS growth vs baseline (default: 0.25)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store these results as the baselines for this archive size')
+    parser.add_argument('--check', action='store_true', help='exit 1 if any stage regressed')
+    parser.add_argument('--child', choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument('--work', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args.child, args.archive, args.work, args.result)
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix='arkadu-bench-') as tmp:
+        tmp = Path(tmp)
+        work = tmp / 'work'
+        (work / 'sys').mkdir(parents=True)
+
+        print("ARKADU Benchmark Suite")
+        print("=" * 87)
+        if args.archive:
+            archive = args.archive.resolve()
+        else:
+            archive = tmp / 'archive'
+            generator = load_script('generate-synthetic-archive.py')
+            start = time.perf_counter()
+            generator.generate(archive, args.files, progress=False)
+            print(f"Generated synthetic archive in {time.perf_counter() - start:.1f}s")
+        files = count_files(archive)
+        print(f"Archive: {archive} ({files:,} files)")
+        print("-" * 87)
+        print(f"{'stage':18s} {'seconds':>8s} {'files/s':>10s} {'peak MB':>8s} {'items':>8s}  vs baseline")
+
+        baselines = load_baselines()
+        key = str(files)
+        stored = baselines.get(key, {})
+        results = {}
+        regressions = []
+
+        # scale_verify / genoma need fused_scan's primitive.jsonl
+        if NEEDS_PRIMITIVE & set(args.stages) and 'fused_scan' not in args.stages:
+            spawn_stage('fused_scan', archive, work)
+
+        for stage in [s for s in STAGES if s in args.stages]:
+            runs = [spawn_stage(stage, archive, work) for _ in range(max(1, args.repeat))]
+            result = min(runs, key=lambda run: run['seconds'])
+            result['files_per_sec'] = files / result['seconds']
+            results[stage] = result
+            text, regressed = compare(result, stored.get(stage), args.tolerance)
+            if regressed:
+                regressions.append(stage)
+            items = '-' if result['items'] is None else result['items']
+            print(f"{stage:18s} {result['seconds']:8.2f} {result['files_per_sec']:10.0f} "
+                  f"{result['peak_rss_mb']:8.1f} {items:>8}  {text}")
+
+        print("-" * 87)
+        if args.save_baseline:
+            for stage, result in results.items():
+                stored[stage] = {
+                    'files_per_sec': round(result['files_per_sec'], 1),
+                    'peak_rss_mb': round(result['peak_rss_mb'], 1),
+                }
+            baselines[key] = stored
+            save_baselines(baselines)
+            print(f"Saved baselines for {files:,} files to {BASELINES_PATH}")
+        elif regressions:
+            print(f"Regressed: {', '.join(regressions)} (tolerance {args.tolerance:.0%})")
+        else:
+            print("No regressions" if stored else "No stored baseline for this archive size")
+
+    return 1 if args.check and regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+ARKADU Scale Verification Benchmark
+Time, peak RSS and output size of scale-verify.py on synthetic archives.
+
+For each --files count a primitive.jsonl of minimal records (path, size,
+ext) is generated: 50 files per chamber, chambers spread over kingdoms of
+8 and levels of up to 10 subchambers, extensions cycling through the usual
+media types. scale-verify.py then measures it in its own interpreter, so
+its peak RSS is its own; peak MB is measured above the interpreter's RSS
+after its imports.
+
+Usage:
+  python3 ARKADU/bench/scale_verify.py                        # 1M and 10M files
+  python3 ARKADU/bench/scale_verify.py --files 100000 1000000
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'scale-verify.py'
+
+FILES_PER_CHAMBER = 50
+KINGDOMS = ['CAT', 'DOG', 'HORSE', 'OWL', 'ANT', 'TIGER', 'ELEPHANT', 'LIZARD']
+EXTS = ['.png', '.png', '.jpg', '.mp4', '.png', '.webp', '.mp3', '.wav', '.md', '.txt', '.json']
+
+
+def rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def chamber_path(index):
+    """Chamber number → 'KINGDOM/c3/c7/...' (kingdom, then base-10 digits)"""
+    parts = []
+    index, kingdom = divmod(index, len(KINGDOMS))
+    while index:
+        index, digit = divmod(index, 10)
+        parts.append(f'c{digit}')
+    return '/'.join([KINGDOMS[kingdom]] + parts[::-1])
+
+
+def write_records(out_path, n):
+    with open(out_path, 'w') as out:
+        chamber = None
+        for i in range(n):
+            if i % FILES_PER_CHAMBER == 0:
+                chamber = chamber_path(i // FILES_PER_CHAMBER)
+            ext = EXTS[i % len(EXTS)]
+            record = {'path': f'{chamber}/f{i}{ext}', 'size': (i * 7919) % 5_000_000, 'ext': ext}
+            out.write(json.dumps(record) + '\n')
+
+
+def child_main(primitive_path, output_path):
+    spec = importlib.util.spec_from_file_location('scale_verify', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    before = rss_mb()
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        module.main(['--primitive', primitive_path, '--output', output_path])
+    seconds = time.perf_counter() - start
+    print(json.dumps({'seconds': seconds, 'peak_mb': rss_mb() - before}))
+
+
+def spawn(primitive_path, output_path):
+    cmd = [sys.executable, str(Path(__file__).resolve()), '--child',
+           '--primitive', str(primitive_path), '--output', str(output_path)]
+    completed = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='scale-verify.py time and memory')
+    parser.add_argument('--files', type=int, nargs='+', default=[1_000_000, 10_000_000],
+                        help='archive sizes to measure (default: 1000000 10000000)')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--primitive', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args.primitive, args.output)
+        return
+
+    print("ARKADU Scale Verification Benchmark")
+    print("=" * 60)
+    print(f"{'files':>12s} {'seconds':>8s} {'peak MB':>8s} {'output MB':>10s}")
+    for n in args.files:
+        with tempfile.TemporaryDirectory(prefix='arkadu-scale-') as tmp:
+            primitive_path = Path(tmp) / 'primitive.jsonl'
+            output_path = Path(tmp) / 'scale-verification.json'
+            write_records(primitive_path, n)
+            result = spawn(primitive_path, output_path)
+            print(f"{n:12,d} {result['seconds']:8.1f} {result['peak_mb']:8.1f} "
+                  f"{output_path.stat().st_size / 1024 / 1024:10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+ARKADU Traversal Benchmark
+Throughput of the walker vs --jobs on a local tree with artificial
+per-syscall latency standing in for an SMB/NFS mount.
+
+Every scandir() and stat() sleeps for --latency-ms before doing the real
+call. time.sleep releases the GIL just like a blocking network syscall, so
+the scaling seen here is the scaling a high-latency mount would see.
+
+Usage:
+  python3 ARKADU/bench/traversal.py --dirs 200 --files 20 --latency-ms 1
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'kern'))
+import walker
+
+
+class SlowDirEntry:
+    """DirEntry proxy whose stat() pays the artificial latency."""
+
+    def __init__(self, dirent, latency):
+        self._dirent = dirent
+        self._latency = latency
+        self.name = dirent.name
+        self.path = dirent.path
+
+    def is_dir(self, follow_symlinks=True):
+        return self._dirent.is_dir(follow_symlinks=follow_symlinks)
+
+    def is_file(self, follow_symlinks=True):
+        return self._dirent.is_file(follow_symlinks=follow_symlinks)
+
+    def stat(self, follow_symlinks=True):
+        time.sleep(self._latency)
+        return self._dirent.stat(follow_symlinks=follow_symlinks)
+
+
+class SlowScandir:
+    """os.scandir stand-in: one round trip to open, entries wrapped."""
+
+    def __init__(self, path, latency):
+        time.sleep(latency)
+        self._it = os.scandir(path)
+        self._latency = latency
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._it.close()
+
+    def __iter__(self):
+        for dirent in self._it:
+            yield SlowDirEntry(dirent, self._latency)
+
+
+def install_latency(latency):
+    """Route walker syscalls through the slow stand-ins."""
+    def slow_stat(path, follow_symlinks=True):
+        time.sleep(latency)
+        return os.stat(path, follow_symlinks=follow_symlinks)
+
+    walker._scandir = lambda path: SlowScandir(path, latency)
+    walker._stat = slow_stat
+
+
+def build_tree(root, dirs, files):
+    """kingdom/phylum/class layout with `files` empty files per leaf."""
+    kingdoms = ['CAT', 'DOG', 'HORSE', 'ELEPHANT', 'TIGER']
+    for d in range(dirs):
+        leaf = Path(root, kingdoms[d % len(kingdoms)], f'PHYLUM{d % 7}', f'CLASS{d:04d}')
+        leaf.mkdir(parents=True, exist_ok=True)
+        for i in range(files):
+            (leaf / f'WGY{i:03d}_RI__shot__{d}_{i}.png').touch()
+
+
+def time_walk(root, jobs):
+    start = time.perf_counter()
+    order = [entry.rel for entry in walker.walk(root, jobs=jobs)]
+    return time.perf_counter() - start, order
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Walker throughput vs worker count')
+    parser.add_argument('--dirs', type=int, default=200, help='leaf directories')
+    parser.add_argument('--files', type=int, default=20, help='files per leaf directory')
+    parser.add_argument('--latency-ms', type=float, default=1.0, help='added per scandir/stat')
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='arkadu-walk-') as root:
+        build_tree(root, args.dirs, args.files)
+        install_latency(args.latency_ms / 1000)
+
+        print("ARKADU Traversal Benchmark")
+        print("=" * 60)
+        print(f"Tree: {args.dirs} leaf dirs × {args.files} files, "
+              f"{args.latency_ms} ms per syscall")
+        print("-" * 60)
+        print(f"{'jobs':>5s} {'seconds':>9s} {'entries/s':>11s} {'speedup':>8s}  order")
+
+        baseline_time, baseline_order = None, None
+        for jobs in args.jobs:
+            elapsed, order = time_walk(root, jobs)
+            if baseline_time is None:
+                baseline_time, baseline_order = elapsed, order
+            same = 'same' if order == baseline_order else 'DIFFERS'
+            rate = len(order) / elapsed
+            print(f"{jobs:5d} {elapsed:9.2f} {rate:11.0f} {baseline_time / elapsed:7.1f}x  {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,224 +4,228 @@ Generate deep test data for organic subdivision algorithms.
 Extracts the deepest, densest path through ARKADU for thorough testing.
 """
 
+import argparse
+import heapq
 import json
 import sys
 from pathlib import Path
-from collections import defaultdict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'kern'))
+from framed import resolve
+from hierarchy import load_hierarchy
 
 def load_primitive_data():
-    """Load primitive.jsonl data"""
-    primitive_path = Path('sys/primitive.jsonl')
+    """The shared hierarchy of primitive.jsonl (kern/hierarchy.py), built on first use"""
+    primitive_path = Path(resolve('sys/primitive.jsonl'))
     if not primitive_path.exists():
         print(f"❌ {primitive_path} not found!")
         sys.exit(1)
     
-    items = []
-    with open(primitive_path) as f:
-        for line in f:
-            if line.strip():
-                items.append(json.loads(line))
+    hierarchy = load_hierarchy(primitive_path)
     
-    print(f"✅ Loaded {len(items)} items from primitive.jsonl")
-    return items
+    print(f"✅ Loaded {hierarchy.records} items from primitive.jsonl")
+    return hierarchy
 
-def build_hierarchy(items):
-    """Build hierarchical tree from flat file list"""
-    hierarchy = defaultdict(lambda: {
-        'name': '',
-        'path': '',
-        'depth': 0,
-        'files': [],
-        'children': defaultdict(lambda: None),
-        'totalFiles': 0,
-        'totalBytes': 0
-    })
-    
-    for item in items:
-        path_parts = item['path'].split('/')
-        
-        # Build path incrementally
-        for i in range(len(path_parts)):
-            node_path = '/'.join(path_parts[:i+1])
-            node = hierarchy[node_path]
-            
-            if not node['name']:
-                node['name'] = path_parts[i]
-                node['path'] = node_path
-                node['depth'] = i
-            
-            # If this is a file (last part), add to files
-            if i == len(path_parts) - 1 and not item.get('is_dir', False):
-                node['files'].append(item)
-                node['totalFiles'] += 1
-                node['totalBytes'] += item.get('size', 0)
-            
-            # Link parent to child
-            if i > 0:
-                parent_path = '/'.join(path_parts[:i])
-                parent = hierarchy[parent_path]
-                parent['children'][path_parts[i]] = node_path
-    
-    # Aggregate stats up the tree
-    def aggregate_stats(node_path):
-        node = hierarchy[node_path]
-        total_files = len(node['files'])
-        total_bytes = sum(f.get('size', 0) for f in node['files'])
-        
-        for child_path in node['children'].values():
-            if child_path:
-                cf, cb = aggregate_stats(child_path)
-                total_files += cf
-                total_bytes += cb
-        
-        node['totalFiles'] = total_files
-        node['totalBytes'] = total_bytes
-        return total_files, total_bytes
-    
-    # Find root nodes (depth 0)
-    roots = [p for p, n in hierarchy.items() if n['depth'] == 0]
-    for root in roots:
-        aggregate_stats(root)
-    
-    return hierarchy, roots
+def score_path(hierarchy, node):
+    """Score = depth × file_count × bytes"""
+    depth = hierarchy.depth[node] - 1  # kingdoms are depth 0
+    return depth * hierarchy.files[node] * (hierarchy.bytes[node] / 1024 / 1024)
+
+def path_to(hierarchy, node):
+    """Root-to-node path, following parent pointers"""
+    path = []
+    while node > 0:
+        path.append(node)
+        node = hierarchy.parent[node]
+    return path[::-1]
 
-def find_deepest_densest_path(hierarchy, roots):
+def top_nodes(hierarchy, m, allowed):
+    """
+    The m best-scoring nodes that pass allowed(node), best first, kept in a
+    heap of at most m (a running max for m=1). allowed() is only asked of
+    nodes that score high enough to enter the heap.
+    """
+    heap = []
+    for seq, node in enumerate(hierarchy.post_order()):
+        # -seq: on equal scores the node met first ranks higher
+        entry = (score_path(hierarchy, node), -seq, node)
+        if len(heap) == m and entry <= heap[0]:
+            continue
+        if not allowed(node):
+            continue
+        if len(heap) < m:
+            heapq.heappush(heap, entry)
+        else:
+            heapq.heapreplace(heap, entry)
+    return [node for _, _, node in sorted(heap, reverse=True)]
+
+def find_best_paths(hierarchy, k=1):
+    """
+    The k best distinct paths (by score of the node they end at), best
+    first. Any node may end a path, but no chosen path is a prefix of
+    another: a node above or below one already chosen is skipped. On equal
+    scores the node met first in post-order wins.
+    
+    Paths are picked from a bounded set of the best nodes still free; if
+    picks rule out the rest of the set before k are found, the tree is
+    rescanned for a set twice the size.
+    """
+    chosen = []
+    picked = set()
+    above = set()  # every node on the way to a chosen one
+    
+    def free(node):
+        # Neither a prefix of a chosen path nor running through a chosen node
+        return node not in above and picked.isdisjoint(path_to(hierarchy, node))
+    
+    m = k
+    while len(chosen) < k:
+        candidates = top_nodes(hierarchy, m, free)
+        # Every free node outside the set scores lower, so these picks are
+        # the ones a scan of the whole tree would make
+        for node in candidates:
+            if len(chosen) == k:
+                break
+            if free(node):
+                chosen.append(node)
+                picked.add(node)
+                above.update(path_to(hierarchy, node))
+        if len(candidates) < m:
+            break  # no free node was left out
+        m *= 2
+    
+    return [path_to(hierarchy, node) for node in chosen]
+
+def fixture_root(path, others):
+    """
+    Index in path of the node a fixture is rooted at: the first one none of
+    the others (the better paths) runs through, so fixtures sharing a
+    kingdom still differ. The best path keeps its kingdom as root.
+    """
+    shared = 0
+    for other in others:
+        common = 0
+        while common < min(len(path), len(other)) and path[common] == other[common]:
+            common += 1
+        shared = max(shared, common)
+    return min(shared, len(path) - 1)
+
+def find_deepest_densest_path(hierarchy):
     """Find the path with most depth AND density"""
-    
-    def score_path(node_path):
-        """Score = depth × file_count × bytes"""
-        node = hierarchy[node_path]
-        return node['depth'] * node['totalFiles'] * (node['totalBytes'] / 1024 / 1024)
-    
-    def explore(node_path, current_path=[]):
-        node = hierarchy[node_path]
-        current_path = current_path + [node_path]
-        
-        # Base case: no children
-        if not node['children'] or all(c is None for c in node['children'].values()):
-            return [(current_path, score_path(node_path))]
-        
-        # Recursive case: explore all children
-        paths = []
-        for child_path in node['children'].values():
-            if child_path:
-                paths.extend(explore(child_path, current_path))
-        
-        # Also include this node as a potential endpoint
-        paths.append((current_path, score_path(node_path)))
-        return paths
-    
-    # Explore all roots
-    all_paths = []
-    for root in roots:
-        all_paths.extend(explore(root))
-    
-    # Sort by score
-    all_paths.sort(key=lambda x: x[1], reverse=True)
-    
-    # Return top path
-    if all_paths:
-        best_path, best_score = all_paths[0]
-        return best_path
-    return []
+    best = find_best_paths(hierarchy, 1)
+    return best[0] if best else []
 
-def extract_test_data(hierarchy, path, max_depth=12):
-    """Extract hierarchical test data along path"""
-    
-    def build_node(node_path, current_depth=0):
+def extract_test_data(hierarchy, path, max_depth=12, root=0):
+    """
+    Extract hierarchical test data along path: the subtree of path[root],
+    always keeping the path's own nodes among the children shown.
+    """
+    on_path = set(path)
+    
+    def build_node(node, current_depth=0):
         if current_depth > max_depth:
             return None
         
-        node = hierarchy[node_path]
-        
         # Convert to test data format
         result = {
-            'name': node['name'],
-            'path': node['path'],
+            'name': hierarchy.name_of(node),
+            'path': hierarchy.path(node, '/'),
             'depth': current_depth,
-            'files': node['totalFiles'],
-            'bytes': node['totalBytes'],
-            'mb': round(node['totalBytes'] / 1024 / 1024, 1),
+            'files': hierarchy.files[node],
+            'bytes': hierarchy.bytes[node],
+            'mb': round(hierarchy.bytes[node] / 1024 / 1024, 1),
             'children': []
         }
         
         # Add children (sorted by size, limit to top 15 for reasonable visualization)
-        child_items = []
-        for child_name, child_path in node['children'].items():
-            if child_path:
-                child_node = hierarchy[child_path]
-                child_items.append((child_path, child_node['totalFiles'], child_node['totalBytes']))
+        child_items = list(hierarchy.child_nodes(node))
         
         # Sort by bytes, take top 15
-        child_items.sort(key=lambda x: x[2], reverse=True)
-        child_items = child_items[:15]
+        child_items.sort(key=lambda child: hierarchy.bytes[child], reverse=True)
+        child_items = child_items[:15] + [c for c in child_items[15:] if c in on_path]
         
-        for child_path, _, _ in child_items:
-            child_data = build_node(child_path, current_depth + 1)
+        for child in child_items:
+            child_data = build_node(child, current_depth + 1)
             if child_data:
                 result['children'].append(child_data)
         
         return result
     
-    # Build from root of path
+    # Build from the chosen root of the path
     if not path:
         return None
     
-    root_data = build_node(path[0])
-    return root_data
+    return build_node(path[root])
+
+def print_path(hierarchy, path):
+    print(f"✅ Found path with {len(path)} levels:")
+    for i, node in enumerate(path[:8]):  # Show first 8 levels
+        print(f"  {'  ' * i}→ {hierarchy.name_of(node)} ({hierarchy.files[node]} files, {hierarchy.bytes[node]/1024/1024:.1f} MB)")
+    if len(path) > 8:
+        print(f"  ... and {len(path) - 8} more levels")
+    print()
+
+def count_nodes(node):
+    if not node:
+        return 0
+    return 1 + sum(count_nodes(child) for child in node.get('children', []))
 
 def main():
+    parser = argparse.ArgumentParser(description='Deep test data along the deepest, densest paths')
+    parser.add_argument('--top-k', type=int, default=1,
+                        help='fixtures for the k best paths: sys/deep-test-data.json, '
+                             'then sys/deep-test-data-2.json ... (default: 1)')
+    args = parser.parse_args()
+    
     print("🌋 ARKADU Deep Test Data Generator\n")
     
     # Load data
-    items = load_primitive_data()
+    hierarchy = load_primitive_data()
     
     # Build hierarchy
     print("📊 Building hierarchy...")
-    hierarchy, roots = build_hierarchy(items)
-    print(f"✅ Built hierarchy with {len(hierarchy)} nodes, {len(roots)} roots\n")
+    roots = hierarchy.child_nodes(0)
+    print(f"✅ Built hierarchy with {len(hierarchy) - 1} nodes, {len(roots)} roots\n")
     
-    # Find deepest/densest path
+    # Find deepest/densest paths
     print("🔍 Finding deepest, densest path...")
-    best_path = find_deepest_densest_path(hierarchy, roots)
+    best_paths = find_best_paths(hierarchy, max(1, args.top_k))
     
-    if not best_path:
+    if not best_paths:
         print("❌ No path found!")
         sys.exit(1)
     
-    print(f"✅ Found path with {len(best_path)} levels:")
-    for i, node_path in enumerate(best_path[:8]):  # Show first 8 levels
-        node = hierarchy[node_path]
-        print(f"  {'  ' * i}→ {node['name']} ({node['totalFiles']} files, {node['totalBytes']/1024/1024:.1f} MB)")
-    if len(best_path) > 8:
-        print(f"  ... and {len(best_path) - 8} more levels")
-    print()
-    
-    # Extract test data
-    print("📦 Extracting test data structure...")
-    test_data = extract_test_data(hierarchy, best_path, max_depth=12)
-    
-    # Save to file
-    output_path = Path('sys/deep-test-data.json')
-    with open(output_path, 'w') as f:
-        json.dump(test_data, f, indent=2)
-    
-    print(f"✅ Saved to {output_path}")
-    
-    # Generate summary
-    def count_nodes(node):
-        if not node:
-            return 0
-        return 1 + sum(count_nodes(child) for child in node.get('children', []))
-    
-    total_nodes = count_nodes(test_data)
-    print(f"\n📊 Test Data Summary:")
-    print(f"  • Total nodes: {total_nodes}")
-    print(f"  • Root: {test_data['name']}")
-    print(f"  • Root files: {test_data['files']}")
-    print(f"  • Root size: {test_data['mb']} MB")
-    print(f"  • Max depth: {len(best_path)}")
-    print(f"\n🚀 Ready to test! Load this data in your visualizations.")
+    for rank, best_path in enumerate(best_paths, 1):
+        if len(best_paths) > 1:
+            print(f"#{rank} of {len(best_paths)}")
+        print_path(hierarchy, best_path)
+        
+        # Extract test data
+        print("📦 Extracting test data structure...")
+        test_data = extract_test_data(hierarchy, best_path, max_depth=12,
+                                      root=fixture_root(best_path, best_paths[:rank - 1]))
+        if rank > 1:
+            # Rooted above its path's end, so say where the path leads
+            test_data['target'] = hierarchy.path(best_path[-1], '/')
+        
+        # Save to file
+        output_path = Path('sys/deep-test-data.json' if rank == 1 else f'sys/deep-test-data-{rank}.json')
+        with open(output_path, 'w') as f:
+            json.dump(test_data, f, indent=2)
+        
+        print(f"✅ Saved to {output_path}")
+        
+        # Generate summary
+        total_nodes = count_nodes(test_data)
+        print(f"\n📊 Test Data Summary:")
+        print(f"  • Total nodes: {total_nodes}")
+        print(f"  • Root: {test_data['name']}")
+        print(f"  • Root files: {test_data['files']}")
+        print(f"  • Root size: {test_data['mb']} MB")
+        print(f"  • Max depth: {len(best_path)}")
+        print()
+    
+    print(f"🚀 Ready to test! Load this data in your visualizations.")
 
 if __name__ == '__main__':
     main()
@@ -3,12 +3,15 @@
 Generate intelligent .gitignore based on ARKADU manifest analysis
 """
 
-import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'kern'))
+from manifest import iter_manifest
+
 def load_manifest(path='media-manifest.json'):
-    with open(path, 'r') as f:
-        return json.load(f)
+    """Only the artifacts section; circulation and provenance are never read"""
+    return {'artifacts': dict(iter_manifest(path, 'artifacts'))}
 
 def generate_gitignore(manifest):
     """Generate .gitignore based on artifact analysis"""
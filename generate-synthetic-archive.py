@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic ARKADU archive for benchmarking.
+
+Builds a kingdom/phylum/class tree of configurable size (10k to 10M files)
+that exercises every scanner:
+- CAT_WHISKER and HORSE_HEADER media filenames (pattern detection)
+- other images, video and audio (media catalog, taxonomy)
+- one prompt JSON per class directory (operativeEkphrasis)
+- one render script per class directory referencing the JSON (ekphrasis chains)
+- one HTML page per class directory with media references (circulation)
+
+Media files are sparse: they report realistic sizes but take no disk
+space. The same --files/--seed always produce the same tree.
+
+Usage:
+  python3 ARKADU/generate-synthetic-archive.py /tmp/arkadu-10k --files 10000
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import uuid
+from pathlib import Path
+
+KINGDOMS = ['CAT', 'DOG', 'HORSE', 'ELEPHANT', 'TIGER', 'LIZARD', 'ANT', 'OWL']
+PHYLA = ['WHISKER', 'PAW', 'TAIL', 'MANE', 'HEADER', 'CLAW', 'EYE', 'FANG']
+CLASSES = ['MEDIA', 'RAW', 'RENDERS', 'SLIDESHOWS', 'CLAPPER', 'ARCHIVE']
+
+OPERATORS = ['RI', 'SH', 'AT', 'HT']
+OPERATIONS = ['Memory', 'Departure', 'Longing', 'Storage', 'Retrieval', 'Echo']
+SUBJECTS = ['POET_and_MOTHE', 'CHILD_at_SHORE', 'TWO_FIGURES', 'EMPTY_ROOM']
+TITLES = ['OutOfLife', 'NoticeMe', 'TotalCinome', 'TimeStick']
+PROMPTS = [
+    'A symbolic tableau rendered through chiaroscuro lighting.',
+    'A dimly lit plain bedroom in a high-rise apartment.',
+    'Two figures on an empty shore, seen from far above.',
+    'A hand turns the pages of a water-damaged album.',
+]
+
+# (cumulative share, kind) for media files in a class directory
+MEDIA_MIX = [
+    (0.45, 'cat_whisker'),
+    (0.60, 'horse_header'),
+    (0.85, 'image'),
+    (0.95, 'audio'),
+    (1.00, 'text'),
+]
+
+# Median size and spread (lognormal) per kind
+SIZES = {
+    'cat_whisker': (1_500_000, 0.6),
+    'horse_header': (20_000_000, 1.0),
+    'image': (800_000, 0.8),
+    'audio': (4_000_000, 0.7),
+    'text': (2_000, 1.0),
+}
+
+# prompts JSON, render script and HTML page in every class directory
+FIXED_PER_DIR = 3
+
+
+def names(base, count):
+    """First `count` names from base, numbered once the list runs out."""
+    return [base[i] if i < len(base) else f'{base[i % len(base)]}_{i // len(base):02d}'
+            for i in range(count)]
+
+
+def layout(total_files, per_dir):
+    """Pick kingdom/phylum/class counts so leaves hold about per_dir files."""
+    leaves = max(1, math.ceil(total_files / per_dir))
+    kingdoms = min(len(KINGDOMS), leaves)
+    per_kingdom = math.ceil(leaves / kingdoms)
+    phyla = max(1, math.isqrt(per_kingdom))
+    classes = math.ceil(per_kingdom / phyla)
+    return kingdoms, phyla, classes
+
+
+def media_name(kind, rng, n):
+    if kind == 'cat_whisker':
+        shot_uuid = uuid.UUID(int=rng.getrandbits(128), version=4)
+        return (f'WGY{n:03d}_{rng.choice(OPERATORS)}__{rng.choice(OPERATIONS)}__'
+                f'{rng.choice(SUBJECTS)}_{shot_uuid}_{rng.randrange(4)}.png')
+    if kind == 'horse_header':
+        return f'{n % 100:02d}_{rng.choice(OPERATORS)}_{rng.choice(TITLES)}_{n:06d}_header_prompt.mp4'
+    if kind == 'image':
+        return f'frame_{n:05d}.{rng.choice(["png", "jpg", "webp"])}'
+    if kind == 'audio':
+        return f'take_{n:05d}.{rng.choice(["mp3", "wav"])}'
+    return f'notes_{n:05d}.{rng.choice(["txt", "md"])}'
+
+
+def write_sparse(path, size):
+    """Create a file that reports `size` bytes without allocating them."""
+    with open(path, 'wb') as f:
+        f.truncate(size)
+
+
+def fill_class_dir(class_dir, count, rng, leaf_id):
+    """Write `count` files into one class directory; returns bytes (apparent)."""
+    class_dir.mkdir(parents=True, exist_ok=True)
+    media = []
+    total = 0
+
+    for n in range(max(0, count - FIXED_PER_DIR)):
+        roll = rng.random()
+        kind = next(k for share, k in MEDIA_MIX if roll <= share)
+        name = media_name(kind, rng, n)
+        median, sigma = SIZES[kind]
+        size = int(rng.lognormvariate(math.log(median), sigma))
+        write_sparse(class_dir / name, size)
+        total += size
+        if kind != 'text':
+            media.append(name)
+
+    if count < FIXED_PER_DIR:
+        return total
+
+    prompts_name = f'prompts_{leaf_id:06d}.json'
+    prompts = [
+        {'operativeEkphrasis': rng.choice(PROMPTS), 'shot': i,
+         'file': media[i % len(media)] if media else None}
+        for i in range(rng.randint(5, 40))
+    ]
+    text = json.dumps(prompts, indent=2)
+    (class_dir / prompts_name).write_text(text)
+    total += len(text)
+
+    script = (
+        f'"""Render shots from {prompts_name} into a video."""\n'
+        'import json\n'
+        'import subprocess\n\n'
+        f'PROMPTS = "{prompts_name}"\n\n'
+        'def render():\n'
+        '    shots = json.load(open(PROMPTS))\n'
+        '    subprocess.run(["ffmpeg", "-i", "frame_%05d.png", "-vf", "drawtext=text=shot", "out.mp4"])\n'
+        '    return shots\n'
+    )
+    (class_dir / f'render_{leaf_id:06d}.py').write_text(script)
+    total += len(script)
+
+    refs = []
+    for name in media[:12]:
+        if name.endswith('.mp4'):
+            refs.append(f'  <video src="{name}"></video>')
+        elif name.endswith(('.mp3', '.wav')):
+            refs.append(f'  <audio src="{name}"></audio>')
+        else:
+            refs.append(f'  <img src="{name}">')
+    html = '<!DOCTYPE html>\n<html><body>\n' + '\n'.join(refs) + '\n</body></html>\n'
+    (class_dir / 'index.html').write_text(html)
+    total += len(html)
+
+    return total
+
+
+def generate(root, total_files, per_dir=200, seed=42, progress=True):
+    """Build the archive under root; returns (files, apparent bytes, class dirs)."""
+    rng = random.Random(seed)
+    root = Path(root)
+    n_kingdoms, n_phyla, n_classes = layout(total_files, per_dir)
+
+    written = 0
+    total_bytes = 0
+    leaf_id = 0
+    next_report = 100_000
+    for kingdom in names(KINGDOMS, n_kingdoms):
+        for phylum in names(PHYLA, n_phyla):
+            for class_name in names(CLASSES, n_classes):
+                if written >= total_files:
+                    break
+                count = min(per_dir, total_files - written)
+                total_bytes += fill_class_dir(root / kingdom / phylum / class_name,
+                                              count, rng, leaf_id)
+                written += count
+                leaf_id += 1
+                if progress and written >= next_report:
+                    print(f"  {written:,} files...")
+                    next_report += 100_000
+
+    return written, total_bytes, leaf_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic ARKADU archive')
+    parser.add_argument('root', help='directory to create the archive in')
+    parser.add_argument('--files', type=int, default=10_000, help='total files (default: 10000)')
+    parser.add_argument('--per-dir', type=int, default=200, help='files per class directory')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    if root.exists() and any(root.iterdir()):
+        print(f"❌ {root} is not empty")
+        return 1
+
+    print("🧪 ARKADU Synthetic Archive Generator")
+    print("=" * 60)
+    n_kingdoms, n_phyla, n_classes = layout(args.files, args.per_dir)
+    print(f"📐 {n_kingdoms} kingdoms × {n_phyla} phyla × {n_classes} classes, "
+          f"≤{args.per_dir} files each")
+
+    files, total_bytes, leaves = generate(root, args.files, args.per_dir, args.seed)
+
+    print(f"✅ Wrote {files:,} files in {leaves:,} class directories")
+    print(f"📦 Apparent size {total_bytes / 1024**3:.1f} GB (media files are sparse)")
+    print(f"📍 {root}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,20 +8,21 @@ and generating GENOMA-formatted JSON with codons for each file.
 Theory: Files are genes (codons), species are genomes, the archive is the organism.
 """
 
+import argparse
 import json
 import sys
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
 
-def load_primitive_data(jsonl_path):
-    """Load all file records from primitive.jsonl"""
-    files = []
-    with open(jsonl_path, 'r') as f:
-        for line in f:
-            if line.strip():
-                files.append(json.loads(line))
-    return files
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'kern'))
+from jsonl_reader import JsonlReader
+from framed import add_compress_args, framed_path, open_output, resolve
+from hierarchy import load_hierarchy
+
+def load_primitive_data(jsonl_path, fields=None):
+    """File records from primitive.jsonl, decoded on access (see kern/jsonl_reader.py)"""
+    return JsonlReader(jsonl_path, fields)
 
 def get_codon_type(extension):
     """Map file extension to GENOMA codon type"""
@@ -81,8 +82,8 @@ def is_intron(file_data):
     
     return False
 
-def create_file_codon(file_data, repo_root):
-    """Create a GENOMA codon from file data"""
+def create_file_codon(file_data, repo_root, parts=None):
+    """Create a GENOMA codon from file data (parts: its path components, if known)"""
     ext = file_data.get('ext', '')
     codon_type = get_codon_type(ext)
     
@@ -95,9 +96,9 @@ def create_file_codon(file_data, repo_root):
     phylum = file_data.get('phylum', '')
     class_name = file_data.get('class', '')
     
-    # If empty, try to parse from path
+    # If empty, take them from the hierarchy, or parse the path
     if not kingdom and relative_path:
-        path_parts = Path(relative_path).parts
+        path_parts = parts if parts is not None else Path(relative_path).parts
         if len(path_parts) > 0:
             kingdom = path_parts[0]
         if len(path_parts) > 1:
@@ -137,8 +138,11 @@ def create_file_codon(file_data, repo_root):
         'origin': determine_origin(file_data)
     }
 
-def sequence_species_genome(species_name, files, repo_root):
-    """Create a complete genome sequence for a species (file type)"""
+def sequence_species_genome(species_name, files, repo_root, parts=None):
+    """
+    Create a complete genome sequence for a species (file type); parts
+    holds each file's path components, if known.
+    """
     
     # Calculate species statistics
     total_bytes = sum(f.get('size', 0) for f in files)
@@ -152,7 +156,8 @@ def sequence_species_genome(species_name, files, repo_root):
             break
     
     # Create sequence of codons
-    sequence = [create_file_codon(f, repo_root) for f in files]
+    parts = parts if parts is not None else [None] * len(files)
+    sequence = [create_file_codon(f, repo_root, p) for f, p in zip(files, parts)]
     
     # Sort by depth then path for logical ordering
     sequence.sort(key=lambda c: (c['payload'].get('depth', 0), c['payload'].get('path', '')))
@@ -192,11 +197,21 @@ def create_ekphrasis_genomes(files):
     
     return ekphrasis_genomes
 
-def main():
-    # Paths
-    primitive_path = Path('sys/primitive.jsonl')
-    output_path = Path('sys/genoma-sequences.json')
-    repo_root = Path.cwd()  # ARKADU directory
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='GENOMA sequencer')
+    parser.add_argument('--primitive', type=Path, default=Path('sys/primitive.jsonl'),
+                        help='primitive.jsonl to sequence (default: sys/primitive.jsonl)')
+    parser.add_argument('--output', type=Path, default=Path('sys/genoma-sequences.json'),
+                        help='GENOMA JSON to write (default: sys/genoma-sequences.json)')
+    parser.add_argument('--repo-root', type=Path, default=Path.cwd(),
+                        help='ARKADU directory; paths resolve from its parent (default: cwd)')
+    add_compress_args(parser)
+    args = parser.parse_args(argv)
+    
+    # Paths (primitive.jsonl may have been written as .gz/.zst)
+    primitive_path = Path(resolve(args.primitive))
+    output_path = args.output
+    repo_root = args.repo_root  # ARKADU directory
     
     if not primitive_path.exists():
         print(f"Error: {primitive_path} not found")
@@ -206,23 +221,35 @@ def main():
     print(f"📂 Reading: {primitive_path}")
     print(f"📍 Repository root: {repo_root}")
     
-    # Load all files
+    # Index all files
     files = load_primitive_data(primitive_path)
+    if files.framed:
+        # Every .gz/.zst block holds records of many species, so reading them
+        # by index per species would inflate each block again for every one;
+        # inflate them once, in order, instead
+        files = list(files)
     print(f"📊 Loaded {len(files)} files")
     
-    # Group files by species (extension)
+    # Group file nodes of the shared hierarchy (kern/hierarchy.py) by
+    # species (extension); each species' records are decoded only while
+    # its genome is sequenced
+    hierarchy = load_hierarchy(primitive_path)
     species_groups = defaultdict(list)
-    for f in files:
-        ext = f.get('ext', '.unk')
-        species_groups[ext].append(f)
+    for node in range(len(hierarchy)):
+        if hierarchy.is_file(node):
+            ext = hierarchy.ext_of(node)
+            species_groups['.unk' if ext is None else ext].append(node)
+    total_bytes = hierarchy.bytes[0]
     
     print(f"🧬 Found {len(species_groups)} species")
     
     # Sequence each species genome
     species_genomes = []
-    for ext, species_files in sorted(species_groups.items()):
+    for ext, nodes in sorted(species_groups.items()):
+        species_files = [files[hierarchy.record[node]] for node in nodes]
         species_name = get_codon_type(ext)
-        genome = sequence_species_genome(species_name, species_files, repo_root)
+        genome = sequence_species_genome(species_name, species_files, repo_root,
+                                         [hierarchy.parts(node) for node in nodes])
         species_genomes.append(genome)
         print(f"  ✓ {species_name}: {len(species_files)} instances, {genome['total_bytes'] / 1024 / 1024:.1f} MB")
     
@@ -237,7 +264,7 @@ def main():
             'timestamp': datetime.now().isoformat(),
             'repository_root': str(repo_root.parent),  # Parent of ARKADU
             'total_files': len(files),
-            'total_bytes': sum(f.get('size', 0) for f in files),
+            'total_bytes': total_bytes,
             'total_species': len(species_groups),
             
             'species_genomes': species_genomes,
@@ -254,10 +281,10 @@ def main():
     }
     
     # Write output
-    with open(output_path, 'w') as f:
+    with open_output(output_path, args.compress) as f:
         json.dump(genoma_export, f, indent=2)
     
-    print(f"\n✅ Genome sequences written to: {output_path}")
+    print(f"\n✅ Genome sequences written to: {framed_path(output_path, args.compress)}")
     print(f"📊 Total genome size: {len(json.dumps(genoma_export)) / 1024:.1f} KB")
     print("\n🧬 SEQUENCING COMPLETE")
 
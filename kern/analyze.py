@@ -2,157 +2,327 @@
 """
 ARKADU Analyzer
 Generates insights from scanned data
+
+Every report is an accumulator: it names the fields it needs from each
+input, sees each record once through add(), and prints its section from
+what it kept. run_reports() streams every input file exactly once,
+decoding the union of the fields its reports want, and hands each record
+to all of them, so a new report adds no pass over taxonomy.jsonl. Top-N
+lists are kept in bounded heaps (TopN) rather than sorted at the end.
+
+Records are decoded lazily from the memory-mapped JSONL (see
+jsonl_reader.py), keeping only the fields the reports use. With
+--parquet, taxonomy records come from sys/taxonomy.parquet (see
+columnar.py) instead. With --cube, the species and summary reports
+are read from sys/cube.json (see rollup_cube.py) without touching the
+per-file records. File size quantiles come from the chamber sketches
+in chambers.jsonl (see sketch.py).
 """
 
-import json
+import argparse
+import heapq
 from pathlib import Path
 from collections import defaultdict
 
-def load_jsonl(path):
-    """Load JSONL file into list."""
-    data = []
-    with open(path) as f:
-        for line in f:
-            data.append(json.loads(line))
-    return data
-
-def analyze_chambers():
-    """Analyze chamber distribution."""
-    chambers = load_jsonl('ARKADU/sys/chambers.jsonl')
-    
-    # Group by rank
-    by_rank = defaultdict(list)
-    for c in chambers:
-        by_rank[c['rank']].append(c)
-    
-    # Find largest chambers at each rank
-    print("=" * 60)
-    print("LARGEST CHAMBERS BY RANK")
-    print("=" * 60)
-    
-    for rank in ['kingdom', 'phylum', 'class', 'order']:
-        if rank in by_rank:
-            print(f"\n{rank.upper()} (depth {['kingdom', 'phylum', 'class', 'order'].index(rank) + 1}):")
-            top = sorted(by_rank[rank], key=lambda x: x['total_bytes'], reverse=True)[:5]
-            for c in top:
-                gb = c['total_bytes'] / 1024 / 1024 / 1024
-                print(f"  {c['chamber']:45s} {c['file_count']:5d} files  {gb:6.2f} GB")
-
-def analyze_species():
-    """Analyze species (file types) distribution."""
-    artifacts = load_jsonl('ARKADU/sys/taxonomy.jsonl')
-    
-    # Count by species
-    species_count = defaultdict(int)
-    species_bytes = defaultdict(int)
-    
-    for a in artifacts:
-        species = a['species']
-        species_count[species] += 1
-        species_bytes[species] += a['size']
-    
-    print("\n" + "=" * 60)
-    print("TOP SPECIES (File Types)")
-    print("=" * 60)
-    
-    top_species = sorted(species_bytes.items(), key=lambda x: x[1], reverse=True)[:15]
-    for species, total_bytes in top_species:
-        count = species_count[species]
-        gb = total_bytes / 1024 / 1024 / 1024
-        avg_mb = (total_bytes / count) / 1024 / 1024
-        print(f"{species:10s} {count:6d} files  {gb:8.2f} GB  (avg: {avg_mb:6.1f} MB/file)")
-
-def analyze_ekphrasis():
-    """Analyze operative ekphrasis chains."""
-    chains = load_jsonl('ARKADU/sys/ekphrasis.jsonl')
-    
-    # Find chains with ffmpeg
-    ffmpeg_chains = [c for c in chains if c.get('uses_ffmpeg')]
-    drawtext_chains = [c for c in chains if c.get('uses_drawtext')]
-    
-    # Count unique prompts files
-    unique_prompts = set(c['prompt_file'] for c in chains)
-    unique_scripts = set(c['script'] for c in chains)
-    
-    print("\n" + "=" * 60)
-    print("OPERATIVE EKPHRASIS ECOLOGY")
-    print("=" * 60)
-    print(f"\nTotal chains traced:        {len(chains)}")
-    print(f"Unique prompt files:        {len(unique_prompts)}")
-    print(f"Unique assembly scripts:    {len(unique_scripts)}")
-    print(f"Chains using ffmpeg:        {len(ffmpeg_chains)}")
-    print(f"Chains using drawtext:      {len(drawtext_chains)}")
-    
-    # Show top scripts by chain count
-    script_count = defaultdict(int)
-    for c in chains:
-        script_name = Path(c['script']).name
-        script_count[script_name] += 1
-    
-    print(f"\nTop assembly scripts:")
-    top_scripts = sorted(script_count.items(), key=lambda x: x[1], reverse=True)[:10]
-    for script, count in top_scripts:
-        print(f"  {script:40s} {count:3d} chains")
-
-def analyze_patterns():
-    """Analyze filename patterns."""
-    artifacts = load_jsonl('ARKADU/sys/taxonomy.jsonl')
-    
-    # Count by pattern schema
-    pattern_count = defaultdict(int)
-    for a in artifacts:
-        if 'pattern' in a:
-            schema = a['pattern'].get('schema', 'unknown')
-            pattern_count[schema] += 1
-    
-    print("\n" + "=" * 60)
-    print("FILENAME PATTERNS")
-    print("=" * 60)
-    
-    for schema, count in sorted(pattern_count.items(), key=lambda x: x[1], reverse=True):
-        if count > 5:  # Only show significant patterns
-            print(f"{schema:20s} {count:6d} files")
-
-def generate_summary_stats():
-    """Generate overall summary statistics."""
-    artifacts = load_jsonl('ARKADU/sys/taxonomy.jsonl')
-    chambers = load_jsonl('ARKADU/sys/chambers.jsonl')
-    chains = load_jsonl('ARKADU/sys/ekphrasis.jsonl')
-    
-    total_bytes = sum(a['size'] for a in artifacts)
-    total_gb = total_bytes / 1024 / 1024 / 1024
-    
-    # Count prompts
-    prompt_count = 0
-    for a in artifacts:
-        if 'prompts' in a and a['prompts'].get('has_prompts'):
-            prompt_count += 1
-    
-    print("\n" + "=" * 60)
-    print("ARKADU OS - SYSTEM SUMMARY")
-    print("=" * 60)
-    print(f"""
-Total artifacts:           {len(artifacts):,}
-Total chambers:            {len(chambers):,}
+from jsonl_reader import JsonlReader
+from sketch import QUANTILES, merge_sketches, sketches_from_json
+
+# Set from --parquet and --cube
+USE_PARQUET = False
+CUBE = None
+
+SOURCES = {
+    'taxonomy': 'ARKADU/sys/taxonomy.jsonl',
+    'chambers': 'ARKADU/sys/chambers.jsonl',
+    'ekphrasis': 'ARKADU/sys/ekphrasis.jsonl',
+}
+
+RANKS = ['kingdom', 'phylum', 'class', 'order']
+
+def load_jsonl(path, fields=None):
+    """JSONL file as a lazily decoded, re-iterable sequence of records."""
+    return JsonlReader(path, fields)
+
+def load_artifacts(fields):
+    """Taxonomy records, with only the given fields."""
+    if USE_PARQUET:
+        from columnar import read_records
+        return read_records('ARKADU/sys/taxonomy.parquet', fields)
+    return load_jsonl(SOURCES['taxonomy'], fields)
+
+def load_source(source, fields):
+    if source == 'taxonomy':
+        return load_artifacts(fields)
+    return load_jsonl(SOURCES[source], fields)
+
+class TopN:
+    """
+    The n largest items by key, in a heap of at most n entries. Ties keep
+    the item seen first, as sorted(..., key=key, reverse=True)[:n] does.
+    """
+
+    def __init__(self, n, key):
+        self.n = n
+        self.key = key
+        self.heap = []
+        self.seen = 0
+
+    def add(self, item):
+        # -seen is unique, so items themselves are never compared
+        entry = (self.key(item), -self.seen, item)
+        self.seen += 1
+        if len(self.heap) < self.n:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def items(self):
+        return [item for _, _, item in sorted(self.heap, reverse=True)]
+
+class Report:
+    """
+    One section of the analysis. reads maps each source (SOURCES) to the
+    fields the report needs from it; add() gets every record of those
+    sources, report() prints the section once all of them are read.
+    """
+
+    reads = {}
+
+    def add(self, source, record):
+        pass
+
+    def report(self):
+        pass
+
+def run_reports(reports):
+    """Read each source once, feeding every record to the reports that read it."""
+    for source in SOURCES:
+        readers = [r for r in reports if source in r.reads]
+        if not readers:
+            continue
+        fields = list(dict.fromkeys(f for r in readers for f in r.reads[source]))
+        for record in load_source(source, fields):
+            for r in readers:
+                r.add(source, record)
+    for r in reports:
+        r.report()
+
+class SummaryReport(Report):
+    """Overall summary statistics."""
+
+    def __init__(self):
+        # Chambers and chains are only counted, so no fields need decoding
+        self.reads = {'chambers': [], 'ekphrasis': []}
+        self.counts = defaultdict(int)
+        self.total_bytes = 0
+        self.max_depth = 0
+        self.species = set()
+        self.prompt_count = 0
+        if not CUBE:
+            self.reads['taxonomy'] = ['size', 'prompts', 'depth', 'species']
+
+    def add(self, source, record):
+        self.counts[source] += 1
+        if source != 'taxonomy':
+            return
+        self.total_bytes += record['size']
+        self.max_depth = max(self.max_depth, record['depth'])
+        self.species.add(record['species'])
+        if 'prompts' in record and record['prompts'].get('has_prompts'):
+            self.prompt_count += 1
+
+    def report(self):
+        if CUBE:
+            artifact_count, total_bytes, prompt_count = CUBE.total()
+            max_depth = max(CUBE.values('depth'))
+            species_count = len(CUBE.values('species'))
+        else:
+            artifact_count = self.counts['taxonomy']
+            total_bytes = self.total_bytes
+            prompt_count = self.prompt_count
+            max_depth = self.max_depth
+            species_count = len(self.species)
+
+        total_gb = total_bytes / 1024 / 1024 / 1024
+
+        print("\n" + "=" * 60)
+        print("ARKADU OS - SYSTEM SUMMARY")
+        print("=" * 60)
+        print(f"""
+Total artifacts:           {artifact_count:,}
+Total chambers:            {self.counts['chambers']:,}
 Total storage:             {total_gb:.2f} GB
 JSON files with prompts:   {prompt_count:,}
-Ekphrasis chains traced:   {len(chains):,}
+Ekphrasis chains traced:   {self.counts['ekphrasis']:,}
 
-Deepest taxonomy depth:    {max(a['depth'] for a in artifacts)}
-Unique species (types):    {len(set(a['species'] for a in artifacts))}
+Deepest taxonomy depth:    {max_depth}
+Unique species (types):    {species_count}
 """)
 
+class ChamberReport(Report):
+    """Largest chambers at each rank."""
+
+    reads = {'chambers': ['chamber', 'rank', 'file_count', 'total_bytes']}
+
+    def __init__(self):
+        self.by_rank = {}
+
+    def add(self, source, record):
+        if record['rank'] in RANKS:
+            top = self.by_rank.get(record['rank'])
+            if top is None:
+                top = self.by_rank[record['rank']] = TopN(5, lambda c: c['total_bytes'])
+            top.add(record)
+
+    def report(self):
+        print("=" * 60)
+        print("LARGEST CHAMBERS BY RANK")
+        print("=" * 60)
+
+        for rank in RANKS:
+            if rank in self.by_rank:
+                print(f"\n{rank.upper()} (depth {RANKS.index(rank) + 1}):")
+                for c in self.by_rank[rank].items():
+                    gb = c['total_bytes'] / 1024 / 1024 / 1024
+                    print(f"  {c['chamber']:45s} {c['file_count']:5d} files  {gb:6.2f} GB")
+
+class SpeciesReport(Report):
+    """Species (file types) distribution."""
+
+    def __init__(self):
+        self.reads = {} if CUBE else {'taxonomy': ['species', 'size']}
+        self.species_count = defaultdict(int)
+        self.species_bytes = defaultdict(int)
+
+    def add(self, source, record):
+        species = record['species']
+        self.species_count[species] += 1
+        self.species_bytes[species] += record['size']
+
+    def report(self):
+        if CUBE:
+            for (species,), (count, size, _) in CUBE.slice(['species']).items():
+                self.species_count[species] = count
+                self.species_bytes[species] = size
+
+        print("\n" + "=" * 60)
+        print("TOP SPECIES (File Types)")
+        print("=" * 60)
+
+        top_species = heapq.nlargest(15, self.species_bytes.items(), key=lambda x: x[1])
+        for species, total_bytes in top_species:
+            count = self.species_count[species]
+            gb = total_bytes / 1024 / 1024 / 1024
+            avg_mb = (total_bytes / count) / 1024 / 1024
+            print(f"{species:10s} {count:6d} files  {gb:8.2f} GB  (avg: {avg_mb:6.1f} MB/file)")
+
+class SizeDistributionReport(Report):
+    """File size quantiles per species, from the chamber sketches (sketch.py)."""
+
+    reads = {'chambers': ['sketches']}
+
+    def __init__(self):
+        self.sketches = {}
+
+    def add(self, source, record):
+        if record.get('sketches'):
+            merge_sketches(self.sketches, sketches_from_json(record['sketches']))
+
+    def report(self):
+        if not self.sketches:
+            return  # chambers.jsonl from before sketches were kept
+
+        print("\n" + "=" * 60)
+        print("FILE SIZE QUANTILES (MB)")
+        print("=" * 60)
+
+        top = heapq.nlargest(15, self.sketches.items(), key=lambda x: x[1].count)
+        for species, distribution in top:
+            p50, p95, p99 = (v / 1024 / 1024 for v in distribution.size.quantiles(QUANTILES))
+            print(f"{species:10s} {distribution.count:6d} files  "
+                  f"p50 {p50:8.2f}  p95 {p95:8.2f}  p99 {p99:8.2f}")
+
+class PatternReport(Report):
+    """Filename patterns."""
+
+    reads = {'taxonomy': ['pattern']}
+
+    def __init__(self):
+        self.pattern_count = defaultdict(int)
+
+    def add(self, source, record):
+        if 'pattern' in record:
+            self.pattern_count[record['pattern'].get('schema', 'unknown')] += 1
+
+    def report(self):
+        print("\n" + "=" * 60)
+        print("FILENAME PATTERNS")
+        print("=" * 60)
+
+        # Only one line per schema, so there is little to sort
+        for schema, count in sorted(self.pattern_count.items(), key=lambda x: x[1], reverse=True):
+            if count > 5:  # Only show significant patterns
+                print(f"{schema:20s} {count:6d} files")
+
+class EkphrasisReport(Report):
+    """Operative ekphrasis chains."""
+
+    reads = {'ekphrasis': ['prompt_file', 'script', 'uses_ffmpeg', 'uses_drawtext']}
+
+    def __init__(self):
+        self.chains = 0
+        self.ffmpeg_chains = 0
+        self.drawtext_chains = 0
+        self.unique_prompts = set()
+        self.unique_scripts = set()
+        self.script_count = defaultdict(int)
+
+    def add(self, source, record):
+        self.chains += 1
+        self.ffmpeg_chains += bool(record.get('uses_ffmpeg'))
+        self.drawtext_chains += bool(record.get('uses_drawtext'))
+        self.unique_prompts.add(record['prompt_file'])
+        self.unique_scripts.add(record['script'])
+        self.script_count[Path(record['script']).name] += 1
+
+    def report(self):
+        print("\n" + "=" * 60)
+        print("OPERATIVE EKPHRASIS ECOLOGY")
+        print("=" * 60)
+        print(f"\nTotal chains traced:        {self.chains}")
+        print(f"Unique prompt files:        {len(self.unique_prompts)}")
+        print(f"Unique assembly scripts:    {len(self.unique_scripts)}")
+        print(f"Chains using ffmpeg:        {self.ffmpeg_chains}")
+        print(f"Chains using drawtext:      {self.drawtext_chains}")
+
+        # Show top scripts by chain count
+        print(f"\nTop assembly scripts:")
+        top_scripts = heapq.nlargest(10, self.script_count.items(), key=lambda x: x[1])
+        for script, count in top_scripts:
+            print(f"  {script:40s} {count:3d} chains")
+
+# Printed in this order; a new report only needs adding here
+REPORTS = [SummaryReport, ChamberReport, SpeciesReport, SizeDistributionReport,
+           PatternReport, EkphrasisReport]
+
 # Run analysis
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ARKADU analyzer')
+    parser.add_argument('--parquet', action='store_true',
+                        help='read sys/taxonomy.parquet instead of taxonomy.jsonl (needs pyarrow)')
+    parser.add_argument('--cube', action='store_true',
+                        help='species and summary reports from sys/cube.json (fused_scan.py --cube)')
+    args = parser.parse_args()
+    USE_PARQUET = args.parquet
+    if args.cube:
+        from rollup_cube import RollupCube
+        CUBE = RollupCube.load('ARKADU/sys/cube.json')
+
     print("\nARKADU Analyzer v1.0")
     print("=" * 60)
-    
-    generate_summary_stats()
-    analyze_chambers()
-    analyze_species()
-    analyze_patterns()
-    analyze_ekphrasis()
-    
+
+    run_reports([report() for report in REPORTS])
+
     print("\n" + "=" * 60)
     print("Analysis complete")
     print("=" * 60)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+ARKADU Artifact Table
+Column-oriented in-memory store for per-file records.
+
+A dict per file costs about 1 KB of Python objects once its repeated keys,
+path strings and nested lists are counted. The table instead keeps one
+typed array per column:
+
+  dir      directory id (a PathTrie node: interned (parent dir, component) pairs)
+  name     file name id (interned)
+  size     int64 bytes
+  mtime    float seconds
+  depth    uint16 path components
+  ext      extension id (interned)
+  kingdom  first path component id for nested files (interned, None at top level)
+
+plus any tool-specific categorical columns (extra=...), interned the same
+way. A directory or name shared by many paths ('CAT/WHISKER/MEDIA',
+'index.html') is stored once. ArtifactView rows are created only when
+asked for, and records() builds a tool's own dict shape on demand:
+
+  table = ArtifactTable(extra=('animal',))
+  row = table.add(entry.parts, entry.size, entry.mtime, animal='CAT')
+  table.view(row).path, table.size[row], table.value('animal', row)
+"""
+
+import os
+from array import array
+from collections.abc import Sequence
+
+ROOT_DIR = 0
+
+
+class PathTrie:
+    """
+    Directories as (parent, name) nodes. Node 0 (ROOT_DIR) is the walk
+    root; component names are interned so each distinct name is one string.
+    """
+
+    def __init__(self):
+        self.parents = array('i', [-1])
+        self.names = ['']
+        self.ids = {}           # (parent id, name) → node id
+        self.strings = {}       # name → the one shared str
+        self._parts = [()]      # node id → component tuple, built once per node
+        self.written = 1        # nodes already saved (see new_nodes)
+
+    def add(self, parent, name):
+        """Child node of parent with this name, created if new."""
+        node = self.ids.get((parent, name))
+        if node is None:
+            name = self.strings.setdefault(name, name)
+            node = self.ids[(parent, name)] = len(self.names)
+            self.parents.append(parent)
+            self.names.append(name)
+            self._parts.append(self._parts[parent] + (name,))
+        return node
+
+    def intern(self, parts):
+        """Node id of a directory given as path components."""
+        node = ROOT_DIR
+        for part in parts:
+            node = self.add(node, part)
+        return node
+
+    def parts(self, node):
+        return self._parts[node]
+
+    def path(self, node, name=None, sep=os.sep):
+        parts = self._parts[node]
+        return sep.join(parts + (name,) if name is not None else parts)
+
+    def new_nodes(self):
+        """[id, parent, name] of nodes added since the last call, for streaming writers."""
+        nodes = [[n, self.parents[n], self.names[n]] for n in range(self.written, len(self.names))]
+        self.written = len(self.names)
+        return nodes
+
+    def __len__(self):
+        return len(self.names)
+
+
+class Interner:
+    """Values ↔ dense integer ids, each distinct value stored once."""
+
+    __slots__ = ('values', 'ids')
+
+    def __init__(self):
+        self.values = []
+        self.ids = {}
+
+    def intern(self, value):
+        id_ = self.ids.get(value)
+        if id_ is None:
+            id_ = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return id_
+
+    def __getitem__(self, id_):
+        return self.values[id_]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ArtifactView:
+    """One row of an ArtifactTable, resolved on attribute access."""
+
+    __slots__ = ('table', 'row')
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    @property
+    def parts(self):
+        return self.table.parts(self.row)
+
+    @property
+    def path(self):
+        return self.table.path(self.row)
+
+    @property
+    def name(self):
+        return self.table.components[self.table.name[self.row]]
+
+    @property
+    def size(self):
+        return self.table.size[self.row]
+
+    @property
+    def mtime(self):
+        return self.table.mtime[self.row]
+
+    @property
+    def depth(self):
+        return self.table.depth[self.row]
+
+    @property
+    def ext(self):
+        return self.table.exts[self.table.ext[self.row]]
+
+    @property
+    def kingdom(self):
+        return self.table.kingdoms[self.table.kingdom[self.row]]
+
+    def __getitem__(self, column):
+        """Value of an extra column."""
+        return self.table.value(column, self.row)
+
+    def __repr__(self):
+        return f'<ArtifactView {self.row}: {self.path}>'
+
+
+class ArtifactTable:
+    """
+    Append-only table of file artifacts; add() returns the new row number.
+    """
+
+    def __init__(self, extra=()):
+        self.dirs = PathTrie()
+        self.components = Interner()  # file names
+        self.exts = Interner()
+        self.kingdoms = Interner()
+
+        self.dir = array('i')
+        self.name = array('i')
+        self.size = array('q')
+        self.mtime = array('d')
+        self.depth = array('H')
+        self.ext = array('I')
+        self.kingdom = array('I')
+        self.extra = {column: (Interner(), array('I')) for column in extra}
+
+    def add(self, parts, size, mtime=0.0, ext=None, **extra):
+        """
+        Append a file given its path components. ext defaults to the
+        lower-cased suffix; extra columns are passed by name.
+        """
+        name = parts[-1]
+        if ext is None:
+            ext = os.path.splitext(name)[1].lower()
+        self.dir.append(self.dirs.intern(parts[:-1]))
+        self.name.append(self.components.intern(name))
+        self.size.append(size)
+        self.mtime.append(mtime)
+        self.depth.append(len(parts))
+        self.ext.append(self.exts.intern(ext))
+        self.kingdom.append(self.kingdoms.intern(parts[0] if len(parts) > 1 else None))
+        for column, (values, ids) in self.extra.items():
+            ids.append(values.intern(extra.get(column)))
+        return len(self.size) - 1
+
+    def parts(self, row):
+        return self.dirs.parts(self.dir[row]) + (self.components[self.name[row]],)
+
+    def path(self, row, sep=os.sep):
+        return sep.join(self.parts(row))
+
+    def value(self, column, row):
+        values, ids = self.extra[column]
+        return values[ids[row]]
+
+    def view(self, row):
+        return ArtifactView(self, row)
+
+    def records(self, build, rows=None):
+        """Sequence of build(view) over all rows, or just the given row numbers."""
+        return RecordSequence(self, build, rows)
+
+    def __len__(self):
+        return len(self.size)
+
+    def __iter__(self):
+        for row in range(len(self.size)):
+            yield ArtifactView(self, row)
+
+
+class RecordSequence(Sequence):
+    """
+    Read-only sequence of per-row records built on access, for code that
+    expects a list of dicts.
+    """
+
+    __slots__ = ('table', 'build', 'rows')
+
+    def __init__(self, table, build, rows=None):
+        self.table = table
+        self.build = build
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.table) if self.rows is None else len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        row = index if self.rows is None else self.rows[index]
+        if self.rows is None and row < 0:
+            row += len(self.table)
+        if not 0 <= row < len(self.table):
+            raise IndexError(index)
+        return self.build(ArtifactView(self.table, row))
+
+    def __iter__(self):
+        rows = range(len(self.table)) if self.rows is None else self.rows
+        for row in rows:
+            yield self.build(ArtifactView(self.table, row))
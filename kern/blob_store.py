@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+ARKADU Blob Store
+Content-addressed file contents for the deep scan (deep/blobs/).
+
+Every blob holds the raw bytes of a scanned file, stored once under its
+SHA-256, with the first two hex digits as a directory:
+
+  deep/blobs/3f/a2c9...
+
+python_files.json and json_files.json keep only the hash ('blob') next to
+the extracted summaries, and a viewer fetches deep/blobs/<hash> when a file
+is opened. Identical files share one blob. A blob already on disk is not
+written again, so re-runs only add changed files; prune() drops the blobs
+no record refers to any more.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+
+def blob_relpath(digest):
+    """'3fa2c9...' → '3f/a2c9...' (the same layout the viewers build)."""
+    return f'{digest[:2]}/{digest[2:]}'
+
+
+class BlobStore:
+    """
+    Blobs under one directory. put() is safe from several processes at
+    once: each writes its own temporary file and renames it into place.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, digest):
+        return self.root / blob_relpath(digest)
+
+    def put(self, data):
+        """Store bytes (if new); returns their hex digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return digest
+
+    def get(self, digest):
+        return self.path(digest).read_bytes()
+
+    def __contains__(self, digest):
+        return self.path(digest).exists()
+
+    def digests(self):
+        """Every stored digest."""
+        if not self.root.is_dir():
+            return set()
+        return {
+            prefix.name + blob.name
+            for prefix in self.root.iterdir() if prefix.is_dir() and len(prefix.name) == 2
+            for blob in prefix.iterdir() if not blob.name.endswith('.tmp')
+        }
+
+    def prune(self, keep):
+        """Delete blobs whose digest is not in keep; returns how many went."""
+        removed = 0
+        for digest in self.digests() - set(keep):
+            path = self.path(digest)
+            path.unlink()
+            removed += 1
+            if not any(path.parent.iterdir()):
+                path.parent.rmdir()
+        return removed
+
+    def size(self):
+        """Bytes held by all blobs."""
+        return sum(self.path(digest).stat().st_size for digest in self.digests())
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+ARKADU Chamber Deltas
+Bring sys/chambers.jsonl up to date from a change set instead of a rescan.
+
+A render job that drops 200 files into one chamber should not cost a full
+taxonomy scan of the archive. The change set lists the files added,
+removed or resized, one JSON object per line, paths relative to the
+archive root as in the scan outputs:
+
+  {"op": "add", "path": "CAT/WHISKER/MEDIA/MR07/f.png", "size": 1234, "mtime": 1760000000.0}
+  {"op": "remove", "path": "...", "size": ..., "mtime": ...}        # the file as it was
+  {"op": "resize", "path": "...", "old_size": ..., "old_mtime": ..., "size": ..., "mtime": ...}
+
+mtime is seconds since the epoch (os.stat) or an ISO time as in
+primitive.jsonl. Each change becomes a delta: file_count, total_bytes,
+species_distribution and sketches (sketch.py; removal subtracts from the
+histograms) of the file's chamber, subtree_files / subtree_bytes of that
+chamber and every ancestor, and child_count of the parent of a directory
+seen for the first time. A chamber gaining its first files gets a record,
+one losing its last drops out, as they would in a rebuild.
+
+Only the records the deltas touch are decoded and re-encoded. The rest
+are copied as they are, the chamber and sort key read from the head of
+the line, and the modified records are merged back into the largest-first
+order. The new file is written as <path>.tmp and renamed into place.
+
+A directory counts as existing if a chamber record lies in or below it,
+so files added to a directory tree that held no files at all can make
+its parent's child_count one too high; a rebuild corrects that.
+
+Usage:
+  python3 ARKADU/kern/chamber_delta.py changes.jsonl            # apply to sys/chambers.jsonl
+  python3 ARKADU/kern/chamber_delta.py --check --files 20000    # deltas vs full rebuild, synthetic archive
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from jsonl_reader import JsonlReader
+from framed import FramedReader, FramedWriter, detect, resolve
+from sketch import Distribution, sketches_from_json, sketches_to_json
+from taxonomy_scan import (chamber_summary, dominant_species, generate_chamber_summaries,
+                           rank_of, scan_taxonomy, write_chamber_summaries)
+
+ARKADU_DIR = Path(__file__).resolve().parent.parent
+
+# Head of a chambers.jsonl line, in chamber_summary()'s key order
+HEAD = re.compile(rb'\{"chamber": ("(?:[^"\\]|\\.)*"), "rank": "[^"]*", "depth": \d+, '
+                  rb'"file_count": (\d+), "total_bytes": (\d+)')
+
+
+def parent_of(path):
+    return path.rpartition(os.sep)[0]
+
+
+def ancestors(path):
+    """path and every directory above it, up to its kingdom."""
+    while path:
+        yield path
+        path = parent_of(path)
+
+
+def to_seconds(mtime):
+    if isinstance(mtime, str):
+        return datetime.fromisoformat(mtime).timestamp()
+    return mtime
+
+
+def species_of(name):
+    return Path(name).suffix.lower() or 'no_ext'
+
+
+def peek(line):
+    """(chamber, file_count, total_bytes) of a record, decoding only its head."""
+    match = HEAD.match(line)
+    if match:
+        return json.loads(match.group(1)), int(match.group(2)), int(match.group(3))
+    record = json.loads(line)
+    return record['chamber'], record['file_count'], record['total_bytes']
+
+
+class ChamberDelta:
+    """
+    Net effect of a change set on the chambers: direct deltas per chamber,
+    subtree deltas per directory, and the directories files were added to.
+    """
+
+    def __init__(self):
+        self.direct = {}    # chamber → [files, bytes, {species: files}, {species: Distribution}]
+        self.subtree = {}   # directory → [files, bytes]
+        self.added_dirs = set()
+        self.changes = 0
+
+    def add_file(self, path, size, mtime, n=1):
+        """Count a file into (n=1) or out of (n=-1) its chamber."""
+        chamber = parent_of(path)
+        if not chamber:
+            return  # files at the archive root belong to no chamber
+        delta = self.direct.get(chamber)
+        if delta is None:
+            delta = self.direct[chamber] = [0, 0, {}, {}]
+        species = species_of(path.rpartition(os.sep)[2])
+        delta[0] += n
+        delta[1] += n * size
+        delta[2][species] = delta[2].get(species, 0) + n
+        distribution = delta[3].get(species)
+        if distribution is None:
+            distribution = delta[3][species] = Distribution()
+        distribution.add(size, to_seconds(mtime), n)
+        for directory in ancestors(chamber):
+            totals = self.subtree.setdefault(directory, [0, 0])
+            totals[0] += n
+            totals[1] += n * size
+        if n > 0:
+            self.added_dirs.update(ancestors(chamber))
+
+    def add_change(self, change):
+        op = change['op']
+        if op == 'add':
+            self.add_file(change['path'], change['size'], change['mtime'])
+        elif op == 'remove':
+            self.add_file(change['path'], change['size'], change['mtime'], -1)
+        elif op == 'resize':
+            self.add_file(change['path'], change['old_size'], change['old_mtime'], -1)
+            self.add_file(change['path'], change['size'], change['mtime'])
+        else:
+            raise ValueError(f"unknown change op {op!r} for {change.get('path')}")
+        self.changes += 1
+
+    @classmethod
+    def from_changes(cls, changes):
+        delta = cls()
+        for change in changes:
+            delta.add_change(change)
+        return delta
+
+
+def apply_record_delta(record, direct, subtree, children):
+    """Apply one chamber's deltas to its decoded record (in place)."""
+    if 'subtree_files' not in record or 'sketches' not in record:
+        raise ValueError(f"{record['chamber']}: chambers.jsonl predates subtree totals "
+                         f"and sketches; rescan once before applying deltas")
+    if direct:
+        files, size, species, sketches = direct
+        record['file_count'] += files
+        record['total_bytes'] += size
+        distribution = record['species_distribution']
+        for s, n in species.items():
+            distribution[s] = distribution.get(s, 0) + n
+            if not distribution[s]:
+                del distribution[s]
+        merged = sketches_from_json(record['sketches'])
+        for s, d in sketches.items():
+            merged.setdefault(s, Distribution()).merge(d)
+        record['sketches'] = sketches_to_json({s: d for s, d in merged.items() if d.count})
+        record['total_mb'] = round(record['total_bytes'] / 1024 / 1024, 2)
+        record['dominant_species'] = dominant_species(distribution)
+    if subtree:
+        record['subtree_files'] += subtree[0]
+        record['subtree_bytes'] += subtree[1]
+    record['child_count'] += children
+
+
+def read_lines(path):
+    return list(FramedReader(path).lines())
+
+
+def write_lines(path, lines, compression):
+    """Write the lines (bytes, no newline) as <path>.tmp and rename it into place."""
+    if compression:
+        with FramedWriter(path, compression) as out:
+            for line in lines:
+                out.write_bytes(line + b'\n')
+        return
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as out:
+        for line in lines:
+            out.write(line + b'\n')
+    os.replace(tmp, path)
+
+
+def apply_delta(chambers_path, delta):
+    """
+    Apply a ChamberDelta to chambers.jsonl (or its .gz/.zst) in place.
+    Returns {'updated': n, 'added': n, 'dropped': n, 'records': n}.
+    """
+    path = resolve(chambers_path)
+    compression = detect(path) if os.path.exists(path) else None
+    lines = read_lines(path) if os.path.exists(path) else []
+    heads = [peek(line) for line in lines]
+    recorded = {chamber: i for i, (chamber, _, _) in enumerate(heads)}
+
+    # Directories known to exist: recorded chambers and everything above them
+    known = set()
+    for chamber in recorded:
+        for directory in ancestors(chamber):
+            if directory in known:
+                break
+            known.add(directory)
+    new_dirs = delta.added_dirs - known
+    children = {}
+    for directory in new_dirs:
+        parent = parent_of(directory)
+        if parent:
+            children[parent] = children.get(parent, 0) + 1
+
+    # Records to rewrite: existing ones the deltas reach, and new chambers
+    touched = (set(delta.direct) | set(delta.subtree) | set(children))
+    created = {chamber for chamber in delta.direct
+               if chamber not in recorded and delta.direct[chamber][0] > 0}
+
+    # Subtree totals of directories that get their first record, before the change
+    before = {chamber: [0, 0] for chamber in created}
+    if before:
+        for chamber, files, size in heads:
+            for directory in ancestors(parent_of(chamber)):
+                if directory in before:
+                    before[directory][0] += files
+                    before[directory][1] += size
+    listing = known | new_dirs
+
+    modified = []
+    for chamber in touched:
+        if chamber in recorded:
+            record = json.loads(lines[recorded[chamber]])
+        elif chamber in created:
+            depth = chamber.count(os.sep) + 1
+            record = chamber_summary(chamber, {
+                'rank': rank_of(depth), 'depth': depth, 'file_count': 0, 'total_bytes': 0,
+                'species': {}, 'sketches': {},
+                'children': [d for d in listing if parent_of(d) == chamber and d not in new_dirs],
+                'subtree_files': before[chamber][0], 'subtree_bytes': before[chamber][1]
+            })
+        else:
+            continue
+        apply_record_delta(record, delta.direct.get(chamber), delta.subtree.get(chamber),
+                           children.get(chamber, 0))
+        modified.append(record)
+
+    # Untouched lines keep their bytes and order; modified records are merged
+    # back in largest first, after the untouched records of equal size
+    replaced = {recorded[chamber] for chamber in touched if chamber in recorded}
+    kept = [record for record in modified if record['file_count'] > 0]
+    kept.sort(key=lambda record: record['total_bytes'], reverse=True)
+    output = []
+    j = 0
+    for i, line in enumerate(lines):
+        if i in replaced:
+            continue
+        while j < len(kept) and kept[j]['total_bytes'] > heads[i][2]:
+            output.append(json.dumps(kept[j]).encode('utf-8'))
+            j += 1
+        output.append(line)
+    output.extend(json.dumps(record).encode('utf-8') for record in kept[j:])
+    write_lines(path, output, compression)
+
+    return {'updated': len(kept) - len(created), 'added': len(created),
+            'dropped': len(modified) - len(kept), 'records': len(output)}
+
+
+def apply_changes(chambers_path, changes):
+    """Apply an iterable of change dicts (or a change set file) to chambers.jsonl."""
+    if isinstance(changes, (str, os.PathLike)):
+        changes = JsonlReader(changes)
+    delta = ChamberDelta.from_changes(changes)
+    result = apply_delta(chambers_path, delta)
+    result['changes'] = delta.changes
+    return result
+
+
+# Consistency check: deltas against a full rebuild
+
+def load_generator():
+    """Import generate-synthetic-archive.py (hyphenated, so not importable by name)."""
+    spec = importlib.util.spec_from_file_location('generate_synthetic_archive',
+                                                  ARKADU_DIR / 'generate-synthetic-archive.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def rebuild(archive, chambers_path):
+    _, chambers = scan_taxonomy(archive)
+    summaries = generate_chamber_summaries(chambers)
+    write_chamber_summaries(chambers_path, summaries)
+    return summaries
+
+
+def file_change(archive, rel, op, old=None):
+    st = os.stat(archive / rel)
+    change = {'op': op, 'path': rel, 'size': st.st_size, 'mtime': st.st_mtime}
+    if old is not None:
+        change['old_size'], change['old_mtime'] = old.st_size, old.st_mtime
+    return change
+
+
+def mutate(archive, count, rng):
+    """
+    Add, remove and resize about count files of the archive on disk (a third
+    each; some additions go to new chambers); returns the change set.
+    """
+    generator = load_generator()
+    files = sorted(str(p.relative_to(archive)) for p in archive.rglob('*') if p.is_file())
+    dirs = sorted({parent_of(f) for f in files if parent_of(f)})
+    picked = rng.sample(files, min(len(files), 2 * (count // 3)))
+    changes = []
+
+    for rel in picked[:len(picked) // 2]:
+        changes.append(file_change(archive, rel, 'remove'))
+        os.remove(archive / rel)
+    for rel in picked[len(picked) // 2:]:
+        old = os.stat(archive / rel)
+        generator.write_sparse(archive / rel, rng.randrange(1, 50_000_000))
+        changes.append(file_change(archive, rel, 'resize', old))
+
+    new_chambers = [os.path.join(rng.choice(dirs), f'MR{n:02d}') for n in range(3)]
+    new_chambers.append(os.path.join('ZEBRA', 'STRIPE', 'MEDIA'))
+    for n in range(count - len(picked)):
+        directory = rng.choice(new_chambers) if n % 4 == 0 else rng.choice(dirs)
+        rel = os.path.join(directory, f'delta_{n:05d}{rng.choice([".png", ".mp4", ".wav", ".ogg"])}')
+        (archive / directory).mkdir(parents=True, exist_ok=True)
+        generator.write_sparse(archive / rel, rng.randrange(0, 50_000_000))
+        changes.append(file_change(archive, rel, 'add'))
+    return changes
+
+
+def comparable(record):
+    """A record with dominant species as counts, since equal counts may tie in any order."""
+    record = dict(record)
+    record['dominant_species'] = [record['species_distribution'][s]
+                                  for s in record['dominant_species']]
+    return record
+
+
+def check(files, count, seed):
+    """Apply a random change set both ways on a synthetic archive; True if they agree."""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix='arkadu-delta-') as tmp:
+        tmp = Path(tmp)
+        archive = tmp / 'archive'
+        load_generator().generate(archive, files, progress=False)
+        chambers_path = tmp / 'chambers.jsonl'
+        start = time.perf_counter()
+        rebuild(archive, chambers_path)
+        full_seconds = time.perf_counter() - start
+        print(f"✓ Archive: {files:,} files, full scan {full_seconds:.2f}s")
+
+        changes = mutate(archive, count, rng)
+        start = time.perf_counter()
+        result = apply_changes(chambers_path, changes)
+        delta_seconds = time.perf_counter() - start
+        print(f"✓ Deltas: {result['changes']} changes → {result['updated']} updated, "
+              f"{result['added']} new, {result['dropped']} dropped records "
+              f"({delta_seconds * 1000:.0f} ms)")
+
+        incremental = list(JsonlReader(chambers_path))
+        expected = rebuild(archive, tmp / 'rebuilt.jsonl')
+
+    got = {record['chamber']: comparable(record) for record in incremental}
+    want = {record['chamber']: comparable(record) for record in expected}
+    problems = [f"missing {c}" for c in want if c not in got]
+    problems += [f"unexpected {c}" for c in got if c not in want]
+    for chamber in want:
+        if chamber in got and got[chamber] != want[chamber]:
+            fields = [k for k in want[chamber] if got[chamber].get(k) != want[chamber][k]]
+            problems.append(f"{chamber}: {', '.join(fields)} differ")
+    sizes = [record['total_bytes'] for record in incremental]
+    if sizes != sorted(sizes, reverse=True):
+        problems.append("records are not largest first")
+
+    if problems:
+        print(f"❌ {len(problems)} differences from the full rebuild:")
+        for problem in problems[:20]:
+            print(f"  {problem}")
+        return False
+    print(f"✓ Consistent: {len(want)} chamber records match the full rebuild")
+    return True
+
+
+# Apply a change set, or check deltas against a rebuild
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Apply file changes to sys/chambers.jsonl')
+    parser.add_argument('changes', nargs='?', help='change set (JSONL: op, path, size, mtime)')
+    parser.add_argument('--sys', type=Path, default=ARKADU_DIR / 'sys',
+                        help='directory holding chambers.jsonl')
+    parser.add_argument('--check', action='store_true',
+                        help='compare deltas with a full rebuild on a synthetic archive')
+    parser.add_argument('--files', type=int, default=20_000, help='synthetic archive size (--check)')
+    parser.add_argument('--count', type=int, default=600, help='changes to apply (--check)')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    print("ARKADU Chamber Deltas v1.0")
+    print("=" * 50)
+    if args.check:
+        sys.exit(0 if check(args.files, args.count, args.seed) else 1)
+    if not args.changes:
+        parser.error('give a change set, or --check')
+
+    start = time.perf_counter()
+    result = apply_changes(args.sys / 'chambers.jsonl', args.changes)
+    print(f"✓ {result['changes']} changes: {result['updated']} records updated, "
+          f"{result['added']} new, {result['dropped']} dropped "
+          f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+    print(f"✓ Output: {resolve(args.sys / 'chambers.jsonl')} ({result['records']} records)")
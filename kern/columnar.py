@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+ARKADU Columnar Export
+primitive and taxonomy records as Parquet (sys/primitive.parquet,
+sys/taxonomy.parquet) for readers that only need a few fields.
+
+JSONL repeats every key on every line and has to be parsed whole; Parquet
+stores each field as its own compressed column, so a reader asking for
+path + size + ext decodes only those three. Low-cardinality columns (ext,
+kingdom, schema, species and the taxonomy ranks) are dictionary-encoded.
+
+Nested JSONL fields are flattened into columns:
+  primitive  pattern → schema + pattern_fields (JSON of the matched groups)
+             prompts → has_prompts + sample_prompt + entry_count
+             kingdom (extra, for filtering: first path component of nested files)
+  taxonomy   taxonomy → kingdom ... genus + species
+
+read_records() rebuilds the JSONL record shape from whichever fields are
+asked for, so existing code can switch formats without changes.
+
+Needs pyarrow (pip install pyarrow); everything else in ARKADU runs without it.
+
+Usage:
+  python3 ARKADU/kern/columnar.py                 # sys/*.jsonl → sys/*.parquet
+  python3 ARKADU/kern/fused_scan.py . --parquet   # or write both during the scan
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from walker import Stage
+from taxonomy_scan import RANKS, taxonomy_record
+
+BATCH_SIZE = 65_536  # rows per Parquet row group
+
+TAXONOMY_RANKS = RANKS[:-1]  # kingdom ... genus; species is its own column
+
+# JSONL field → the columns it is stored in
+FIELDS = {
+    'primitive': {
+        'path': ['path'],
+        'size': ['size'],
+        'ext': ['ext'],
+        'depth': ['depth'],
+        'mtime': ['mtime'],
+        'name': ['name'],
+        'pattern': ['schema', 'pattern_fields'],
+        'prompts': ['has_prompts', 'sample_prompt', 'entry_count'],
+    },
+    'taxonomy': {
+        'taxonomic_id': ['taxonomic_id'],
+        'path': ['path'],
+        'taxonomy': TAXONOMY_RANKS + ['species'],
+        'depth': ['depth'],
+        'size': ['size'],
+        'species': ['species'],
+    },
+}
+
+NESTED = {'pattern', 'prompts', 'taxonomy'}
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+
+
+def arrow_schema(kind):
+    """Arrow schema for a record kind; the kind is kept in the file metadata."""
+    require_pyarrow()
+    category = pa.dictionary(pa.int32(), pa.string())
+    if kind == 'primitive':
+        fields = [
+            ('path', pa.string()),
+            ('name', pa.string()),
+            ('ext', category),
+            ('size', pa.int64()),
+            ('depth', pa.int16()),
+            ('mtime', pa.string()),
+            ('kingdom', category),
+            ('schema', category),
+            ('pattern_fields', pa.string()),
+            ('has_prompts', pa.bool_()),
+            ('sample_prompt', pa.string()),
+            ('entry_count', pa.int64()),
+        ]
+    elif kind == 'taxonomy':
+        fields = [('taxonomic_id', pa.string()), ('path', pa.string())]
+        fields += [(rank, category) for rank in TAXONOMY_RANKS]
+        fields += [('species', category), ('depth', pa.int16()), ('size', pa.int64())]
+    else:
+        raise ValueError(f"unknown record kind {kind!r}")
+    return pa.schema(fields, metadata={'arkadu.kind': kind})
+
+
+def primitive_row(artifact):
+    """Column values for a primitive record, in arrow_schema('primitive') order."""
+    path = artifact['path']
+    pattern = artifact['pattern']
+    prompts = artifact['prompts']
+    fields = {k: v for k, v in pattern.items() if k != 'schema'}
+    kingdom, sep, _ = path.partition(os.sep)
+    return (
+        path,
+        artifact['name'],
+        artifact['ext'],
+        artifact['size'],
+        artifact['depth'],
+        artifact['mtime'],
+        kingdom if sep else None,
+        pattern['schema'],
+        json.dumps(fields) if fields else None,
+        prompts['has_prompts'],
+        prompts.get('sample_prompt'),
+        prompts.get('entry_count')
+    )
+
+
+def taxonomy_row(artifact):
+    """Column values for a taxonomy record, in arrow_schema('taxonomy') order."""
+    taxonomy = artifact['taxonomy']
+    return (
+        (artifact['taxonomic_id'], artifact['path'])
+        + tuple(taxonomy.get(rank) for rank in TAXONOMY_RANKS)
+        + (artifact['species'], artifact['depth'], artifact['size'])
+    )
+
+
+ROWS = {'primitive': primitive_row, 'taxonomy': taxonomy_row}
+
+
+class ColumnarWriter:
+    """
+    Streams records of one kind into a Parquet file, BATCH_SIZE rows per
+    row group. Like RegistryWriter it writes <path>.tmp and close() renames
+    it into place.
+    """
+
+    def __init__(self, path, kind):
+        self.schema = arrow_schema(kind)
+        self.row = ROWS[kind]
+        self.path = os.fspath(path)
+        self.tmp_path = self.path + '.tmp'
+        self.writer = pq.ParquetWriter(self.tmp_path, self.schema, compression='zstd')
+        self.rows = []
+        self.count = 0
+
+    def add(self, artifact):
+        self.rows.append(self.row(artifact))
+        if len(self.rows) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows as one row group."""
+        if not self.rows:
+            return
+        columns = zip(*self.rows)
+        arrays = [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.count += len(self.rows)
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+
+
+class ColumnarStage(Stage):
+    """
+    Walker stage that writes primitive.parquet and taxonomy.parquet. It
+    reads the primitive record from entry.info, so it must come after
+    PrimitiveStage.
+    """
+
+    def __init__(self, out_dir):
+        out = Path(out_dir)
+        self.primitive = ColumnarWriter(out / 'primitive.parquet', 'primitive')
+        self.taxonomy = ColumnarWriter(out / 'taxonomy.parquet', 'taxonomy')
+
+    def on_file(self, entry):
+        self.primitive.add(entry.info['primitive'])
+        self.taxonomy.add(taxonomy_record(entry.parts, entry.size))
+
+    def finish(self):
+        self.primitive.close()
+        self.taxonomy.close()
+
+
+def export_jsonl(jsonl_path, parquet_path, kind):
+    """Convert an existing primitive/taxonomy JSONL file; returns the row count."""
+    writer = ColumnarWriter(parquet_path, kind)
+    with open(jsonl_path) as f:
+        for line in f:
+            if line.strip():
+                writer.add(json.loads(line))
+    writer.close()
+    return writer.count
+
+
+def record_kind(parquet_file):
+    return parquet_file.schema_arrow.metadata[b'arkadu.kind'].decode()
+
+
+def iter_columns(path, columns, batch_size=BATCH_SIZE):
+    """
+    Yield {column: list of values} per batch, decoding only the given
+    columns (names as in arrow_schema, e.g. 'kingdom' or 'schema').
+    """
+    require_pyarrow()
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+        yield {name: batch.column(name).to_pylist() for name in columns}
+
+
+def read_columns(path, columns):
+    """Whole columns as {column: list of values}."""
+    require_pyarrow()
+    table = pq.read_table(path, columns=columns)
+    return {name: table.column(name).to_pylist() for name in columns}
+
+
+def build_field(field, values):
+    """One nested JSONL field of a record from its column values."""
+    if field == 'pattern':
+        schema, fields = values
+        pattern = {'schema': schema}
+        if fields is not None:
+            pattern.update(json.loads(fields))
+        return pattern
+    if field == 'prompts':
+        has_prompts, sample_prompt, entry_count = values
+        if not has_prompts:
+            return {'has_prompts': False}
+        return {'has_prompts': True, 'sample_prompt': sample_prompt, 'entry_count': entry_count}
+    if field == 'taxonomy':
+        taxonomy = {rank: value for rank, value in zip(TAXONOMY_RANKS, values) if value is not None}
+        taxonomy['species'] = values[-1]
+        return taxonomy
+    raise ValueError(f"{field!r} is not a nested field")
+
+
+def read_records(path, fields=None):
+    """
+    Yield records shaped like their JSONL lines. With fields, only those
+    keys are read and returned; fields this kind of record doesn't have
+    are skipped (a JSONL record would not have them either).
+    """
+    require_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    layout = FIELDS[record_kind(parquet_file)]
+    fields = [f for f in (fields or layout) if f in layout]
+    columns = list(dict.fromkeys(c for f in fields for c in layout[f]))
+    if not columns:
+        for _ in range(parquet_file.metadata.num_rows):
+            yield {}
+        return
+
+    for batch in parquet_file.iter_batches(batch_size=BATCH_SIZE, columns=columns):
+        data = {name: batch.column(name).to_pylist() for name in columns}
+        values = []
+        for f in fields:
+            if len(layout[f]) == 1 and f not in NESTED:
+                values.append(data[layout[f][0]])
+            else:
+                values.append([build_field(f, v) for v in zip(*(data[c] for c in layout[f]))])
+        for row in zip(*values):
+            yield dict(zip(fields, row))
+
+
+# Convert existing scan output
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export sys/*.jsonl as Parquet')
+    parser.add_argument('--sys', type=Path, default=Path(__file__).resolve().parent.parent / 'sys',
+                        help='directory holding primitive.jsonl and taxonomy.jsonl')
+    args = parser.parse_args()
+
+    try:
+        require_pyarrow()
+    except ImportError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print("ARKADU Columnar Export v1.0")
+    print("=" * 50)
+    for kind in ('primitive', 'taxonomy'):
+        jsonl_path = args.sys / f'{kind}.jsonl'
+        if not jsonl_path.exists():
+            print(f"  - {jsonl_path} not found, skipped")
+            continue
+        parquet_path = args.sys / f'{kind}.parquet'
+        count = export_jsonl(jsonl_path, parquet_path, kind)
+        jsonl_mb = jsonl_path.stat().st_size / 1024 / 1024
+        parquet_mb = parquet_path.stat().st_size / 1024 / 1024
+        print(f"✓ {kind}: {count} records, {jsonl_mb:.1f} MB JSONL → {parquet_mb:.1f} MB Parquet")
@@ -7,42 +7,61 @@ Comprehensive analysis of ALL files:
 - JSON content analysis (read every .json file)
 - Dependency mapping (which files reference which)
 - Generation tracking (which code generates which files)
+
+File contents are not copied into the analyses: each file is stored once in
+deep/blobs/ by its SHA-256 (see blob_store.py) and its record holds the hash.
 """
 
+import argparse
 import json
+import os
 import re
 import ast
+import heapq
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from walker import walk
+from exclude import ExcludeRules, add_exclude_args, default_rules, rules_from_args
+from framed import add_compress_args, copy_file, framed_path, open_output, open_text, resolve
+from blob_store import BlobStore
+
+# Chunks per worker: enough to even out stragglers, few enough to keep
+# per-task overhead negligible
+CHUNKS_PER_WORKER = 4
+
+BLOB_DIR = 'ARKADU/deep/blobs'
 
 def load_original_manifest():
-    """Load the original full media-manifest.json"""
+    """Load the original full media-manifest.json (or its .gz/.zst)"""
     try:
-        with open('media-manifest.json') as f:
+        with open_text(resolve('media-manifest.json')) as f:
             data = json.load(f)
         return data
     except:
         return {}
 
-def deep_scan_python_file(py_path):
+def deep_scan_python_file(py_path, store):
     """
     Deep analysis of Python file:
-    - Read full source code
+    - Store full source code as a blob
     - Extract file references (paths in strings)
     - Find subprocess calls (ffmpeg, etc.)
     - Parse imports
     - Find output file generation
     """
     try:
-        source = py_path.read_text(encoding='utf-8', errors='ignore')
+        raw = py_path.read_bytes()
     except:
         return None
+    source = raw.decode('utf-8', errors='ignore')
     
     analysis = {
         'path': str(py_path),
-        'size': py_path.stat().st_size,
+        'size': len(raw),
         'lines': len(source.split('\n')),
-        'source': source,  # Full source code
+        'blob': store.put(raw),  # Full source code, by hash
         'file_references': [],
         'subprocess_calls': [],
         'imports': [],
@@ -94,26 +113,26 @@ def deep_scan_python_file(py_path):
     
     return analysis
 
-def deep_scan_json_file(json_path):
+def deep_scan_json_file(json_path, store):
     """
     Deep analysis of JSON file:
-    - Read full content
+    - Store full content as a blob
     - Detect structure (array, object)
     - Count entries
     - Sample data
     - Find prompts/ekphrasis
     """
     try:
-        content = json_path.read_text(encoding='utf-8', errors='ignore')
+        raw = json_path.read_bytes()
+        content = raw.decode('utf-8', errors='ignore')
         data = json.loads(content)
     except:
         return None
     
     analysis = {
         'path': str(json_path),
-        'size': json_path.stat().st_size,
-        'content': content,  # Full JSON content
-        'data': data,  # Parsed data
+        'size': len(raw),
+        'blob': store.put(raw),  # Full JSON content, by hash
         'structure': type(data).__name__,
         'has_prompts': 'operativeEkphrasis' in content,
         'file_references': []
@@ -132,6 +151,8 @@ def deep_scan_json_file(json_path):
                     for item in data[:5]
                     if 'operativeEkphrasis' in item
                 ]
+    elif isinstance(data, dict):
+        analysis['keys'] = list(data)[:50]
     
     # Find file path references in JSON
     for match in re.finditer(r'["\']([^"\']+\.(mp4|png|jpg|wav|mp3|json))["\']', content, re.IGNORECASE):
@@ -196,8 +217,100 @@ def build_dependency_graph(py_analyses, json_analyses, media_manifest):
     
     return graph
 
-def run_deep_scan():
-    """Run complete deep scan"""
+def find_code_and_data(root_path='.', exclude=None):
+    """One walk collecting every .py and .json file (excluded subtrees pruned)"""
+    py_files = []
+    json_files = []
+    for entry in walk(root_path, exclude=exclude):
+        if entry.is_dir:
+            continue
+        if entry.suffix == '.py':
+            py_files.append(Path(entry.path))
+        elif entry.suffix == '.json':
+            json_files.append(Path(entry.path))
+    return py_files, json_files
+
+SCANNERS = {
+    'python': deep_scan_python_file,
+    'json': deep_scan_json_file
+}
+
+def scan_chunk(kind, paths, blob_dir):
+    """
+    Worker task: analyse a chunk of files. File contents go straight into
+    the blob store, so only the analyses cross the process boundary.
+    """
+    scan = SCANNERS[kind]
+    store = BlobStore(blob_dir)
+    return [scan(Path(path), store) for path in paths]
+
+def balanced_chunks(paths, n_chunks):
+    """
+    Split paths into at most n_chunks lists of roughly equal total size
+    (largest file first onto the lightest chunk). Chunks hold indices.
+    """
+    def size_of(path):
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+    
+    sizes = [size_of(path) for path in paths]
+    n_chunks = max(1, min(n_chunks, len(paths)))
+    chunks = [[] for _ in range(n_chunks)]
+    loads = [(0, c) for c in range(n_chunks)]
+    for i in sorted(range(len(paths)), key=lambda i: sizes[i], reverse=True):
+        load, c = heapq.heappop(loads)
+        chunks[c].append(i)
+        heapq.heappush(loads, (load + sizes[i], c))
+    return [sorted(chunk) for chunk in chunks if chunk]
+
+def scan_files(kind, paths, workers=1, progress=True, blob_dir=BLOB_DIR):
+    """
+    Analyse paths with the scanner for kind ('python' or 'json'), storing
+    file contents in the blob store at blob_dir.
+    With workers > 1 the files are spread over a process pool in
+    size-balanced chunks; results come back in the same order as the
+    serial scan, and files that fail to scan are skipped either way.
+    """
+    label = 'Python' if kind == 'python' else 'JSON'
+    scan = SCANNERS[kind]
+    store = BlobStore(blob_dir)
+    
+    if workers <= 1 or len(paths) < 2:
+        analyses = []
+        for i, path in enumerate(paths):
+            if progress and i % 50 == 0:
+                print(f"  Scanned {i}/{len(paths)} {label} files...")
+            analysis = scan(path, store)
+            if analysis:
+                analyses.append(analysis)
+        return analyses
+    
+    chunks = balanced_chunks(paths, workers * CHUNKS_PER_WORKER)
+    results = [None] * len(paths)
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(scan_chunk, kind, [os.fspath(paths[i]) for i in chunk],
+                        os.fspath(blob_dir)): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            for i, analysis in zip(futures[future], future.result()):
+                results[i] = analysis
+            previous, done = done, done + len(futures[future])
+            if progress and done // 50 > previous // 50:
+                print(f"  Scanned {done}/{len(paths)} {label} files...")
+    
+    return [analysis for analysis in results if analysis]
+
+def run_deep_scan(exclude=None, workers=1, compression=None, out_dir='ARKADU/deep'):
+    """
+    Run complete deep scan (workers > 1: analyse files on a process pool;
+    compression: write deep/*.json as framed .gz/.zst; out_dir: where the
+    analyses and blobs go, e.g. outside a read-only archive)
+    """
     print("ARKADU Deep Scanner")
     print("=" * 60)
     
@@ -207,36 +320,32 @@ def run_deep_scan():
     print(f"  Loaded manifest with {len(manifest.get('images', []))} images, "
           f"{len(manifest.get('videos', []))} videos")
     
-    # 2. Deep scan all Python files
+    # 2. Deep scan all Python files (not our own output: its JSON changes every run)
+    exclude = default_rules() if exclude is None else exclude
+    exclude = ExcludeRules(exclude.patterns + ['/ARKADU/deep/'])
+    py_files, json_files = find_code_and_data('.', exclude)
+    blob_dir = os.path.join(out_dir, 'blobs')
+    store = BlobStore(blob_dir)
+    previous_blobs = store.digests()
+    
     print("\n[2/4] Deep scanning Python files...")
-    py_files = list(Path('.').rglob('*.py'))
-    py_files = [f for f in py_files if '.venv' not in str(f) and 'site-packages' not in str(f)]
     
-    py_analyses = []
-    for i, py_file in enumerate(py_files):
-        if i % 50 == 0:
-            print(f"  Scanned {i}/{len(py_files)} Python files...")
-        analysis = deep_scan_python_file(py_file)
-        if analysis:
-            py_analyses.append(analysis)
+    py_analyses = scan_files('python', py_files, workers, blob_dir=blob_dir)
     
     print(f"  ✓ Analyzed {len(py_analyses)} Python files")
     
     # 3. Deep scan all JSON files
     print("\n[3/4] Deep scanning JSON files...")
-    json_files = list(Path('.').rglob('*.json'))
-    json_files = [f for f in json_files if '.venv' not in str(f) and 'node_modules' not in str(f)]
-    
-    json_analyses = []
-    for i, json_file in enumerate(json_files):
-        if i % 50 == 0:
-            print(f"  Scanned {i}/{len(json_files)} JSON files...")
-        analysis = deep_scan_json_file(json_file)
-        if analysis:
-            json_analyses.append(analysis)
+    json_analyses = scan_files('json', json_files, workers, blob_dir=blob_dir)
     
     print(f"  ✓ Analyzed {len(json_analyses)} JSON files")
     
+    # Blobs of files that changed or disappeared since the last run
+    blobs = {analysis['blob'] for analysis in py_analyses + json_analyses}
+    pruned = store.prune(blobs)
+    print(f"  ✓ {blob_dir}: {len(blobs)} blobs ({len(blobs - previous_blobs)} new, "
+          f"{len(blobs & previous_blobs)} reused, {pruned} pruned)")
+    
     # 4. Build dependency graph
     print("\n[4/4] Building dependency graph...")
     graph = build_dependency_graph(py_analyses, json_analyses, manifest)
@@ -246,31 +355,41 @@ def run_deep_scan():
     print("\n" + "=" * 60)
     print("Saving outputs...")
     
-    Path('ARKADU/deep').mkdir(parents=True, exist_ok=True)
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
     
     # Save Python analyses
-    with open('ARKADU/deep/python_files.json', 'w') as f:
+    with open_output(os.path.join(out_dir, 'python_files.json'), compression) as f:
         json.dump(py_analyses, f, indent=2)
-    print(f"  ✓ ARKADU/deep/python_files.json ({len(py_analyses)} files)")
+    print(f"  ✓ {framed_path(os.path.join(out_dir, 'python_files.json'), compression)} ({len(py_analyses)} files)")
     
     # Save JSON analyses  
-    with open('ARKADU/deep/json_files.json', 'w') as f:
+    with open_output(os.path.join(out_dir, 'json_files.json'), compression) as f:
         json.dump(json_analyses, f, indent=2)
-    print(f"  ✓ ARKADU/deep/json_files.json ({len(json_analyses)} files)")
+    print(f"  ✓ {framed_path(os.path.join(out_dir, 'json_files.json'), compression)} ({len(json_analyses)} files)")
     
     # Save dependency graph
-    with open('ARKADU/deep/dependency_graph.json', 'w') as f:
+    with open_output(os.path.join(out_dir, 'dependency_graph.json'), compression) as f:
         json.dump(graph, f, indent=2)
-    print(f"  ✓ ARKADU/deep/dependency_graph.json")
+    print(f"  ✓ {framed_path(os.path.join(out_dir, 'dependency_graph.json'), compression)}")
     
     # Copy original manifest
-    import shutil
-    shutil.copy('media-manifest.json', 'ARKADU/deep/media_manifest.json')
-    print(f"  ✓ ARKADU/deep/media_manifest.json (original preserved)")
+    source = resolve('media-manifest.json')
+    if Path(source).exists():
+        target = copy_file(source, os.path.join(out_dir, 'media_manifest.json'), compression)
+        print(f"  ✓ {target} (original preserved)")
+    else:
+        print(f"  - media-manifest.json not found, nothing to preserve")
     
     print("\n" + "=" * 60)
     print("✓ Deep scan complete")
     print("=" * 60)
 
 if __name__ == '__main__':
-    run_deep_scan()
+    parser = argparse.ArgumentParser(description='ARKADU deep scan')
+    add_exclude_args(parser)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processes for the .py/.json analysis (default: 1, serial)')
+    add_compress_args(parser)
+    args = parser.parse_args()
+    
+    run_deep_scan(exclude=rules_from_args(args), workers=args.workers, compression=args.compress)
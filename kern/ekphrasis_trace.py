@@ -5,58 +5,81 @@ Maps operative ekphrasis chains:
   JSON (prompts) → Python (assembly scripts) → Media (generated output)
 """
 
+import argparse
 import json
 import re
 import ast
 from pathlib import Path
 from collections import defaultdict
 
-def find_json_with_prompts():
+from walker import Stage, walk
+from exclude import add_exclude_args, rules_from_args
+from framed import add_compress_args, framed_path, open_output
+from primitive_scan import prompt_probe
+
+def prompt_file_record(path, probe):
+    """
+    Describe a JSON prompt file for chain building.
+    """
+    return {
+        'path': path,
+        'entry_count': probe['entry_count'],
+        'sample_prompts': [p[:80] for p in probe['head'] if p is not None]
+    }
+
+def is_script(entry):
+    """
+    True for Python scripts (site-packages/ is pruned by the default excludes).
+    """
+    return entry.suffix == '.py'
+
+def find_json_with_prompts(root_path='.', exclude=None):
     """
     Find all JSON files containing operativeEkphrasis.
     """
     prompt_files = []
-    root = Path('.')
     
-    for json_file in root.rglob('*.json'):
-        # Skip venv/cache
-        if any(skip in str(json_file) for skip in ['.venv', 'node_modules', '__pycache__']):
+    for entry in walk(root_path, exclude=exclude):
+        if entry.is_dir or entry.suffix != '.json':
             continue
-        
-        try:
-            content = json_file.read_text(encoding='utf-8', errors='ignore')
-            if 'operativeEkphrasis' in content:
-                data = json.loads(content)
-                if isinstance(data, list):
-                    prompt_files.append({
-                        'path': str(json_file),
-                        'entry_count': len(data),
-                        'sample_prompts': [
-                            item.get('operativeEkphrasis', '')[:80]
-                            for item in data[:3]
-                            if 'operativeEkphrasis' in item
-                        ]
-                    })
-        except:
-            pass
+        probe = prompt_probe(entry)
+        if probe:
+            prompt_files.append(prompt_file_record(entry.path, probe))
     
     return prompt_files
 
-def find_python_scripts():
+def find_python_scripts(root_path='.', exclude=None):
     """
     Find all Python scripts (exclude venv).
     """
-    scripts = []
-    root = Path('.')
-    
-    for py_file in root.rglob('*.py'):
-        # Skip venv/cache
-        if any(skip in str(py_file) for skip in ['.venv', 'venv', 'node_modules', '__pycache__', 'site-packages']):
-            continue
-        
-        scripts.append(py_file)
+    return [Path(entry.path) for entry in walk(root_path, exclude=exclude)
+            if not entry.is_dir and is_script(entry)]
+
+class EkphrasisStage(Stage):
+    """
+    Walker stage that collects prompt files and scripts during the shared walk,
+    then builds chains (and optionally writes sys/ekphrasis.jsonl) at the end.
+    """
     
-    return scripts
+    def __init__(self, output_path=None, compression=None):
+        self.output_path = output_path
+        self.compression = compression
+        self.prompt_files = []
+        self.scripts = []
+        self.chains = []
+    
+    def on_file(self, entry):
+        if entry.suffix == '.json':
+            probe = prompt_probe(entry)
+            if probe:
+                self.prompt_files.append(prompt_file_record(entry.path, probe))
+        elif is_script(entry):
+            self.scripts.append(Path(entry.path))
+    
+    def finish(self):
+        self.chains = build_ekphrasis_chains(self.prompt_files, self.scripts)
+        if self.output_path:
+            write_chains(self.output_path, self.chains, self.compression)
 
 def trace_json_usage_in_script(script_path):
     """
@@ -119,16 +142,19 @@ def trace_ffmpeg_usage_in_script(script_path):
     
     return ffmpeg_calls
 
-def build_ekphrasis_chains():
+def build_ekphrasis_chains(prompt_files=None, scripts=None, exclude=None):
     """
     Connect JSON prompts → Python scripts → Video outputs.
+    Pass prompt_files/scripts collected by an earlier walk to avoid rescanning.
     """
-    print("Finding JSON files with prompts...")
-    prompt_files = find_json_with_prompts()
+    if prompt_files is None:
+        print("Finding JSON files with prompts...")
+        prompt_files = find_json_with_prompts(exclude=exclude)
     print(f"  Found {len(prompt_files)} JSON files with prompts")
     
-    print("\nFinding Python scripts...")
-    scripts = find_python_scripts()
+    if scripts is None:
+        print("\nFinding Python scripts...")
+        scripts = find_python_scripts(exclude=exclude)
     print(f"  Found {len(scripts)} Python scripts")
     
     print("\nTracing connections...")
@@ -175,12 +201,25 @@ def build_ekphrasis_chains():
     
     return chains
 
+def write_chains(output_path, chains, compression=None):
+    """
+    Write ekphrasis chains as JSONL.
+    """
+    with open_output(output_path, compression) as f:
+        for chain in chains:
+            f.write(json.dumps(chain) + '\n')
+
 # Run tracer
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ARKADU ekphrasis tracer')
+    add_exclude_args(parser)
+    add_compress_args(parser)
+    args = parser.parse_args()
+    
     print("ARKADU Ekphrasis Tracer v1.0")
     print("=" * 50)
     
-    chains = build_ekphrasis_chains()
+    chains = build_ekphrasis_chains(exclude=rules_from_args(args))
     
     print(f"\n✓ Found {len(chains)} ekphrasis chains")
     
@@ -188,11 +227,9 @@ if __name__ == '__main__':
     Path('ARKADU/sys').mkdir(parents=True, exist_ok=True)
     
     # Write output
-    with open('ARKADU/sys/ekphrasis.jsonl', 'w') as f:
-        for chain in chains:
-            f.write(json.dumps(chain) + '\n')
+    write_chains('ARKADU/sys/ekphrasis.jsonl', chains, args.compress)
     
-    print(f"✓ Output: ARKADU/sys/ekphrasis.jsonl")
+    print(f"✓ Output: {framed_path('ARKADU/sys/ekphrasis.jsonl', args.compress)}")
     
     # Show samples
     if chains:
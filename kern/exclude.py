@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+ARKADU Exclusion Rules
+Gitignore-style patterns shared by every scanner, compiled once.
+
+Supported syntax (a subset of .gitignore):
+  # comment        blank lines and comments are ignored
+  node_modules/    trailing '/' matches directories only
+  *.tmp            no '/' → matched against the name at any depth
+  /exports         leading or inner '/' → anchored to the scan root
+  CAT/**/cache     '**' spans directories; '*', '?', '[..]' stay within one
+  !keep.tmp        '!' re-includes; the last matching pattern wins
+
+Excluded directories are pruned by the walker before they are listed, so
+nothing beneath them is ever visited (as with git, a file inside an
+excluded directory cannot be re-included).
+"""
+
+import os
+import re
+
+# Replaces the old substring test, which also dropped e.g. convenvtion/ and .gitignore
+DEFAULT_EXCLUDES = (
+    '.venv/',
+    'venv/',
+    '__pycache__/',
+    '.git/',
+    'node_modules/',
+    'site-packages/',
+)
+
+IGNORE_FILE = '.arkaduignore'
+
+_GLOB_CHARS = re.compile(r'[*?\[\\]')
+
+
+def _translate(pattern):
+    """Translate one glob pattern (no leading '!' or '/') to a regex body."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 2] == '**':
+                if pattern[i + 2:i + 3] == '/':
+                    out.append('(?:.*/)?')
+                    i += 3
+                else:
+                    out.append('.*')
+                    i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            j = pattern.find(']', i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class Rule:
+    """One compiled pattern."""
+
+    __slots__ = ('pattern', 'negate', 'dir_only', 'anchored', 'literal', 'regex')
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        body = pattern
+        self.negate = body.startswith('!')
+        if self.negate:
+            body = body[1:]
+        self.dir_only = body.endswith('/')
+        body = body.rstrip('/')
+        self.anchored = '/' in body
+        body = body.lstrip('/')
+
+        # Plain names (node_modules, .venv) compare as strings, no regex needed
+        self.literal = None if (self.anchored or _GLOB_CHARS.search(body)) else body
+        self.regex = None if self.literal else re.compile(_translate(body) + r'\Z')
+
+    def matches(self, rel, name, is_dir):
+        if self.dir_only and not is_dir:
+            return False
+        if self.literal is not None:
+            return name == self.literal
+        return self.regex.match(rel if self.anchored else name) is not None
+
+
+class ExcludeRules:
+    """
+    Ordered rule set. match(rel, is_dir) answers "is this path excluded?".
+    Rules without negations take a fast path: a set lookup for plain
+    names plus one combined regex for everything else.
+    """
+
+    def __init__(self, patterns=()):
+        self.patterns = []
+        self.rules = []
+        for line in patterns:
+            line = line.rstrip('\n').rstrip()
+            if not line or line.startswith('#'):
+                continue
+            self.patterns.append(line)
+            self.rules.append(Rule(line))
+
+        self.has_negation = any(rule.negate for rule in self.rules)
+        self.names = {r.literal for r in self.rules if r.literal is not None and not r.dir_only}
+        self.dir_names = {r.literal for r in self.rules if r.literal is not None and r.dir_only}
+        self._combined = {
+            is_dir: self._combine([r for r in self.rules
+                                   if r.literal is None and (is_dir or not r.dir_only)])
+            for is_dir in (False, True)
+        }
+
+    @staticmethod
+    def _combine(rules):
+        """Join several compiled rules into one alternation over (name, rel)."""
+        if not rules:
+            return None
+        alternatives = []
+        for rule in rules:
+            body = rule.regex.pattern[:-2]  # drop the \Z
+            prefix = 'R' if rule.anchored else 'N'
+            alternatives.append(f'(?:{prefix}:{body})')
+        return re.compile('(?:' + '|'.join(alternatives) + r')\Z')
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def match(self, rel, is_dir):
+        """True if rel (path relative to the scan root) is excluded."""
+        if not self.rules:
+            return False
+        rel = rel.replace(os.sep, '/')
+        name = rel.rsplit('/', 1)[-1]
+
+        if not self.has_negation:
+            if name in self.names or (is_dir and name in self.dir_names):
+                return True
+            combined = self._combined[is_dir]
+            if combined is None:
+                return False
+            return (combined.match('N:' + name) is not None or
+                    combined.match('R:' + rel) is not None)
+
+        # Last matching rule wins
+        for rule in reversed(self.rules):
+            if rule.matches(rel, name, is_dir):
+                return not rule.negate
+        return False
+
+
+NO_EXCLUDES = ExcludeRules()
+
+
+def read_patterns(path):
+    """Read patterns from a gitignore-style file."""
+    with open(path, encoding='utf-8') as f:
+        return f.readlines()
+
+
+def load_rules(root='.', exclude=(), exclude_from=None, defaults=True):
+    """
+    Build the rule set for a scan: defaults, then the config file
+    (exclude_from, or <root>/.arkaduignore if it exists), then CLI patterns.
+    Later patterns override earlier ones.
+    """
+    patterns = list(DEFAULT_EXCLUDES) if defaults else []
+    if exclude_from is None:
+        candidate = os.path.join(os.fspath(root), IGNORE_FILE)
+        if os.path.exists(candidate):
+            exclude_from = candidate
+    if exclude_from:
+        patterns.extend(read_patterns(exclude_from))
+    patterns.extend(exclude)
+    return ExcludeRules(patterns)
+
+
+def default_rules():
+    return ExcludeRules(DEFAULT_EXCLUDES)
+
+
+def add_exclude_args(parser):
+    """Shared --exclude/--exclude-from/--no-default-excludes flags."""
+    parser.add_argument('--exclude', action='append', default=[], metavar='PATTERN',
+                        help='gitignore-style pattern to exclude (repeatable)')
+    parser.add_argument('--exclude-from', metavar='FILE',
+                        help=f'pattern file (default: <root>/{IGNORE_FILE} if present)')
+    parser.add_argument('--no-default-excludes', action='store_true',
+                        help='do not exclude ' + ', '.join(DEFAULT_EXCLUDES))
+
+
+def rules_from_args(args, root='.'):
+    return load_rules(root, args.exclude, args.exclude_from, not args.no_default_excludes)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+ARKADU Fingerprint
+Content fingerprints and duplicate detection, hashing as little as possible.
+
+Candidates are narrowed in tiers:
+1. group files by size - a file with a unique size has no duplicate
+2. same-size files get a partial hash (first + last PARTIAL_BLOCK bytes)
+3. only partial-hash collisions are hashed in full
+
+Hashes are kept in sys/hash-cache.jsonl keyed by (inode, size, mtime_ns),
+so a nightly run only reads files that are new or have changed. Hard links
+(same inode) are one file on disk and never count as reclaimable.
+
+Output (sys/duplicates.jsonl), one line per duplicate group, largest
+reclaimable first:
+  {"hash": "...", "size": 1048576, "count": 3, "reclaimable": 2097152,
+   "paths": ["CAT/...", "DOG/...", "HORSE/..."]}
+"""
+
+import hashlib
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from walker import Stage
+from framed import open_output
+
+HASH_CACHE_VERSION = 1
+
+# Bytes hashed from each end of a file for the partial tier
+PARTIAL_BLOCK = 64 * 1024
+
+READ_SIZE = 1024 * 1024
+
+
+def partial_hash(path, size):
+    """Hash the head and tail of a file (the whole file if it is small)."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        if size <= 2 * PARTIAL_BLOCK:
+            h.update(f.read())
+        else:
+            h.update(f.read(PARTIAL_BLOCK))
+            f.seek(-PARTIAL_BLOCK, os.SEEK_END)
+            h.update(f.read(PARTIAL_BLOCK))
+    return h.hexdigest()
+
+
+def full_hash(path):
+    """Hash a whole file in fixed-size reads."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_SIZE), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class HashCache:
+    """
+    Persistent hashes keyed by (inode, size, mtime_ns).
+    Only keys seen during this run are saved, so deleted files drop out.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.old = {}
+        self.new = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            header = json.loads(f.readline() or '{}')
+            if header.get('version') != HASH_CACHE_VERSION:
+                return
+            for line in f:
+                record = json.loads(line)
+                key = (record['ino'], record['size'], record['mtime_ns'])
+                self.old[key] = record
+
+    def get(self, key):
+        """Return the record for key ({'partial': ..., 'full': ...} or empty)."""
+        record = self.new.get(key)
+        if record is None:
+            record = self.old.get(key)
+            if record is None:
+                record = {'ino': key[0], 'size': key[1], 'mtime_ns': key[2]}
+            self.new[key] = record
+        return record
+
+    def save(self):
+        """Write this run's hashes, replacing the old cache atomically."""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps({'version': HASH_CACHE_VERSION}) + '\n')
+            for record in self.new.values():
+                if 'partial' in record:
+                    f.write(json.dumps(record) + '\n')
+        os.replace(tmp_path, self.path)
+
+
+class FingerprintStage(Stage):
+    """
+    Walker stage that collects (path, inode, size, mtime) for every file,
+    then finds duplicate groups in finish() and writes sys/duplicates.jsonl.
+    """
+
+    def __init__(self, output_path, cache_path=None, jobs=1, compression=None):
+        self.output_path = output_path
+        self.compression = compression
+        self.cache = HashCache(cache_path) if cache_path else None
+        self.jobs = max(1, jobs)
+        self.by_size = defaultdict(list)
+        self.records = {}
+        self.groups = []
+        self.errors = 0
+        self.partial_hashed = 0
+        self.full_hashed = 0
+
+    def on_file(self, entry):
+        st = entry.stat
+        if st.st_size == 0:
+            return
+        # Inode 0 means the filesystem does not report one; key by path instead
+        inode = st.st_ino or None
+        self.by_size[st.st_size].append(
+            (entry.path, entry.rel, inode, st.st_size, st.st_mtime_ns))
+
+    # Tiers
+
+    def _record(self, candidate):
+        """Hash record for a candidate, shared by hard links and across tiers."""
+        path, rel, inode, size, mtime_ns = candidate
+        if self.cache is not None and inode is not None:
+            return self.cache.get((inode, size, mtime_ns))
+        return self.records.setdefault(inode or rel, {})
+
+    def _hash_all(self, candidates, field, compute):
+        """
+        Fill record[field] for each candidate, hashing only cache misses.
+        Returns [(candidate, digest)] for the files that could be read.
+        """
+        records = [self._record(c) for c in candidates]
+        todo = []
+        seen = set()
+        for i, record in enumerate(records):
+            if field not in record and id(record) not in seen:
+                seen.add(id(record))
+                todo.append(i)
+
+        def work(i):
+            path, rel, inode, size, mtime_ns = candidates[i]
+            try:
+                return compute(path, size)
+            except OSError:
+                return None
+
+        if self.jobs > 1 and len(todo) > 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                digests = list(pool.map(work, todo))
+        else:
+            digests = [work(i) for i in todo]
+
+        for i, digest in zip(todo, digests):
+            if digest is None:
+                self.errors += 1
+                continue
+            records[i][field] = digest
+            # Small files are read whole by the partial tier
+            if field == 'partial' and candidates[i][3] <= 2 * PARTIAL_BLOCK:
+                records[i]['full'] = digest
+
+        if field == 'partial':
+            self.partial_hashed += len(todo)
+        else:
+            self.full_hashed += len(todo)
+        return [(c, r[field]) for c, r in zip(candidates, records) if field in r]
+
+    @staticmethod
+    def _distinct(candidates):
+        """Collapse hard links: keep one candidate per inode."""
+        seen = set()
+        unique = []
+        for candidate in candidates:
+            inode = candidate[2]
+            if inode is not None:
+                if inode in seen:
+                    continue
+                seen.add(inode)
+            unique.append(candidate)
+        return unique
+
+    @staticmethod
+    def _collisions(hashed):
+        """Group (candidate, digest) pairs by digest; keep groups of 2+."""
+        by_digest = defaultdict(list)
+        for candidate, digest in hashed:
+            by_digest[digest].append(candidate)
+        return [(digest, group) for digest, group in by_digest.items() if len(group) > 1]
+
+    def find_duplicates(self):
+        """Run the size → partial → full tiers and return duplicate groups."""
+        groups = []
+        for size, candidates in self.by_size.items():
+            if len(self._distinct(candidates)) < 2:
+                continue
+
+            for _, same_partial in self._collisions(
+                    self._hash_all(candidates, 'partial', partial_hash)):
+                if len(self._distinct(same_partial)) < 2:
+                    continue
+
+                hashed = self._hash_all(same_partial, 'full', lambda path, size: full_hash(path))
+                for digest, group in self._collisions(hashed):
+                    copies = len(self._distinct(group))
+                    if copies < 2:
+                        continue
+                    groups.append({
+                        'hash': digest,
+                        'size': size,
+                        'count': len(group),
+                        'reclaimable': size * (copies - 1),
+                        'paths': sorted(c[1] for c in group)
+                    })
+
+        groups.sort(key=lambda g: (-g['reclaimable'], g['paths'][0]))
+        return groups
+
+    def finish(self):
+        self.groups = self.find_duplicates()
+        with open_output(self.output_path, self.compression) as f:
+            for group in self.groups:
+                f.write(json.dumps(group) + '\n')
+        if self.cache is not None:
+            self.cache.save()
+
+    @property
+    def reclaimable(self):
+        return sum(group['reclaimable'] for group in self.groups)
+
+
+def format_bytes(n):
+    """Human-readable byte count (1.5 GB)."""
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if n < 1024 or unit == 'TB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def print_fingerprint_summary(stage):
+    """Report duplicate groups and how much hashing the cache saved."""
+    print(f"✓ Duplicates: {len(stage.groups)} groups, "
+          f"{format_bytes(stage.reclaimable)} reclaimable "
+          f"({stage.partial_hashed} partial / {stage.full_hashed} full hashes computed)")
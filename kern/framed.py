@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+ARKADU Framed Compression
+Block-compressed output for sys/*.jsonl, deep/*.json and the manifests.
+
+A framed file is a run of independently compressed blocks of about
+BLOCK_SIZE bytes, each cut at a line end:
+
+  gzip  every block is one gzip member. Its header's extra field (subfield
+        'AK') holds the member's length and the number of lines in it.
+        gzip -d / zcat read the members as one stream.
+  zstd  every block is one zstd frame, preceded by a skippable frame that
+        holds the same length + line count. zstd -d / zstdcat skip it.
+
+Block lengths are in the headers, so a reader can list every block without
+decompressing anything. It can then inflate blocks on a thread pool (zlib
+and zstd release the GIL), or find line n from the per-block line counts
+and decompress only that block.
+
+Writers take compression='gzip' or 'zstd' (--compress on the command line),
+and the file name gets .gz or .zst appended. Readers accept plain or framed
+files (resolve() finds whichever exists). zstd needs the zstandard package
+(pip install zstandard); gzip needs nothing beyond the standard library.
+
+Usage:
+  python3 ARKADU/kern/framed.py ARKADU/sys/primitive.jsonl --compress zstd   # compress a file
+  python3 ARKADU/kern/framed.py ARKADU/sys/primitive.jsonl.zst               # list its blocks
+"""
+
+import argparse
+import bisect
+import gzip
+import io
+import json
+import os
+import shutil
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BLOCK_SIZE = 1 << 20         # uncompressed bytes per block (rounded up to a line end)
+COMPRESSIONS = ('gzip', 'zstd')
+SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+LEVELS = {'gzip': 6, 'zstd': 3}
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+SKIPPABLE_MAGIC = 0x184D2A5A     # one of the 16 zstd skippable-frame magics
+BLOCK_INFO = struct.Struct('<II')   # block length in bytes, lines
+
+# gzip member header: magic, CM=deflate, FLG=FEXTRA, MTIME=0, XFL, OS=unknown,
+# XLEN, then one extra subfield 'AK' carrying BLOCK_INFO
+GZIP_HEADER = struct.Struct('<2sBBIBBH2sH')
+GZIP_TRAILER = struct.Struct('<II')  # CRC32, uncompressed size
+GZIP_OVERHEAD = GZIP_HEADER.size + BLOCK_INFO.size + GZIP_TRAILER.size
+SKIPPABLE_HEADER = struct.Struct('<II')  # magic, payload size
+
+READ_SIZE = 1 << 20
+
+
+def require_zstandard():
+    if zstandard is None:
+        raise ImportError("zstd output needs zstandard: pip install zstandard")
+
+
+def framed_path(path, compression):
+    """Output path for a compression (None: unchanged)."""
+    if compression is None:
+        return os.fspath(path)
+    return os.fspath(path) + SUFFIXES[compression]
+
+
+def resolve(path):
+    """
+    The file a reader should open for path: path itself, path.gz or
+    path.zst, whichever exists and was written last. Missing: path.
+    """
+    path = os.fspath(path)
+    candidates = [p for p in [path] + [path + s for s in SUFFIXES.values()] if os.path.exists(p)]
+    if not candidates:
+        return path
+    return max(candidates, key=lambda p: os.stat(p).st_mtime_ns)
+
+
+def detect(path):
+    """'gzip', 'zstd' or None (plain) from a file's first bytes."""
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    if head[:2] == GZIP_MAGIC:
+        return 'gzip'
+    if head == ZSTD_MAGIC or (len(head) == 4 and
+                              int.from_bytes(head, 'little') & 0xFFFFFFF0 == 0x184D2A50):
+        return 'zstd'
+    return None
+
+
+def count_lines(block):
+    """Non-empty lines in a block of bytes."""
+    lines = block.split(b'\n')
+    return len(lines) - lines.count(b'')
+
+
+# Writing
+
+def gzip_block(data, lines, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    body = compressor.compress(data) + compressor.flush()
+    length = GZIP_OVERHEAD + len(body)
+    header = GZIP_HEADER.pack(GZIP_MAGIC, 8, 4, 0, 0, 255,
+                              4 + BLOCK_INFO.size, b'AK', BLOCK_INFO.size)
+    return (header + BLOCK_INFO.pack(length, lines) + body
+            + GZIP_TRAILER.pack(zlib.crc32(data), len(data) & 0xFFFFFFFF))
+
+
+def zstd_block(data, lines, compressor):
+    frame = compressor.compress(data)
+    return (SKIPPABLE_HEADER.pack(SKIPPABLE_MAGIC, BLOCK_INFO.size)
+            + BLOCK_INFO.pack(len(frame), lines) + frame)
+
+
+class FramedWriter:
+    """
+    Text file-like writer producing a framed file. Like the other writers
+    it writes <path>.tmp and close() renames it into place.
+    """
+
+    def __init__(self, path, compression, block_size=BLOCK_SIZE, level=None):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"unknown compression {compression!r}")
+        level = LEVELS[compression] if level is None else level
+        if compression == 'zstd':
+            require_zstandard()
+            compressor = zstandard.ZstdCompressor(level=level, write_content_size=True)
+            self.encode = lambda data, lines: zstd_block(data, lines, compressor)
+        else:
+            self.encode = lambda data, lines: gzip_block(data, lines, level)
+        self.path = os.fspath(path)
+        self.tmp_path = self.path + '.tmp'
+        self.compression = compression
+        self.block_size = block_size
+        self.output = open(self.tmp_path, 'wb')
+        self.buffer = bytearray()
+        self.blocks = 0
+        self.raw_bytes = 0
+
+    def write(self, text):
+        self.write_bytes(text.encode('utf-8'))
+        return len(text)
+
+    def write_bytes(self, data):
+        self.buffer += data
+        if len(self.buffer) >= self.block_size:
+            end = self.buffer.rfind(b'\n') + 1
+            if end:
+                self._emit(bytes(self.buffer[:end]))
+                del self.buffer[:end]
+
+    def _emit(self, data):
+        self.output.write(self.encode(data, count_lines(data)))
+        self.blocks += 1
+        self.raw_bytes += len(data)
+
+    def close(self):
+        if self.output.closed:
+            return
+        if self.buffer or not self.blocks:
+            self._emit(bytes(self.buffer))
+            self.buffer.clear()
+        self.output.close()
+        os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            # Leave any previous file in place rather than a truncated one
+            self.output.close()
+            os.remove(self.tmp_path)
+
+
+def open_output(path, compression=None):
+    """
+    Text writer for path: a plain file, or a FramedWriter on path.gz /
+    path.zst. The caller names the uncompressed path; see framed_path().
+    """
+    if compression is None:
+        return open(path, 'w', encoding='utf-8')
+    return FramedWriter(framed_path(path, compression), compression)
+
+
+def add_compress_args(parser):
+    parser.add_argument('--compress', choices=COMPRESSIONS,
+                        help='write outputs as framed gzip/zstd blocks (.gz/.zst appended)')
+
+
+# Reading
+
+def scan_blocks(f, compression):
+    """
+    [(offset, length, lines)] of every block, from the frame headers alone;
+    None if the file was not written by FramedWriter (e.g. plain gzip).
+    """
+    blocks = []
+    offset = 0
+    size = os.fstat(f.fileno()).st_size
+    while offset < size:
+        f.seek(offset)
+        if compression == 'gzip':
+            head = f.read(GZIP_HEADER.size + BLOCK_INFO.size)
+            if len(head) < GZIP_HEADER.size + BLOCK_INFO.size:
+                return None
+            magic, _, flags, _, _, _, _, subfield, _ = GZIP_HEADER.unpack_from(head)
+            if magic != GZIP_MAGIC or not flags & 4 or subfield != b'AK':
+                return None
+            length, lines = BLOCK_INFO.unpack_from(head, GZIP_HEADER.size)
+            blocks.append((offset, length, lines))
+        else:
+            head = f.read(SKIPPABLE_HEADER.size + BLOCK_INFO.size)
+            if len(head) < SKIPPABLE_HEADER.size + BLOCK_INFO.size:
+                return None
+            magic, _ = SKIPPABLE_HEADER.unpack_from(head)
+            if magic != SKIPPABLE_MAGIC:
+                return None
+            length, lines = BLOCK_INFO.unpack_from(head, SKIPPABLE_HEADER.size)
+            blocks.append((offset + len(head), length, lines))
+            length += len(head)
+        offset += length
+    return blocks
+
+
+def decompress_block(data, compression):
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+def open_binary(path):
+    """Stream-decompressing binary reader for a plain, gzip or zstd file."""
+    compression = detect(path)
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'zstd':
+        require_zstandard()
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True,
+                                                          closefd=True)
+    return open(path, 'rb')
+
+
+def open_text(path):
+    """Stream-decompressing text reader (json.load(open_text(p)) works for any format)."""
+    return io.TextIOWrapper(open_binary(path), encoding='utf-8')
+
+
+class FramedReader:
+    """
+    Blocks of a framed file. blocks() yields them decompressed and in order,
+    inflating up to `workers` ahead on a thread pool; line(n) decompresses
+    only the block holding line n. Files without block headers (plain
+    gzip, zstd or text) are still streamed, in READ_SIZE pieces cut at line
+    ends, but have no random access.
+    """
+
+    def __init__(self, path, workers=None):
+        self.path = os.fspath(path)
+        self.compression = detect(self.path)
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.index = None
+        if self.compression:
+            with open(self.path, 'rb') as f:
+                self.index = scan_blocks(f, self.compression)
+        if self.index is not None:
+            self.starts = [0]
+            for _, _, lines in self.index:
+                self.starts.append(self.starts[-1] + lines)
+        self._cached = (None, None)
+
+    def __len__(self):
+        """Number of non-empty lines."""
+        if self.index is None:
+            return sum(count_lines(block) for block in self.blocks())
+        return self.starts[-1]
+
+    def read_block(self, i):
+        offset, length, _ = self.index[i]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return decompress_block(f.read(length), self.compression)
+
+    def blocks(self):
+        if self.index is None:
+            yield from self._stream()
+            return
+        with open(self.path, 'rb') as f:
+            def raw():
+                for offset, length, _ in self.index:
+                    f.seek(offset)
+                    yield f.read(length)
+            if self.workers == 1 or len(self.index) == 1:
+                for data in raw():
+                    yield decompress_block(data, self.compression)
+                return
+            # Keep a bounded window of blocks in flight, so memory stays flat
+            with ThreadPoolExecutor(self.workers) as pool:
+                pending = []
+                source = raw()
+                for data in islice(source, self.workers * 2):
+                    pending.append(pool.submit(decompress_block, data, self.compression))
+                while pending:
+                    block = pending.pop(0).result()
+                    for data in islice(source, 1):
+                        pending.append(pool.submit(decompress_block, data, self.compression))
+                    yield block
+
+    def _stream(self):
+        with open_binary(self.path) as f:
+            tail = b''
+            while True:
+                chunk = f.read(READ_SIZE)
+                if not chunk:
+                    if tail:
+                        yield tail
+                    return
+                chunk = tail + chunk
+                end = chunk.rfind(b'\n') + 1
+                tail = chunk[end:]
+                if end:
+                    yield chunk[:end]
+
+    def lines(self):
+        """Non-empty lines as bytes, without their newline."""
+        for block in self.blocks():
+            for line in block.split(b'\n'):
+                if line.strip():
+                    yield line
+
+    def line(self, n):
+        """The n-th non-empty line (bytes)."""
+        if self.index is None:
+            raise ValueError(f"{self.path}: no block headers, so no random access "
+                             f"(re-write it with FramedWriter)")
+        if not 0 <= n < self.starts[-1]:
+            raise IndexError(f'line {n} out of range ({self.starts[-1]} lines)')
+        block_no = bisect.bisect_right(self.starts, n) - 1
+        cached_no, lines = self._cached
+        if cached_no != block_no:
+            lines = [line for line in self.read_block(block_no).split(b'\n') if line.strip()]
+            self._cached = (block_no, lines)
+        return lines[n - self.starts[block_no]]
+
+    def read(self):
+        """The whole decompressed content, blocks inflated in parallel."""
+        return b''.join(self.blocks())
+
+
+def load_json(path, workers=None):
+    """json.load for a plain or framed file (path resolved as in resolve())."""
+    return json.loads(FramedReader(resolve(path), workers).read())
+
+
+def copy_file(src, dst, compression=None):
+    """Copy a plain or framed file to dst, written as `compression`; returns dst's path."""
+    dst = framed_path(dst, compression)
+    with open_binary(src) as f:
+        if compression is None:
+            with open(dst, 'wb') as out:
+                shutil.copyfileobj(f, out, READ_SIZE)
+        else:
+            with FramedWriter(dst, compression) as out:
+                for chunk in iter(lambda: f.read(READ_SIZE), b''):
+                    out.write_bytes(chunk)
+    return dst
+
+
+def compress_file(path, compression):
+    """Write path + suffix as a framed copy of path; returns the writer."""
+    with open(path, 'rb') as src, FramedWriter(framed_path(path, compression), compression) as writer:
+        for chunk in iter(lambda: src.read(READ_SIZE), b''):
+            writer.write_bytes(chunk)
+    return writer
+
+
+# Compress or inspect a file
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Framed gzip/zstd files')
+    parser.add_argument('path', help='file to compress, or a framed file to list')
+    add_compress_args(parser)
+    args = parser.parse_args()
+
+    try:
+        if args.compress:
+            start = time.perf_counter()
+            writer = compress_file(args.path, args.compress)
+            seconds = time.perf_counter() - start
+            size = os.path.getsize(writer.path)
+            print(f"✓ {writer.path}: {writer.blocks} blocks, "
+                  f"{writer.raw_bytes / 1024 / 1024:.1f} MB → {size / 1024 / 1024:.1f} MB "
+                  f"({writer.raw_bytes / max(size, 1):.1f}x, {seconds:.1f}s)")
+        else:
+            reader = FramedReader(args.path)
+            if reader.index is None:
+                print(f"  {args.path}: {reader.compression or 'plain'}, no block headers")
+            else:
+                print(f"✓ {args.path}: {reader.compression}, {len(reader.index)} blocks, "
+                      f"{len(reader)} lines")
+    except ImportError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+ARKADU Fused Scanner
+One directory walk feeds every scanner stage:
+- primitive records      → sys/primitive.jsonl
+- taxonomy + chambers    → sys/taxonomy.jsonl, sys/chambers.jsonl
+- prompt detection       → sys/ekphrasis.jsonl
+- media catalog + HTML   → media-manifest.json
+- duplicates (optional)  → sys/duplicates.jsonl
+- registry (optional)    → sys/registry.db (SQLite, see query.py)
+- columnar (optional)    → sys/primitive.parquet, sys/taxonomy.parquet
+- path trie (optional)   → sys/{paths,primitive,taxonomy}.trie.jsonl
+- rollup cube (optional) → sys/cube.json
+- hierarchy (optional)   → sys/primitive.jsonl.hier (node table shared by the tools)
+- tiles (optional)       → sys/tiles/ (primitive records sharded for the viewers)
+
+With --compress gzip|zstd the JSONL and the manifest are written as framed
+.gz/.zst files (see framed.py).
+"""
+
+import argparse
+import importlib.util
+from pathlib import Path
+
+from walker import WalkStats, run_stages
+from exclude import rules_from_args
+from primitive_scan import (PrimitiveStage, add_walk_args, open_cache, print_cache_summary,
+                            print_schema_counts)
+from taxonomy_scan import TaxonomyStage, generate_chamber_summaries, write_chamber_summaries
+from ekphrasis_trace import EkphrasisStage
+from fingerprint import FingerprintStage, print_fingerprint_summary
+from registry_db import RegistryStage, RegistryWriter
+from columnar import ColumnarStage
+from path_trie import TrieStage
+from rollup_cube import CubeStage
+from hierarchy import HierarchyStage
+from tiles import build_tiles, print_tiles_summary
+from framed import add_compress_args, framed_path
+
+ARKADU_DIR = Path(__file__).resolve().parent.parent
+
+def load_archaeologist():
+    """Import MediaArchaeologist from arkadu-scan.py (hyphenated, so not importable by name)."""
+    spec = importlib.util.spec_from_file_location('arkadu_scan', ARKADU_DIR / 'arkadu-scan.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.MediaArchaeologist
+
+def fused_scan(root_path='.', out_dir='ARKADU/sys', manifest_path='media-manifest.json',
+               cache=None, jobs=1, exclude=None, fingerprint=False, registry=False,
+               parquet=False, trie=False, cube=False, hierarchy=False, tiles=False,
+               compression=None, manifest_indent=2):
+    """
+    Walk root_path once and write every scanner output.
+    With a StatCache, unchanged files reuse last run's stage results.
+    With fingerprint, duplicate files are reported in duplicates.jsonl.
+    With registry, everything is also loaded into registry.db.
+    With parquet, primitive and taxonomy records are also written as Parquet.
+    With trie, they are also written path-trie encoded (see path_trie.py).
+    With cube, counts and bytes are rolled up into cube.json (see rollup_cube.py).
+    With hierarchy, the directory node table is saved next to primitive.jsonl
+    (see hierarchy.py), so the tools need not build it.
+    With tiles, primitive records are also sharded into tiles/ (see tiles.py).
+    With compression ('gzip' or 'zstd'), JSONL and manifest are framed files.
+    With manifest_indent=None, the manifest is written without pretty-printing.
+    Returns (WalkStats, {stage name: stage}).
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    MediaArchaeologist = load_archaeologist()
+    archaeologist = MediaArchaeologist(root_path)
+
+    stages = {
+        'primitive': PrimitiveStage(out / 'primitive.jsonl', compression=compression),
+        'taxonomy': TaxonomyStage(out / 'taxonomy.jsonl', compression),
+        'ekphrasis': EkphrasisStage(out / 'ekphrasis.jsonl', compression),
+    }
+    if fingerprint:
+        stages['fingerprint'] = FingerprintStage(out / 'duplicates.jsonl',
+                                                 out / 'hash-cache.jsonl', jobs=jobs,
+                                                 compression=compression)
+    media_stages = archaeologist.stages()
+    
+    # Reads the primitive records, so it goes after PrimitiveStage
+    writer = RegistryWriter(out / 'registry.db') if registry else None
+    if writer:
+        stages['registry'] = RegistryStage(writer)
+    if parquet:
+        stages['columnar'] = ColumnarStage(out)
+    if trie:
+        stages['trie'] = TrieStage(out)
+    if cube:
+        stages['cube'] = CubeStage(out / 'cube.json')
+    if hierarchy:
+        stages['hierarchy'] = HierarchyStage(out / 'primitive.jsonl')
+
+    stats = WalkStats()
+    run_stages(root_path, list(stages.values()) + media_stages, exclude=exclude,
+               stats=stats, cache=cache, jobs=jobs)
+    if cache:
+        cache.save()
+
+    # Chamber summaries need the complete rollup
+    summaries = generate_chamber_summaries(stages['taxonomy'].chambers)
+    write_chamber_summaries(out / 'chambers.jsonl', summaries, compression)
+    
+    if writer:
+        writer.add_chambers(summaries)
+        writer.add_chains(stages['ekphrasis'].chains)
+        writer.close()
+
+    # Shards are cut from the finished primitive.jsonl
+    if tiles:
+        stages['tiles'] = build_tiles(out / 'primitive.jsonl', out / 'tiles')
+
+    if manifest_path:
+        archaeologist.export_manifest(manifest_path, compression, manifest_indent)
+
+    stages['archaeologist'] = archaeologist
+    stages['summaries'] = summaries
+    return stats, stages
+
+# Run fused scan
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ARKADU single-walk scan')
+    parser.add_argument('root', nargs='?', default='.', help='archive root to scan')
+    parser.add_argument('--out', default='ARKADU/sys', help='output directory for sys/*.jsonl')
+    parser.add_argument('--manifest', default='media-manifest.json',
+                        help="media manifest path (relative to root); '' to skip")
+    parser.add_argument('--compact-manifest', action='store_true',
+                        help='write the manifest without pretty-printing')
+    add_walk_args(parser)
+    parser.add_argument('--fingerprint', action='store_true',
+                        help='hash same-size files and report duplicates in duplicates.jsonl')
+    parser.add_argument('--registry', action='store_true',
+                        help='also load the results into registry.db for bin/arkadu query')
+    parser.add_argument('--parquet', action='store_true',
+                        help='also write primitive/taxonomy records as Parquet (needs pyarrow)')
+    parser.add_argument('--trie', action='store_true',
+                        help='also write primitive/taxonomy records path-trie encoded (*.trie.jsonl)')
+    parser.add_argument('--cube', action='store_true',
+                        help='also write the chamber × depth × species × month rollup (cube.json)')
+    parser.add_argument('--hierarchy', action='store_true',
+                        help='also save the directory hierarchy the tools share (primitive.jsonl.hier)')
+    parser.add_argument('--tiles', action='store_true',
+                        help='also shard primitive records into tiles/ for the viewers')
+    add_compress_args(parser)
+    args = parser.parse_args()
+
+    print("ARKADU Fused Scanner v1.0")
+    print("=" * 50)
+    print("Walking archive once...")
+
+    Path(args.out).mkdir(parents=True, exist_ok=True)
+    exclude = rules_from_args(args, args.root)
+    cache = open_cache(args, args.out, args.root, exclude)
+    stats, stages = fused_scan(args.root, args.out, args.manifest, cache=cache,
+                               jobs=args.jobs, exclude=exclude, fingerprint=args.fingerprint,
+                               registry=args.registry, parquet=args.parquet,
+                               trie=args.trie, cube=args.cube, hierarchy=args.hierarchy,
+                               tiles=args.tiles,
+                               compression=args.compress,
+                               manifest_indent=None if args.compact_manifest else 2)
+    archaeologist = stages['archaeologist']
+
+    print("=" * 50)
+    print(f"✓ Walked {stats.dirs} directories, {stats.files} files ({stats.pruned} subtrees pruned, {stats.excluded} files excluded)")
+    print(f"✓ Primitive:  {stages['primitive'].count} records, "
+          f"{len(stages['primitive'].prompt_files)} prompt files")
+    print(f"✓ Taxonomy:   {stages['taxonomy'].artifact_count} records, "
+          f"{len(stages['summaries'])} chambers")
+    print(f"✓ Ekphrasis:  {len(stages['ekphrasis'].chains)} chains")
+    print(f"✓ Media:      {len(archaeologist.artifacts['images'])} images, "
+          f"{len(archaeologist.artifacts['videos'])} videos, "
+          f"{len(archaeologist.artifacts['audio'])} audio, "
+          f"{len(archaeologist.circulation)} HTML circulation nodes")
+    print_schema_counts(stages['primitive'])
+    print(f"✓ Output:     {args.out}/{{primitive,taxonomy,chambers,ekphrasis}}"
+          f"{framed_path('.jsonl', args.compress)}")
+    if cache:
+        print_cache_summary(cache)
+    if args.fingerprint:
+        print_fingerprint_summary(stages['fingerprint'])
+    if args.registry:
+        print(f"✓ Registry:   {args.out}/registry.db ({stages['registry'].writer.file_count} files)")
+    if args.parquet:
+        print(f"✓ Parquet:    {args.out}/{{primitive,taxonomy}}.parquet "
+              f"({stages['columnar'].primitive.count} records)")
+    if args.trie:
+        writer = stages['trie'].writer
+        print(f"✓ Trie:       {args.out}/{{paths,primitive,taxonomy}}.trie.jsonl "
+              f"({len(writer.trie)} directory nodes, {writer.counts['primitive']} records)")
+    if args.cube:
+        print(f"✓ Cube:       {args.out}/cube.json ({len(stages['cube'].cube)} cells)")
+    if args.hierarchy:
+        stage = stages['hierarchy']
+        print(f"✓ Hierarchy:  {stage.path} ({len(stage.hierarchy)} nodes, "
+              f"{stage.hierarchy.files[0]} files)")
+    if args.tiles:
+        print_tiles_summary(stages['tiles'], f"{args.out}/tiles")
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+ARKADU Hierarchy
+The directory tree of the archive as one compact node table, built once
+and shared by the tools that roll files up into folders.
+
+Node 0 is the archive root; every other node is a directory or a file,
+numbered in the order first seen, so a parent always comes before its
+children. One typed array per column:
+
+  parent        node id of the parent (-1 for the root)
+  name          component id (names[...])
+  depth         path components (0 for the root, 1 for a kingdom)
+  record        record number in the source for a file, -1 for a directory
+  ext           extension id (exts[...]) of a file as the record gives it, -1
+  direct_files  files directly in a directory
+  direct_bytes  their bytes
+  files, bytes  totals of the whole subtree (a file: 1 and its size)
+
+plus child ranges: the children of node n are
+children[child_start[n]:child_start[n + 1]], in the order first seen.
+
+load_hierarchy() keeps it next to the records it was built from
+(sys/primitive.jsonl → sys/primitive.jsonl.hier) and rebuilds it when
+their size or mtime changes, like jsonl_reader's .idx; loading is a few
+array reads. fused_scan.py --hierarchy writes it during the scan.
+
+Usage:
+  python3 ARKADU/kern/fused_scan.py . --hierarchy      # write it during the scan
+  python3 ARKADU/kern/hierarchy.py                     # build (or check) sys/primitive.jsonl.hier
+  python3 ARKADU/kern/hierarchy.py --depth 2           # largest chambers at depth 2
+"""
+
+import argparse
+import json
+import os
+import struct
+import time
+from array import array
+from pathlib import Path
+
+from walker import Stage
+from jsonl_reader import JsonlReader
+from framed import resolve
+
+MAGIC = b'ARKHIER1'
+# magic, source size, source mtime_ns, nodes, records, string table bytes
+HEADER = struct.Struct('<8sQQQQQ')
+
+# (column, typecode, entries: nodes + extra) in file order
+COLUMNS = (
+    ('parent', 'i', 0), ('name', 'I', 0), ('depth', 'H', 0),
+    ('record', 'i', 0), ('ext', 'i', 0),
+    ('direct_files', 'q', 0), ('direct_bytes', 'q', 0),
+    ('files', 'q', 0), ('bytes', 'q', 0),
+    ('child_start', 'I', 1), ('children', 'I', -1),
+)
+FIELDS = ['path', 'size', 'ext']
+
+
+def hierarchy_path(source):
+    return os.fspath(source) + '.hier'
+
+
+class Hierarchy:
+    """
+    Node table of a directory tree. Built with add_dir() / add_file() and
+    finish(), or read back with load(). With files=False only directories
+    become nodes; files are just counted into their directory.
+    """
+
+    def __init__(self, files=True):
+        self.with_files = files
+        for column, typecode, _ in COLUMNS:
+            setattr(self, column, array(typecode))
+        self.names = ['']
+        self.exts = []
+        self.records = 0            # source records read, with or without a node
+        self._ids = {(-1, ''): 0}   # (parent, name) → node, while building
+        self._strings = {'': 0}
+        self._ext_ids = {}
+        self._new(-1, '', 0)
+
+    def _new(self, parent, name, depth):
+        name_id = self._strings.get(name)
+        if name_id is None:
+            name_id = self._strings[name] = len(self.names)
+            self.names.append(name)
+        self.parent.append(parent)
+        self.name.append(name_id)
+        self.depth.append(depth)
+        self.record.append(-1)
+        self.ext.append(-1)
+        for column in (self.direct_files, self.direct_bytes, self.files, self.bytes):
+            column.append(0)
+        return len(self.parent) - 1
+
+    def _child(self, parent, name):
+        node = self._ids.get((parent, name))
+        if node is None:
+            node = self._ids[(parent, name)] = self._new(parent, name, self.depth[parent] + 1)
+        return node
+
+    def add_dir(self, parts):
+        """Node of a directory given as path components, created if new."""
+        node = 0
+        for part in parts:
+            node = self._child(node, part)
+        return node
+
+    def add_file(self, parts, size, ext=None, record=None):
+        """
+        Count a file into its directory; returns its node (its directory's
+        with files=False). record defaults to the next record number.
+        """
+        if record is None:
+            record = self.records
+        self.records = max(self.records, record + 1)
+        directory = self.add_dir(parts[:-1])
+        self.direct_files[directory] += 1
+        self.direct_bytes[directory] += size
+        if not self.with_files:
+            return directory
+        node = self._child(directory, parts[-1])
+        ext_id = self._ext_ids.get(ext)
+        if ext_id is None:
+            ext_id = self._ext_ids[ext] = len(self.exts)
+            self.exts.append(ext)
+        self.record[node] = record
+        self.ext[node] = ext_id
+        self.files[node] += 1
+        self.bytes[node] += size
+        return node
+
+    def add_record(self, record, number=None):
+        """Add a primitive record (path, size, ext); records without a path only count."""
+        if number is None:
+            number = self.records
+        if not record.get('path'):
+            self.records = max(self.records, number + 1)
+            return None
+        return self.add_file(record['path'].split(os.sep), record.get('size', 0),
+                             record.get('ext'), number)
+
+    def finish(self):
+        """Child ranges and subtree totals; the table is read-only afterwards."""
+        n = len(self.parent)
+        counts = array('I', bytes(4 * (n + 1)))
+        for node in range(1, n):
+            counts[self.parent[node] + 1] += 1
+        for node in range(n):
+            counts[node + 1] += counts[node]
+        self.child_start = counts
+        fill = array('I', counts[:n])
+        self.children = array('I', bytes(4 * max(n - 1, 0)))
+        for node in range(1, n):
+            parent = self.parent[node]
+            self.children[fill[parent]] = node
+            fill[parent] += 1
+
+        # Children come after their parent, so one backward pass rolls up.
+        # File nodes carry their own totals; without them, directories
+        # start from the files counted into them.
+        files, size = self.files, self.bytes
+        if not self.with_files:
+            files[:] = self.direct_files
+            size[:] = self.direct_bytes
+        for node in range(n - 1, 0, -1):
+            parent = self.parent[node]
+            files[parent] += files[node]
+            size[parent] += size[node]
+        self._ids = self._strings = self._ext_ids = None
+        return self
+
+    # Reading
+
+    def __len__(self):
+        return len(self.parent)
+
+    def is_file(self, node):
+        return self.record[node] >= 0
+
+    def child_nodes(self, node):
+        return self.children[self.child_start[node]:self.child_start[node + 1]]
+
+    def name_of(self, node):
+        return self.names[self.name[node]]
+
+    def parts(self, node):
+        parts = []
+        while node > 0:
+            parts.append(self.names[self.name[node]])
+            node = self.parent[node]
+        return parts[::-1]
+
+    def path(self, node, sep=os.sep):
+        return sep.join(self.parts(node))
+
+    def ext_of(self, node):
+        """Extension of a file node as its record gave it (None if it had none)."""
+        return self.exts[self.ext[node]]
+
+    def file_nodes(self):
+        """Node of every source record, -1 where the record had no path."""
+        nodes = array('i', [-1]) * self.records
+        for node in range(len(self.record)):
+            if self.record[node] >= 0:
+                nodes[self.record[node]] = node
+        return nodes
+
+    def post_order(self, node=0):
+        """Nodes below node, children (in order) before their parent; no recursion."""
+        stack = [(node, self.child_start[node])]
+        while stack:
+            current, next_child = stack[-1]
+            if next_child < self.child_start[current + 1]:
+                stack[-1] = (current, next_child + 1)
+                child = self.children[next_child]
+                stack.append((child, self.child_start[child]))
+            else:
+                stack.pop()
+                if stack:
+                    yield current
+
+    # Persistence
+
+    def save(self, path, stamp):
+        """Write <path>.tmp and rename it; stamp is (source size, source mtime_ns)."""
+        strings = json.dumps({'names': self.names, 'exts': self.exts}).encode('utf-8')
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, stamp[0], stamp[1], len(self), self.records, len(strings)))
+            for column, _, _ in COLUMNS:
+                getattr(self, column).tofile(f)
+            f.write(strings)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, stamp=None):
+        """The saved hierarchy, or None if it is missing, damaged or stale."""
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return None
+        with f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return None
+            magic, size, mtime_ns, nodes, records, strings = HEADER.unpack(header)
+            if magic != MAGIC or (stamp is not None and (size, mtime_ns) != tuple(stamp)):
+                return None
+            hierarchy = cls.__new__(cls)
+            hierarchy.with_files = True
+            hierarchy.records = records
+            hierarchy._ids = hierarchy._strings = hierarchy._ext_ids = None
+            try:
+                for column, typecode, extra in COLUMNS:
+                    values = array(typecode)
+                    values.fromfile(f, max(nodes + extra, 0))
+                    setattr(hierarchy, column, values)
+                table = json.loads(f.read(strings))
+            except (EOFError, ValueError):
+                return None
+        hierarchy.names = table['names']
+        hierarchy.exts = table['exts']
+        return hierarchy
+
+
+def source_stamp(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def build_hierarchy(records):
+    """Hierarchy of an iterable of primitive records (path, size, ext)."""
+    hierarchy = Hierarchy()
+    for number, record in enumerate(records):
+        hierarchy.add_record(record, number)
+    return hierarchy.finish()
+
+
+def load_hierarchy(source, read=None):
+    """
+    Hierarchy of a primitive.jsonl (or .gz/.zst, or .parquet with read),
+    from its .hier file if that is current, else built and saved (the
+    save is skipped where sys/ is read-only). read(path) gives the records;
+    default JsonlReader(path, ['path', 'size', 'ext']).
+    """
+    source = Path(resolve(source))
+    stamp = source_stamp(source)
+    target = hierarchy_path(source)
+    hierarchy = Hierarchy.load(target, stamp)
+    if hierarchy is None:
+        records = read(source) if read else JsonlReader(source, FIELDS)
+        hierarchy = build_hierarchy(records)
+        try:
+            hierarchy.save(target, stamp)
+        except OSError:
+            pass
+    return hierarchy
+
+
+class HierarchyStage(Stage):
+    """
+    Walker stage that writes <primitive.jsonl>.hier once the scan is done.
+    It reads the primitive record from entry.info, so it must come after
+    PrimitiveStage, which has closed primitive.jsonl by its finish().
+    """
+
+    def __init__(self, primitive_path):
+        self.primitive_path = primitive_path
+        self.hierarchy = Hierarchy()
+        self.path = None
+
+    def on_file(self, entry):
+        self.hierarchy.add_record(entry.info['primitive'])
+
+    def finish(self):
+        self.hierarchy.finish()
+        source = resolve(self.primitive_path)
+        self.path = hierarchy_path(source)
+        self.hierarchy.save(self.path, source_stamp(source))
+
+
+# Build the hierarchy of an existing scan, or list its largest chambers
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Shared directory hierarchy of sys/primitive.jsonl')
+    parser.add_argument('--sys', type=Path, default=Path(__file__).resolve().parent.parent / 'sys',
+                        help='directory holding primitive.jsonl')
+    parser.add_argument('--depth', type=int, help='list the largest chambers at this depth')
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    print("ARKADU Hierarchy v1.0")
+    print("=" * 50)
+    start = time.perf_counter()
+    hierarchy = load_hierarchy(args.sys / 'primitive.jsonl')
+    directories = sum(1 for node in range(1, len(hierarchy)) if not hierarchy.is_file(node))
+    print(f"✓ Hierarchy: {len(hierarchy)} nodes ({directories} directories), "
+          f"{hierarchy.files[0]} files, {hierarchy.bytes[0] / 1024 / 1024 / 1024:.2f} GB "
+          f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+    print(f"✓ Output: {hierarchy_path(resolve(args.sys / 'primitive.jsonl'))}")
+
+    if args.depth is not None:
+        chambers = [node for node in range(1, len(hierarchy))
+                    if hierarchy.depth[node] == args.depth and not hierarchy.is_file(node)]
+        chambers.sort(key=lambda node: hierarchy.bytes[node], reverse=True)
+        for node in chambers[:args.limit]:
+            print(f"{hierarchy.path(node):50s} {hierarchy.files[node]:8d} files  "
+                  f"{hierarchy.bytes[node] / 1024 / 1024:10.1f} MB")
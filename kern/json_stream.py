@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+ARKADU JSON Stream
+Incremental, bounded-memory reading of large JSON documents.
+
+probe_array() answers the questions the prompt scanners ask of a JSON file
+("is it an array, how many entries, what are the first few, does it mention
+operativeEkphrasis?") without loading the whole document:
+- the first `sample` elements are decoded, one at a time, from a buffer
+- the remaining elements are only counted, by scanning structural tokens
+  (brackets, braces, commas, string quotes) - no objects are built
+- the file is read in fixed-size chunks, so memory stays flat however
+  large the file is (apart from the sampled elements themselves)
+
+mentions() is the cheap first step: a chunked substring test, no token
+scan, so callers that only care about files containing a key can skip
+probe_array() for the rest.
+
+iter_section() streams one part of a larger document (say the 'artifacts'
+of media-manifest.json): the sections before it are stepped over with the
+same token scan, and its members are decoded one at a time.
+
+The token scan does not validate scalars; a document whose brackets do not
+balance, or that has trailing content, is rejected like json.loads would.
+"""
+
+import json
+import re
+
+CHUNK_SIZE = 1 << 20
+
+# Give up decoding a sample element once the buffer holds this much text
+MAX_SAMPLE_CHARS = 64 << 20
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789.eE+-'
+_OUTSIDE = re.compile(r'[\[\]{},"]')
+_INSIDE = re.compile(r'["\\]')
+
+
+class _Reader:
+    """Chunked text reader that also watches for a substring."""
+
+    def __init__(self, f, watch=None, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.watch = watch
+        self.seen = False
+        self.tail = ''
+        self.eof = False
+
+    def read(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return ''
+        if self.watch and not self.seen:
+            # Overlap with the previous chunk so a split key is still found
+            window = self.tail + chunk
+            self.seen = self.watch in window
+            self.tail = window[-(len(self.watch) - 1):] if len(self.watch) > 1 else ''
+        return chunk
+
+
+def _may_continue(buf, end):
+    """True if a scalar decoded up to `end` could extend past the buffer."""
+    n = len(buf)
+    while end < n and buf[end] in _NUMBER_CHARS:
+        end += 1
+    return end == n
+
+
+def _skip_ws(buf, pos):
+    n = len(buf)
+    while pos < n and buf[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+class _TokenCounter:
+    """
+    Counts top-level array elements by tracking nesting depth and string
+    state across chunk boundaries.
+    """
+
+    def __init__(self):
+        self.depth = 1          # inside the top-level '['
+        self.in_string = False
+        self.skip = 0           # characters to skip (escape split across chunks)
+        self.commas = 0         # commas seen at depth 1
+        self.end = None         # index just past the closing ']' in the last chunk
+
+    def feed(self, chunk, pos=0):
+        pos += self.skip
+        self.skip = 0
+        n = len(chunk)
+        while pos < n:
+            if self.in_string:
+                m = _INSIDE.search(chunk, pos)
+                if m is None:
+                    return False
+                if m.group() == '\\':
+                    pos = m.end() + 1
+                    if pos > n:
+                        self.skip = pos - n
+                        return False
+                else:
+                    self.in_string = False
+                    pos = m.end()
+                continue
+
+            m = _OUTSIDE.search(chunk, pos)
+            if m is None:
+                return False
+            c = m.group()
+            pos = m.end()
+            if c == '"':
+                self.in_string = True
+            elif c in '[{':
+                self.depth += 1
+            elif c in ']}':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end = pos
+                    return True
+            elif self.depth == 1:
+                self.commas += 1
+        return False
+
+
+def mentions(path, watch, chunk_size=CHUNK_SIZE):
+    """True if `watch` occurs anywhere in the raw text of the file."""
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        reader = _Reader(f, watch, chunk_size)
+        while not reader.seen and not reader.eof:
+            reader.read()
+    return reader.seen
+
+
+def probe_array(path, sample=3, watch=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream a JSON file and summarise it if it is a top-level array.
+
+    Returns None if the document is not an array (decided from its first
+    character, without reading further) or is malformed. Otherwise returns
+    {'count': n, 'head': [first `sample` elements], 'mentions': bool},
+    where 'mentions' says whether `watch` occurs anywhere in the raw text.
+    A sample element too large to buffer is returned as None.
+    """
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        reader = _Reader(f, watch, chunk_size)
+        buf = reader.read().lstrip('\ufeff')
+        pos = _skip_ws(buf, 0)
+        while pos == len(buf) and not reader.eof:
+            buf = reader.read()
+            pos = _skip_ws(buf, 0)
+        if pos == len(buf) or buf[pos] != '[':
+            return None
+        pos += 1
+
+        head = []
+        count = 0
+        closed = False
+
+        # Decode the first few elements
+        while len(head) < sample:
+            pos = _skip_ws(buf, pos)
+            while pos == len(buf) and not reader.eof:
+                buf, pos = buf[pos:] + reader.read(), 0
+                pos = _skip_ws(buf, pos)
+            if pos == len(buf):
+                return None
+            if buf[pos] == ']' and count == 0:
+                pos += 1
+                closed = True
+                break
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if reader.eof:
+                    return None
+                if len(buf) - pos > MAX_SAMPLE_CHARS:
+                    # Too large to sample; count it with the token scanner
+                    head.append(None)
+                    break
+                buf, pos = buf[pos:] + reader.read(), 0
+                continue
+            if not reader.eof and _may_continue(buf, end):
+                # A number at the buffer edge may continue in the next chunk
+                buf, pos = buf[pos:] + reader.read(), 0
+                continue
+            head.append(item)
+            count += 1
+            pos = _skip_ws(buf, end)
+            while pos == len(buf) and not reader.eof:
+                buf, pos = buf[pos:] + reader.read(), 0
+                pos = _skip_ws(buf, pos)
+            if pos == len(buf):
+                return None
+            if buf[pos] == ']':
+                pos += 1
+                closed = True
+                break
+            if buf[pos] != ',':
+                return None
+            pos += 1
+
+        if not closed:
+            # Count the rest without building objects
+            counter = _TokenCounter()
+            done = counter.feed(buf, pos)
+            while not done:
+                buf = reader.read()
+                if not buf:
+                    return None
+                done = counter.feed(buf)
+            pos = counter.end
+            # The element at the scan start, plus one per top-level comma
+            count += counter.commas + 1
+
+        # Only whitespace may follow the array
+        if buf[pos:].strip(_WHITESPACE):
+            return None
+        while not reader.eof:
+            if reader.read().strip(_WHITESPACE):
+                return None
+
+    return {'count': count, 'head': head, 'mentions': reader.seen if watch else False}
+
+
+class _Cursor:
+    """A read position in a JSON document streamed in chunks."""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.reader = _Reader(f, chunk_size=chunk_size)
+        self.buf = ''
+        self.pos = 0
+
+    def more(self, at_least=1):
+        """Append at least `at_least` characters; False at end of input."""
+        if self.pos >= self.reader.chunk_size:
+            # Drop the text already consumed
+            self.buf, self.pos = self.buf[self.pos:], 0
+        added = 0
+        while added < at_least:
+            chunk = self.reader.read()
+            if not chunk:
+                break
+            self.buf += chunk
+            added += len(chunk)
+        return added > 0
+
+    def peek(self):
+        """The next non-whitespace character ('' at end of input)."""
+        self.pos = _skip_ws(self.buf, self.pos)
+        while self.pos == len(self.buf):
+            if not self.more():
+                return ''
+            self.pos = _skip_ws(self.buf, self.pos)
+        return self.buf[self.pos]
+
+    def expect(self, chars):
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError(f"expected one of {chars!r}, found {c or 'end of input'!r}")
+        self.pos += 1
+        return c
+
+    def decode(self):
+        """Decode the value at the cursor."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Double the buffered text, so a large value is decoded
+                # a logarithmic number of times, not once per chunk
+                if not self.more(len(self.buf) - self.pos):
+                    raise
+                continue
+            if _may_continue(self.buf, end) and self.more():
+                continue
+            self.pos = end
+            return value
+
+    def skip(self):
+        """Step over the value at the cursor without building it."""
+        if self.peek() not in ('[', '{'):
+            self.decode()
+            return
+        counter = _TokenCounter()
+        done = counter.feed(self.buf, self.pos + 1)
+        while not done:
+            self.buf, self.pos = self.reader.read(), 0
+            if not self.buf:
+                raise ValueError("unexpected end of input")
+            done = counter.feed(self.buf)
+        self.pos = counter.end
+
+    def find(self, key):
+        """Enter the object at the cursor and stop at the value of key."""
+        self.expect('{')
+        if self.peek() == '}':
+            raise KeyError(key)
+        while True:
+            name = self.decode()
+            self.expect(':')
+            if name == key:
+                return
+            self.skip()
+            if self.expect(',}') == '}':
+                raise KeyError(key)
+
+
+def iter_section(f, keys, chunk_size=CHUNK_SIZE):
+    """
+    Stream one nested section of a JSON document from the text file f.
+
+    keys is the path of object keys to the section, e.g. ('artifacts',
+    'images'). An array section yields its elements, an object section
+    its (key, value) pairs, one at a time. Sections before it are skipped
+    with the token scanner (nothing is decoded), and reading stops at its
+    end, so the rest of the file is never read. Raises KeyError if the
+    section is missing and ValueError if it is not an array or object.
+    """
+    cursor = _Cursor(f, chunk_size)
+    if cursor.peek() == '\ufeff':
+        cursor.pos += 1
+    for key in keys:
+        cursor.find(key)
+    opened = cursor.expect('[{')
+    close = ']' if opened == '[' else '}'
+    if cursor.peek() == close:
+        return
+    while True:
+        if opened == '{':
+            key = cursor.decode()
+            cursor.expect(':')
+            yield key, cursor.decode()
+        else:
+            yield cursor.decode()
+        if cursor.expect(',' + close) == close:
+            return
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+ARKADU JSONL Reader
+Memory-mapped access to sys/*.jsonl without loading the file into a list.
+
+  reader = JsonlReader('ARKADU/sys/primitive.jsonl', fields=['path', 'size', 'ext'])
+  for record in reader: ...      # decoded one line at a time
+  len(reader), reader[123456]    # via the line-offset index
+
+Iterating needs no index: lines are read straight from the mapping and
+decoded as they are reached. len() and reader[n] use a sidecar index
+(<file>.idx: the byte offset of every record) that is built on first use
+and reused until the JSONL file's size or mtime changes. The index is
+itself memory-mapped, so opening it costs nothing however long the file.
+
+With fields, each record is cut down to those keys right after decoding,
+so only they stay alive. json.loads decodes a line faster than Python
+could skip over the unwanted values, so the saving is memory, not parse
+time. Blank lines are skipped, as the old loaders did.
+
+Framed .gz/.zst files (framed.py) are read the same way: blocks are
+decompressed ahead on a thread pool while iterating, and len() / reader[n]
+use the line counts in the block headers instead of an .idx file. The
+reader opens whichever of path, path.gz and path.zst was written last.
+"""
+
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from framed import FramedReader, detect, resolve
+
+INDEX_MAGIC = b'ARKIDX1\0'
+INDEX_HEADER = struct.Struct('<8sQQQ')  # magic, jsonl size, jsonl mtime_ns, records
+
+
+def index_path(path):
+    return os.fspath(path) + '.idx'
+
+
+def build_offsets(mapping):
+    """Start offset of every non-blank line, plus the end of the data."""
+    offsets = array('Q')
+    mapping.seek(0)
+    start = 0
+    for line in iter(mapping.readline, b''):
+        if line.strip():
+            offsets.append(start)
+        start += len(line)
+    offsets.append(start)
+    return offsets
+
+
+def write_index(path, offsets, st):
+    """Save offsets next to the JSONL file (atomically; skipped if read-only)."""
+    target = index_path(path)
+    tmp = target + '.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, st.st_size, st.st_mtime_ns, len(offsets) - 1))
+            offsets.tofile(f)
+        os.replace(tmp, target)
+    except OSError:
+        pass
+
+
+def load_index(path, st):
+    """Offsets from a sidecar index that matches the JSONL file, else None."""
+    try:
+        f = open(index_path(path), 'rb')
+    except OSError:
+        return None
+    with f:
+        header = f.read(INDEX_HEADER.size)
+        if len(header) < INDEX_HEADER.size:
+            return None
+        magic, size, mtime_ns, count = INDEX_HEADER.unpack(header)
+        if (magic, size, mtime_ns) != (INDEX_MAGIC, st.st_size, st.st_mtime_ns):
+            return None
+        if os.fstat(f.fileno()).st_size != INDEX_HEADER.size + (count + 1) * 8:
+            return None
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapping)[INDEX_HEADER.size:].cast('Q')
+
+
+class JsonlReader:
+    """
+    Lazily decoded, randomly accessible records of a JSONL file.
+    Iterate it as often as needed; each pass decodes the lines again.
+    """
+
+    def __init__(self, path, fields=None):
+        self.path = resolve(path)
+        self.fields = list(fields) if fields is not None else None
+        self._offsets = None
+        self._map = None
+        self.framed = FramedReader(self.path) if detect(self.path) else None
+        if self.framed:
+            return
+        with open(self.path, 'rb') as f:
+            self._stat = os.fstat(f.fileno())
+            # mmap refuses empty files
+            self._map = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                         if self._stat.st_size else None)
+
+    def _decode(self, data):
+        record = json.loads(data)
+        if self.fields is None:
+            return record
+        return {k: record[k] for k in self.fields if k in record}
+
+    @property
+    def offsets(self):
+        """Record start offsets (+ end sentinel), loading or building the index."""
+        if self._offsets is None:
+            if self._map is None:
+                self._offsets = array('Q', [0])
+            else:
+                self._offsets = load_index(self.path, self._stat)
+                if self._offsets is None:
+                    self._offsets = build_offsets(self._map)
+                    write_index(self.path, self._offsets, self._stat)
+        return self._offsets
+
+    def __len__(self):
+        if self.framed:
+            return len(self.framed)
+        return len(self.offsets) - 1
+
+    def __getitem__(self, n):
+        count = len(self)
+        if self.framed:
+            return self._decode(self.framed.line(n + count if n < 0 else n))
+        if n < 0:
+            n += count
+        if not 0 <= n < count:
+            raise IndexError(f'record {n} out of range ({count} records)')
+        offsets = self.offsets
+        return self._decode(self._map[offsets[n]:offsets[n + 1]])
+
+    def __iter__(self):
+        if self.framed:
+            for line in self.framed.lines():
+                yield self._decode(line)
+            return
+        if self._map is None:
+            return
+        # A private cursor, so interleaved passes don't disturb each other
+        position = 0
+        mapping = self._map
+        while True:
+            end = mapping.find(b'\n', position)
+            if end == -1:
+                line = mapping[position:]
+                if line.strip():
+                    yield self._decode(line)
+                return
+            line = mapping[position:end]
+            position = end + 1
+            if line.strip():
+                yield self._decode(line)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
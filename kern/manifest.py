@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+ARKADU Manifest
+Streaming writer and section reader for media-manifest.json.
+
+ManifestWriter writes the manifest member by member: every artifact record,
+circulation entry and provenance entry is encoded and written on its own,
+so neither a dict of the whole manifest nor its JSON text is ever held in
+memory. With the default indent=2 the file is byte for byte what
+json.dump(manifest, f, indent=2) gives; with indent=None it is written
+without pretty-printing (no indentation or spaces, one member per line so
+framed .gz/.zst blocks can still be cut). Like the other writers it writes
+<path>.tmp and renames it into place only once the manifest is complete.
+
+iter_manifest() streams one section back, e.g. 'artifacts.images' or
+'circulation', skipping the sections before it without decoding them
+(json_stream.iter_section).
+
+Usage:
+  python3 ARKADU/kern/manifest.py artifacts.images            # one record per line
+  python3 ARKADU/kern/manifest.py provenance --count          # members of a section
+  python3 ARKADU/kern/manifest.py circulation --manifest other-manifest.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from framed import FramedWriter, framed_path, open_text, resolve
+from json_stream import iter_section
+
+
+class ManifestWriter:
+    """
+    Writes one JSON object incrementally. Members are added with field(),
+    or streamed into nested containers with array() / mapping(), or
+    begin_object() / begin_array() ... end() for hand-built nesting.
+    """
+
+    def __init__(self, path, indent=2, compression=None):
+        self.path = framed_path(path, compression)
+        if compression is None:
+            self.tmp_path = f'{self.path}.tmp'
+            self.output = open(self.tmp_path, 'w', encoding='utf-8')
+        else:
+            self.output = FramedWriter(self.path, compression)
+            self.tmp_path = self.output.tmp_path
+        self.indent = indent
+        self.separators = (',', ': ') if indent is not None else (',', ':')
+        self.closers = ['}']
+        self.counts = [0]   # members written in each open container
+        self.output.write('{')
+
+    def _break(self, level):
+        return '\n' + ' ' * (self.indent * level)
+
+    def _member(self):
+        """Separator and indentation before the next member."""
+        if self.indent is None:
+            if self.counts[-1]:
+                self.output.write(',\n')
+        else:
+            self.output.write((',' if self.counts[-1] else '') + self._break(len(self.counts)))
+        self.counts[-1] += 1
+
+    def _key(self, key):
+        if self.closers[-1] != '}':
+            raise TypeError("keyed member inside an array")
+        self._member()
+        self.output.write(json.dumps(key) + self.separators[1])
+
+    def _value(self, value):
+        text = json.dumps(value, indent=self.indent, separators=self.separators)
+        if self.indent:
+            text = text.replace('\n', self._break(len(self.counts)))
+        self.output.write(text)
+
+    def field(self, key, value):
+        """Write key: value into the current object."""
+        self._key(key)
+        self._value(value)
+
+    def append(self, value):
+        """Write value into the current array."""
+        if self.closers[-1] != ']':
+            raise TypeError("unkeyed member inside an object")
+        self._member()
+        self._value(value)
+
+    def begin_object(self, key):
+        self._key(key)
+        self.output.write('{')
+        self.closers.append('}')
+        self.counts.append(0)
+
+    def begin_array(self, key):
+        self._key(key)
+        self.output.write('[')
+        self.closers.append(']')
+        self.counts.append(0)
+
+    def end(self):
+        """Close the innermost container."""
+        closer = self.closers.pop()
+        if self.counts.pop() and self.indent is not None:
+            self.output.write(self._break(len(self.counts)))
+        self.output.write(closer)
+
+    def array(self, key, values):
+        """key: [values...], streamed from any iterable."""
+        self.begin_array(key)
+        for value in values:
+            self.append(value)
+        self.end()
+
+    def mapping(self, key, items):
+        """key: {k: v, ...}, streamed from an iterable of (k, v) pairs."""
+        self.begin_object(key)
+        for name, value in items:
+            self.field(name, value)
+        self.end()
+
+    def close(self):
+        if not self.closers:
+            return  # already closed
+        while self.closers:
+            self.end()
+        self.output.close()
+        if isinstance(self.output, FramedWriter):
+            return  # renamed by FramedWriter.close()
+        os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        elif isinstance(self.output, FramedWriter):
+            self.output.__exit__(exc_type, *exc)
+        else:
+            # Leave any previous manifest in place rather than a truncated one
+            self.output.close()
+            os.remove(self.tmp_path)
+
+
+def iter_manifest(path, section):
+    """
+    Stream one section of a manifest (plain, .gz or .zst). section is a
+    dotted key path: 'artifacts.images' yields artifact records, an object
+    such as 'provenance' yields (key, value) pairs.
+    """
+    with open_text(resolve(path)) as f:
+        yield from iter_section(f, section.split('.'))
+
+
+# Print one section of a manifest
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stream one section of media-manifest.json')
+    parser.add_argument('section', help="dotted key path, e.g. artifacts.images or circulation")
+    parser.add_argument('--manifest', default='media-manifest.json',
+                        help='manifest path (.gz/.zst found automatically)')
+    parser.add_argument('--count', action='store_true', help='only count the members')
+    args = parser.parse_args()
+
+    try:
+        members = iter_manifest(args.manifest, args.section)
+        if args.count:
+            print(sum(1 for _ in members))
+        else:
+            for member in members:
+                print(json.dumps(member))
+    except KeyError as e:
+        sys.exit(f"No section {e} in {resolve(args.manifest)}")
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+ARKADU Path Trie
+Directory-trie encoding of primitive and taxonomy records.
+
+Every record of primitive.jsonl and taxonomy.jsonl spells out its full
+path, and taxonomy repeats it twice more (taxonomic_id, taxonomy ranks).
+In deep CAT/WHISKER/MEDIA/... trees that is the same few directory names
+over and over. Here each directory is a trie node, stored once:
+
+  sys/paths.trie.jsonl       header, then [node id, parent id, name] per directory
+  sys/primitive.trie.jsonl   header, then [dir, name, size, mtime, pattern, prompts]
+  sys/taxonomy.trie.jsonl    header, then [dir, name, size]
+
+Everything else is rebuilt on read: path, ext and depth from the trie and
+the name; the taxonomy record from the path; pattern from patterns.json
+(0 = "what the registry says for this name"; the registry digest is in
+the header); prompts is 0 without prompts, else [sample_prompt, entry_count];
+mtime is stored as microseconds since 1970-01-01 (naive local time, as in
+the JSONL). A record the encoding cannot reproduce exactly is written as
+its plain JSON object instead, so decoding is always lossless.
+
+Usage:
+  python3 ARKADU/kern/fused_scan.py . --trie     # write the .trie.jsonl files during the scan
+  python3 ARKADU/kern/path_trie.py               # encode an existing scan's JSONL
+  python3 ARKADU/kern/path_trie.py --verify      # round trip: decode and compare with the JSONL
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from itertools import zip_longest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from walker import Stage
+from artifact_table import PathTrie
+from taxonomy_scan import taxonomy_record
+from patterns import default_registry
+
+VERSION = 1
+KINDS = ('primitive', 'taxonomy')
+EPOCH = datetime(1970, 1, 1)
+
+
+def load_trie(path):
+    """PathTrie from a paths.trie.jsonl file."""
+    trie = PathTrie()
+    with open(path) as f:
+        check_header(json.loads(f.readline()), 'paths', path)
+        for line in f:
+            node, parent, name = json.loads(line)
+            if trie.add(parent, name) != node:
+                raise ValueError(f"{path}: node {node} out of order")
+    trie.written = len(trie)
+    return trie
+
+
+def check_header(header, kind, path):
+    if header.get('kind') != kind or header.get('version') != VERSION:
+        raise ValueError(f"{path}: not a version {VERSION} {kind} trie file")
+
+
+# Record encodings: compact row ↔ the JSONL record
+
+def mtime_micros(mtime):
+    """'2025-05-28T15:06:31.174640' → microseconds since EPOCH"""
+    return (datetime.fromisoformat(mtime) - EPOCH) // timedelta(microseconds=1)
+
+
+def mtime_iso(micros):
+    return (EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def encode_primitive(record, trie, registry):
+    parts = record['path'].split(os.sep)
+    name = parts[-1]
+    pattern = record['pattern']
+    prompts = record['prompts']
+    return [
+        trie.intern(parts[:-1]),
+        name,
+        record['size'],
+        mtime_micros(record['mtime']),
+        0 if registry.match(name, count=False) == pattern else pattern,
+        [prompts['sample_prompt'], prompts['entry_count']] if prompts['has_prompts'] else 0
+    ]
+
+
+def decode_primitive(row, trie, registry):
+    node, name, size, micros, pattern, prompts = row
+    parts = trie.parts(node) + (name,)
+    return {
+        'path': os.sep.join(parts),
+        'size': size,
+        'ext': os.path.splitext(name)[1].lower(),
+        'depth': len(parts),
+        'mtime': mtime_iso(micros),
+        'name': name,
+        'pattern': registry.match(name, count=False) if pattern == 0 else pattern,
+        'prompts': ({'has_prompts': True, 'sample_prompt': prompts[0], 'entry_count': prompts[1]}
+                    if prompts else {'has_prompts': False})
+    }
+
+
+def encode_taxonomy(record, trie, registry):
+    parts = record['path'].split(os.sep)
+    return [trie.intern(parts[:-1]), parts[-1], record['size']]
+
+
+def decode_taxonomy(row, trie, registry):
+    node, name, size = row
+    return taxonomy_record(trie.parts(node) + (name,), size)
+
+
+CODECS = {
+    'primitive': (encode_primitive, decode_primitive),
+    'taxonomy': (encode_taxonomy, decode_taxonomy),
+}
+
+
+def same_record(a, b):
+    """Equal, with the same key order (so the JSON text matches too)."""
+    return a == b and list(a) == list(b)
+
+
+class TrieWriter:
+    """
+    Streams records into <kind>.trie.jsonl files sharing one paths.trie.jsonl.
+    Each row is decoded again before it is written; if that does not give
+    back the record, the record itself is written. Files are written as
+    <name>.tmp and renamed into place by close().
+    """
+
+    def __init__(self, out_dir, kinds=KINDS, registry=None):
+        out = Path(out_dir)
+        self.registry = registry or default_registry()
+        self.trie = PathTrie()
+        self.fallbacks = 0
+        self.counts = dict.fromkeys(kinds, 0)
+        self.targets = [out / 'paths.trie.jsonl'] + [out / f'{kind}.trie.jsonl' for kind in kinds]
+        self.paths = open(f'{self.targets[0]}.tmp', 'w')
+        self.paths.write(json.dumps({'kind': 'paths', 'version': VERSION, 'sep': os.sep}) + '\n')
+        self.outputs = {}
+        for kind, target in zip(kinds, self.targets[1:]):
+            self.outputs[kind] = open(f'{target}.tmp', 'w')
+            self.outputs[kind].write(json.dumps({
+                'kind': kind, 'version': VERSION, 'paths': 'paths.trie.jsonl',
+                'patterns': self.registry.digest
+            }) + '\n')
+
+    def add(self, kind, record):
+        encode, decode = CODECS[kind]
+        row = encode(record, self.trie, self.registry)
+        if not same_record(decode(row, self.trie, self.registry), record):
+            row = record
+            self.fallbacks += 1
+        for node in self.trie.new_nodes():
+            self.paths.write(json.dumps(node) + '\n')
+        self.outputs[kind].write(json.dumps(row, separators=(',', ':')) + '\n')
+        self.counts[kind] += 1
+
+    def close(self):
+        self.paths.close()
+        for output in self.outputs.values():
+            output.close()
+        for target in self.targets:
+            os.replace(f'{target}.tmp', target)
+
+
+class TrieStage(Stage):
+    """
+    Walker stage that writes the trie encoding of every file. It reads the
+    primitive record from entry.info, so it must come after PrimitiveStage.
+    """
+
+    def __init__(self, out_dir):
+        self.writer = TrieWriter(out_dir)
+
+    def on_file(self, entry):
+        self.writer.add('primitive', entry.info['primitive'])
+        self.writer.add('taxonomy', taxonomy_record(entry.parts, entry.size))
+
+    def finish(self):
+        self.writer.close()
+
+
+class TrieReader:
+    """
+    Reads <kind>.trie.jsonl. rows() yields the compact rows as stored
+    (paths stay trie node ids); records() rebuilds the JSONL records.
+    """
+
+    def __init__(self, sys_dir, kind, registry=None):
+        self.path = Path(sys_dir) / f'{kind}.trie.jsonl'
+        self.kind = kind
+        with open(self.path) as f:
+            self.header = json.loads(f.readline())
+        check_header(self.header, kind, self.path)
+        self.trie = load_trie(Path(sys_dir) / self.header['paths'])
+        self.registry = registry or default_registry()
+        if kind == 'primitive' and self.header['patterns'] != self.registry.digest:
+            raise ValueError(f"{self.path}: patterns.json changed since it was written; "
+                             f"re-encode it")
+
+    def rows(self):
+        with open(self.path) as f:
+            f.readline()
+            for line in f:
+                yield json.loads(line)
+
+    def records(self):
+        decode = CODECS[self.kind][1]
+        for row in self.rows():
+            yield row if isinstance(row, dict) else decode(row, self.trie, self.registry)
+
+    def full_path(self, row):
+        """Path of a compact row, built on demand."""
+        if isinstance(row, dict):
+            return row['path']
+        return self.trie.path(row[0], row[1])
+
+
+def encode_jsonl(sys_dir, kinds=KINDS):
+    """Encode existing <kind>.jsonl files; returns the TrieWriter."""
+    writer = TrieWriter(sys_dir, kinds)
+    for kind in kinds:
+        with open(Path(sys_dir) / f'{kind}.jsonl') as f:
+            for line in f:
+                if line.strip():
+                    writer.add(kind, json.loads(line))
+    writer.close()
+    return writer
+
+
+def verify(sys_dir, kind):
+    """
+    Decode <kind>.trie.jsonl and compare it with <kind>.jsonl line by line.
+    Returns (records, mismatches); a missing or extra record is a mismatch.
+    """
+    reader = TrieReader(sys_dir, kind)
+    mismatches = 0
+    count = 0
+    with open(Path(sys_dir) / f'{kind}.jsonl') as f:
+        lines = (line.rstrip('\n') for line in f if line.strip())
+        for line, record in zip_longest(lines, reader.records()):
+            count += 1
+            if line is None or record is None or json.dumps(record) != line:
+                mismatches += 1
+                if mismatches <= 3:
+                    print(f"  ✗ record {count}: {(line or '(missing)')[:100]}")
+    return count, mismatches
+
+
+def load_rows(sys_dir, kind):
+    """A TrieReader and all its compact rows, as a tool would hold them."""
+    reader = TrieReader(sys_dir, kind)
+    return reader, list(reader.rows())
+
+
+def memory_mb(load):
+    """Bytes held by whatever load() returns."""
+    tracemalloc.start()
+    held = load()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return size / 1024 / 1024
+
+
+# Encode / verify existing scan output
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Path-trie encoding of sys/*.jsonl')
+    parser.add_argument('--sys', type=Path, default=Path(__file__).resolve().parent.parent / 'sys',
+                        help='directory holding primitive.jsonl and taxonomy.jsonl')
+    parser.add_argument('--verify', action='store_true',
+                        help='decode the .trie.jsonl files and compare them with the JSONL')
+    args = parser.parse_args()
+
+    print("ARKADU Path Trie v1.0")
+    print("=" * 50)
+
+    if args.verify:
+        failed = False
+        for kind in KINDS:
+            start = time.perf_counter()
+            count, mismatches = verify(args.sys, kind)
+            status = '✓' if mismatches == 0 else '✗'
+            failed |= mismatches > 0
+            print(f"{status} {kind}: {count} records round-tripped, {mismatches} mismatches "
+                  f"({time.perf_counter() - start:.1f}s)")
+        sys.exit(1 if failed else 0)
+
+    writer = encode_jsonl(args.sys)
+    print(f"✓ Trie: {len(writer.trie)} directory nodes "
+          f"({(args.sys / 'paths.trie.jsonl').stat().st_size / 1024:.1f} KB)")
+    for kind in KINDS:
+        jsonl = args.sys / f'{kind}.jsonl'
+        encoded = args.sys / f'{kind}.trie.jsonl'
+        as_dicts = memory_mb(lambda: [json.loads(line) for line in open(jsonl)])
+        as_rows = memory_mb(lambda: load_rows(args.sys, kind))
+        print(f"✓ {kind}: {writer.counts[kind]} records")
+        print(f"    disk:   {jsonl.stat().st_size / 1024 / 1024:7.1f} MB → "
+              f"{encoded.stat().st_size / 1024 / 1024:.1f} MB "
+              f"({jsonl.stat().st_size / encoded.stat().st_size:.1f}x)")
+        print(f"    memory: {as_dicts:7.1f} MB → {as_rows:.1f} MB ({as_dicts / as_rows:.1f}x)")
+    if writer.fallbacks:
+        print(f"  ({writer.fallbacks} records stored verbatim: not reproducible from the trie)")
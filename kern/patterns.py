@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+ARKADU Pattern Registry
+Filename schemas (CAT_WHISKER, HORSE_HEADER, ...) loaded from patterns.json.
+
+Each schema is a regex plus cheap features that every matching name must
+have: a literal prefix, the class of the first character, a substring, a
+suffix. The registry buckets schemas by first character, so a filename is
+only tried against the few schemas that could start with its first
+character, and each of those runs startswith/in/endswith checks before
+its regex. Lookup cost depends on how many schemas share a first
+character, not on how many schemas there are.
+
+Schemas are tried in config order and the first match wins, so adding a
+schema never changes the result for names an earlier schema matches.
+"""
+
+import hashlib
+import json
+import re
+import string
+from collections import Counter
+from pathlib import Path
+
+PATTERNS_PATH = Path(__file__).resolve().parent / 'patterns.json'
+
+UNKNOWN = {'schema': 'unknown'}
+
+# Characters each 'first' class stands for
+FIRST_CLASSES = {
+    'digit': string.digits,
+    'alpha': string.ascii_letters,
+}
+
+
+class Schema:
+    """One compiled filename schema."""
+
+    __slots__ = ('name', 'order', 'regex', 'prefix', 'first', 'contains', 'suffix')
+
+    def __init__(self, spec, order):
+        self.name = spec['name']
+        self.order = order
+        self.regex = re.compile(spec['regex'])
+        self.prefix = spec.get('prefix', '')
+        self.first = spec.get('first')
+        self.contains = spec.get('contains', '')
+        self.suffix = spec.get('suffix', '')
+        if self.first is not None and self.first not in FIRST_CLASSES:
+            raise ValueError(f"schema {self.name}: unknown first class {self.first!r} "
+                             f"(expected one of {', '.join(FIRST_CLASSES)})")
+
+    def first_chars(self):
+        """Characters a matching name can start with (None: any)."""
+        if self.prefix:
+            return self.prefix[0]
+        if self.first:
+            return FIRST_CLASSES[self.first]
+        return None
+
+    def match(self, filename):
+        if not filename.startswith(self.prefix):
+            return None
+        if self.contains and self.contains not in filename:
+            return None
+        if self.suffix and not filename.endswith(self.suffix):
+            return None
+        m = self.regex.match(filename)
+        if m is None:
+            return None
+        record = {'schema': self.name}
+        record.update(m.groupdict())
+        return record
+
+
+class PatternRegistry:
+    """
+    Ordered schemas with first-character dispatch.
+    match(filename) returns {'schema': name, <named groups>} or
+    {'schema': 'unknown'}; hits counts results per schema name.
+    """
+
+    def __init__(self, specs=()):
+        self.schemas = [Schema(spec, i) for i, spec in enumerate(specs)]
+        self.hits = Counter()
+
+        # Schemas that can match any first character go in every bucket
+        anywhere = [s for s in self.schemas if s.first_chars() is None]
+        buckets = {}
+        for schema in self.schemas:
+            for c in schema.first_chars() or ():
+                buckets.setdefault(c, []).append(schema)
+        self.buckets = {
+            c: sorted(set(found) | set(anywhere), key=lambda s: s.order)
+            for c, found in buckets.items()
+        }
+        self.anywhere = anywhere
+
+        # Fingerprint of the config, so caches of pattern results can be invalidated
+        canonical = json.dumps(list(specs), sort_keys=True)
+        self.digest = hashlib.sha1(canonical.encode()).hexdigest()[:12]
+
+        for spec in specs:
+            example = spec.get('example')
+            if example is not None:
+                found = self.match(example, count=False)['schema']
+                if found != spec['name']:
+                    raise ValueError(f"schema {spec['name']}: example {example!r} "
+                                     f"matched {found}")
+
+    @property
+    def names(self):
+        return [schema.name for schema in self.schemas]
+
+    def candidates(self, filename):
+        """Schemas that could match filename, in priority order."""
+        if not filename:
+            return self.anywhere
+        return self.buckets.get(filename[0], self.anywhere)
+
+    def match(self, filename, count=True):
+        for schema in self.candidates(filename):
+            record = schema.match(filename)
+            if record is not None:
+                if count:
+                    self.hits[schema.name] += 1
+                return record
+        if count:
+            self.hits['unknown'] += 1
+        return dict(UNKNOWN)
+
+
+def load_registry(path=PATTERNS_PATH):
+    """Load a PatternRegistry from a patterns.json file."""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    return PatternRegistry(config['schemas'])
+
+
+_default = None
+
+def default_registry():
+    """The registry for kern/patterns.json, loaded on first use."""
+    global _default
+    if _default is None:
+        _default = load_registry()
+    return _default
@@ -7,119 +7,227 @@ Most basic scan - no assumptions, just facts:
 - identify JSON files with prompts
 """
 
+import argparse
 import json
-import re
 from pathlib import Path
 from datetime import datetime
+from collections import Counter
 
-def scan_primitive(root_path):
+from walker import Stage, run_stages, walk
+from stat_cache import StatCache
+from exclude import add_exclude_args, rules_from_args
+from json_stream import mentions, probe_array
+from fingerprint import FingerprintStage, print_fingerprint_summary
+from patterns import default_registry
+from framed import add_compress_args, framed_path, open_output
+
+def primitive_record(entry):
+    """
+    Build the raw metadata record for one walker Entry.
+    """
+    return {
+        'path': entry.rel,
+        'size': entry.size,
+        'ext': entry.suffix.lower(),
+        'depth': entry.depth,
+        'mtime': datetime.fromtimestamp(entry.mtime).isoformat(),
+        'name': entry.name
+    }
+
+def scan_primitive(root_path, jobs=1, exclude=None):
     """
     Most basic scan - captures raw file metadata.
     """
-    root = Path(root_path)
-    
-    for path in root.rglob('*'):
-        # Skip venv/cache
-        if any(skip in str(path) for skip in ['.venv', 'venv', '__pycache__', '.git', 'node_modules']):
-            continue
-            
-        if path.is_file():
-            yield {
-                'path': str(path.relative_to(root)),
-                'size': path.stat().st_size,
-                'ext': path.suffix.lower(),
-                'depth': len(path.relative_to(root).parts),
-                'mtime': datetime.fromtimestamp(path.stat().st_mtime).isoformat(),
-                'name': path.name
-            }
+    for entry in walk(root_path, exclude=exclude, jobs=jobs):
+        if not entry.is_dir:
+            yield primitive_record(entry)
 
-def detect_pattern(filename):
+def detect_pattern(filename, registry=None):
     """
-    Detect known filename patterns.
+    Detect known filename patterns (schemas from kern/patterns.json).
     """
-    # CAT/WHISKER pattern: WGY058_RI__Memory_Storage_Retrieval__POET_and_MOTHE_uuid_0.png
-    wgy_match = re.match(r'WGY(\d+)_(\w+)__([^_]+)__(.+)_([a-f0-9-]{36})_(\d+)', filename)
-    if wgy_match:
-        return {
-            'schema': 'CAT_WHISKER',
-            'shot_num': wgy_match.group(1),
-            'operator': wgy_match.group(2),
-            'operation': wgy_match.group(3),
-            'uuid': wgy_match.group(5),
-            'variant': wgy_match.group(6)
-        }
+    if registry is None:
+        registry = default_registry()
+    return registry.match(filename)
+
+def probe_prompts(path_obj):
+    """
+    Stream a JSON file and summarise its operativeEkphrasis entries.
+    Returns None unless the file mentions operativeEkphrasis and is a list.
+    Files without the key only get a substring test; for the rest only the
+    first few entries are decoded, so large files stay cheap.
+    """
+    try:
+        if not mentions(path_obj, 'operativeEkphrasis'):
+            return None
+        result = probe_array(path_obj, sample=3)
+    except OSError:
+        return None
+    if result is None:
+        return None
     
-    # HORSE pattern: 01_SH_OutOfLife_000000_header_prompt.mp4
-    horse_match = re.match(r'(\d+)_(\w+)_(.+?)_(\d+)_header_prompt', filename)
-    if horse_match:
+    # Keep the first few prompts; consumers use at most 100 characters
+    head = []
+    for item in result['head']:
+        prompt = item.get('operativeEkphrasis') if isinstance(item, dict) else None
+        head.append(prompt[:100] if isinstance(prompt, str) else None)
+    
+    return {'entry_count': result['count'], 'head': head}
+
+def prompt_probe(entry):
+    """
+    Probe a walker Entry for prompts, sharing the result between stages
+    so each JSON file is read only once per walk.
+    """
+    if 'prompt_probe' not in entry.info:
+        is_json = entry.suffix.lower() == '.json'
+        entry.info['prompt_probe'] = probe_prompts(entry.path) if is_json else None
+    return entry.info['prompt_probe']
+
+def prompts_from_probe(probe):
+    """
+    Convert a prompt probe into the primitive record's prompts field.
+    """
+    if probe and probe['head'] and probe['head'][0] is not None:
         return {
-            'schema': 'HORSE_HEADER',
-            'track_num': horse_match.group(1),
-            'track_code': horse_match.group(2),
-            'title': horse_match.group(3),
-            'timestamp': horse_match.group(4)
+            'has_prompts': True,
+            'sample_prompt': probe['head'][0][:100],
+            'entry_count': probe['entry_count']
         }
-    
-    return {'schema': 'unknown'}
+    return {'has_prompts': False}
 
 def check_for_prompts(path_obj, artifact):
     """
     If JSON, check if it contains operativeEkphrasis prompts.
     """
     if artifact['ext'] == '.json':
-        try:
-            content = path_obj.read_text(encoding='utf-8', errors='ignore')
-            if 'operativeEkphrasis' in content:
-                # Sample first operativeEkphrasis
-                data = json.loads(content)
-                if isinstance(data, list) and len(data) > 0:
-                    first_item = data[0]
-                    if 'operativeEkphrasis' in first_item:
-                        return {
-                            'has_prompts': True,
-                            'sample_prompt': first_item.get('operativeEkphrasis', '')[:100],
-                            'entry_count': len(data)
-                        }
-        except:
-            pass
+        return prompts_from_probe(probe_prompts(path_obj))
     return {'has_prompts': False}
 
+class PrimitiveStage(Stage):
+    """
+    Walker stage that writes sys/primitive.jsonl as entries stream past
+    (framed gzip/zstd with compression, see framed.py).
+    """
+    
+    def __init__(self, output_path, progress=True, compression=None):
+        self.output = open_output(output_path, compression)
+        self.progress = progress
+        self.count = 0
+        self.prompt_files = []
+        self.schema_counts = Counter()
+    
+    def on_file(self, entry):
+        # Unchanged files (incremental mode) keep last run's record
+        artifact = entry.info.get('primitive')
+        if artifact is None:
+            artifact = primitive_record(entry)
+            
+            # Add pattern detection
+            artifact['pattern'] = detect_pattern(artifact['name'])
+            
+            # Check for prompts
+            artifact['prompts'] = prompts_from_probe(prompt_probe(entry))
+            
+            entry.info['primitive'] = artifact
+        
+        if artifact['prompts']['has_prompts']:
+            self.prompt_files.append(artifact['path'])
+        self.schema_counts[artifact['pattern']['schema']] += 1
+        
+        self.output.write(json.dumps(artifact) + '\n')
+        self.count += 1
+        
+        if self.progress and self.count % 1000 == 0:
+            print(f"  {self.count} files...")
+    
+    def finish(self):
+        self.output.close()
+
+def add_walk_args(parser):
+    """
+    Shared walk flags: --jobs for threaded listing, --incremental/--stat-all
+    for scanners backed by a StatCache, and the exclusion rule flags.
+    """
+    add_exclude_args(parser)
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='threads listing/stat-ing directories (raise for SMB/NFS mounts)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='reuse records of unchanged files from sys/scan-cache.jsonl')
+    parser.add_argument('--stat-all', action='store_true',
+                        help='with --incremental, re-stat files even in unchanged directories')
+
+def open_cache(args, out_dir, root='.', exclude=None):
+    """
+    Open the StatCache for an incremental run, or None for a full rebuild.
+    """
+    if not args.incremental:
+        return None
+    patterns = exclude.patterns if exclude is not None else []
+    # Cached primitive records carry pattern results; editing patterns.json invalidates them
+    return StatCache(Path(out_dir) / 'scan-cache.jsonl', root, patterns,
+                     trust_dir_mtime=not args.stat_all,
+                     extra={'patterns': default_registry().digest})
+
+def print_schema_counts(stage):
+    """
+    Report filename schema hits, most common first.
+    """
+    counts = ', '.join(f"{name} {n}" for name, n in stage.schema_counts.most_common())
+    print(f"✓ Schemas:    {counts}")
+
+def print_cache_summary(cache):
+    """
+    Report how an incremental run differed from the previous one.
+    """
+    summary = cache.summary()
+    print(f"✓ Incremental: {summary['added']} added, {summary['changed']} changed, "
+          f"{summary['removed']} removed, {summary['unchanged']} unchanged "
+          f"({summary['reused_dirs']} directories reused)")
+
 # Run scan
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ARKADU primitive scan')
+    add_walk_args(parser)
+    parser.add_argument('--fingerprint', action='store_true',
+                        help='hash same-size files and report duplicates in sys/duplicates.jsonl')
+    add_compress_args(parser)
+    args = parser.parse_args()
+    
     print("ARKADU Primitive Scanner v1.0")
     print("=" * 50)
     print("Scanning...")
     
     root = Path('.')
-    count = 0
-    prompt_files = []
     
     # Create output directory
     (root / 'ARKADU' / 'sys').mkdir(parents=True, exist_ok=True)
     
-    with open('ARKADU/sys/primitive.jsonl', 'w') as f:
-        for artifact in scan_primitive('.'):
-            path_obj = Path(artifact['path'])
-            
-            # Add pattern detection
-            artifact['pattern'] = detect_pattern(artifact['name'])
-            
-            # Check for prompts
-            artifact['prompts'] = check_for_prompts(path_obj, artifact)
-            
-            if artifact['prompts']['has_prompts']:
-                prompt_files.append(artifact['path'])
-            
-            f.write(json.dumps(artifact) + '\n')
-            count += 1
-            
-            if count % 1000 == 0:
-                print(f"  {count} files...")
+    exclude = rules_from_args(args)
+    cache = open_cache(args, 'ARKADU/sys', exclude=exclude)
+    stage = PrimitiveStage('ARKADU/sys/primitive.jsonl', compression=args.compress)
+    stages = [stage]
+    if args.fingerprint:
+        fingerprint = FingerprintStage('ARKADU/sys/duplicates.jsonl',
+                                       'ARKADU/sys/hash-cache.jsonl', jobs=args.jobs,
+                                       compression=args.compress)
+        stages.append(fingerprint)
+    stats = run_stages('.', stages, exclude=exclude, cache=cache, jobs=args.jobs)
+    if cache:
+        cache.save()
+    
+    count = stage.count
+    prompt_files = stage.prompt_files
     
     print("=" * 50)
-    print(f"✓ Scanned {count} files")
+    print(f"✓ Scanned {count} files ({stats.pruned} excluded subtrees pruned)")
     print(f"✓ Found {len(prompt_files)} JSON files with prompts")
-    print(f"✓ Output: ARKADU/sys/primitive.jsonl")
+    print(f"✓ Output: {framed_path('ARKADU/sys/primitive.jsonl', args.compress)}")
+    print_schema_counts(stage)
+    if cache:
+        print_cache_summary(cache)
+    if args.fingerprint:
+        print_fingerprint_summary(fingerprint)
     
     if prompt_files:
         print(f"\nSample prompt files:")
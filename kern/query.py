@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+ARKADU Query
+Ad-hoc filters and aggregates over the SQLite registry (sys/registry.db).
+
+Usage (via bin/arkadu):
+  arkadu query files --ext .mp4 --kingdom CAT --min-size 100M --order size
+  arkadu query chambers --depth 2 --limit 10           # largest chambers at depth 2
+  arkadu query group ext --kingdom HORSE               # files + bytes per extension
+  arkadu query group schema
+  arkadu query sql "SELECT kingdom, COUNT(*) FROM files GROUP BY kingdom"
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+from registry_db import connect
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / 'sys' / 'registry.db'
+
+GROUP_FIELDS = ['ext', 'kingdom', 'phylum', 'class', 'chamber', 'depth', 'schema']
+
+UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
+def parse_size(text):
+    """'250M' → 262144000"""
+    m = re.fullmatch(r'(\d+(?:\.\d+)?)\s*([KMGT]?)B?', text.strip().upper())
+    if not m:
+        raise argparse.ArgumentTypeError(f'bad size {text!r} (e.g. 500K, 250M, 2G)')
+    return int(float(m.group(1)) * UNITS[m.group(2)])
+
+
+def subtree_range(path):
+    """
+    (low, high) bounds such that low <= p < high exactly for paths p below
+    path. A range (unlike LIKE) can use the index and treats '_' literally.
+    """
+    prefix = path.rstrip('/' + os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+def file_filters(args):
+    """WHERE clause + parameters for the shared file filters."""
+    clauses, params = [], []
+    if args.ext:
+        ext = args.ext.lower() if args.ext.startswith('.') else '.' + args.ext.lower()
+        clauses.append('ext = ?')
+        params.append(ext)
+    if args.kingdom:
+        clauses.append('kingdom = ?')
+        params.append(args.kingdom)
+    if args.depth is not None:
+        clauses.append('depth = ?')
+        params.append(args.depth)
+    if args.chamber:
+        clauses.append('(chamber = ? OR (chamber >= ? AND chamber < ?))')
+        params += [args.chamber.rstrip('/' + os.sep), *subtree_range(args.chamber)]
+    if args.schema:
+        clauses.append('schema = ?')
+        params.append(args.schema)
+    if args.min_size is not None:
+        clauses.append('size >= ?')
+        params.append(args.min_size)
+    if args.since:
+        clauses.append('mtime >= ?')
+        params.append(args.since)
+    if args.name:
+        clauses.append('name GLOB ?')
+        params.append(args.name)
+    where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+    return where, params
+
+
+def query_files(args):
+    where, params = file_filters(args)
+    order = {'size': 'size DESC', 'mtime': 'mtime DESC', 'path': 'path'}[args.order]
+    sql = (f'SELECT path, size, mtime, schema FROM files{where} '
+           f'ORDER BY {order} LIMIT ?')
+    return sql, params + [args.limit]
+
+
+def query_chambers(args):
+    clauses, params = [], []
+    if args.depth is not None:
+        clauses.append('depth = ?')
+        params.append(args.depth)
+    if args.kingdom:
+        clauses.append('(path = ? OR (path >= ? AND path < ?))')
+        params += [args.kingdom, *subtree_range(args.kingdom)]
+    where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+    sql = (f'SELECT path, depth, subtree_files, subtree_bytes, file_count, total_bytes, '
+           f'dominant_species FROM chambers{where} ORDER BY {args.order} DESC LIMIT ?')
+    return sql, params + [args.limit]
+
+
+def query_group(args):
+    where, params = file_filters(args)
+    sql = (f'SELECT {args.field}, COUNT(*) AS files, SUM(size) AS bytes FROM files{where} '
+           f'GROUP BY {args.field} ORDER BY bytes DESC LIMIT ?')
+    return sql, params + [args.limit]
+
+
+def add_file_filters(parser):
+    parser.add_argument('--ext', help='extension, e.g. .mp4')
+    parser.add_argument('--kingdom', help='top-level directory, e.g. CAT')
+    parser.add_argument('--depth', type=int, help='path depth (CAT/x.png is 2)')
+    parser.add_argument('--chamber', help='directory, including its subdirectories')
+    parser.add_argument('--schema', help='filename schema, e.g. CAT_WHISKER')
+    parser.add_argument('--min-size', type=parse_size, help='e.g. 500K, 250M, 2G')
+    parser.add_argument('--since', help='modified on/after an ISO date, e.g. 2025-06-01')
+    parser.add_argument('--name', help='filename glob, e.g. "WGY0*"')
+
+
+def format_bytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024:
+            return f'{n:.0f} {unit}' if unit == 'B' else f'{n:.1f} {unit}'
+        n /= 1024
+    return f'{n:.1f} TB'
+
+
+def print_table(rows, human):
+    """Aligned columns; byte columns humanised unless --raw."""
+    if not rows:
+        print('(no rows)')
+        return
+    columns = rows[0].keys()
+    table = [list(columns)]
+    for row in rows:
+        cells = []
+        for column in columns:
+            value = row[column]
+            if human and column in ('size', 'bytes', 'total_bytes', 'subtree_bytes') and value is not None:
+                value = format_bytes(value)
+            cells.append('' if value is None else str(value))
+        table.append(cells)
+    widths = [max(len(r[i]) for r in table) for i in range(len(table[0]))]
+    for r in table:
+        print('  '.join(cell.ljust(width) for cell, width in zip(r, widths)).rstrip())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='arkadu query',
+                                     description='Query the ARKADU registry (sys/registry.db)')
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB, help=f'default: {DEFAULT_DB}')
+    parser.add_argument('--json', action='store_true', help='one JSON object per row')
+    parser.add_argument('--raw', action='store_true', help='print byte counts unformatted')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    files = sub.add_parser('files', help='list files matching filters')
+    add_file_filters(files)
+    files.add_argument('--order', choices=['size', 'mtime', 'path'], default='size')
+    files.add_argument('--limit', type=int, default=20)
+
+    chambers = sub.add_parser('chambers', help='largest chambers (directories)')
+    chambers.add_argument('--depth', type=int, help='1 = kingdoms, 2 = phyla, ...')
+    chambers.add_argument('--kingdom', help='only chambers inside this kingdom')
+    chambers.add_argument('--order', default='subtree_bytes',
+                          choices=['subtree_bytes', 'subtree_files', 'total_bytes', 'file_count'],
+                          help='subtree_* include subdirectories; total_bytes/file_count '
+                               'are direct files only (default: subtree_bytes)')
+    chambers.add_argument('--limit', type=int, default=20)
+
+    group = sub.add_parser('group', help='file count and bytes per field value')
+    group.add_argument('field', choices=GROUP_FIELDS)
+    add_file_filters(group)
+    group.add_argument('--limit', type=int, default=50)
+
+    raw_sql = sub.add_parser('sql', help='run a read-only SQL statement')
+    raw_sql.add_argument('statement')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'sql':
+        sql, params = args.statement, []
+    else:
+        sql, params = {'files': query_files, 'chambers': query_chambers,
+                       'group': query_group}[args.command](args)
+
+    try:
+        db = connect(args.db)
+    except FileNotFoundError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    try:
+        rows = db.execute(sql, params).fetchall()
+    except Exception as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        for row in rows:
+            print(json.dumps(dict(row)))
+    else:
+        print_table(rows, human=not args.raw)
+        print(f"({len(rows)} rows in {elapsed * 1000:.1f} ms)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
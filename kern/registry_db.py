@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+ARKADU Registry DB
+SQLite copy of the scan outputs, indexed for group-by questions that would
+otherwise need a full sys/*.jsonl reparse.
+
+Tables:
+  files     one row per file (primitive record + kingdom/phylum/class + chamber)
+  patterns  filename schema hits, with the matched fields as JSON
+  chambers  chamber summaries (as in chambers.jsonl)
+  chains    ekphrasis chains (as in ekphrasis.jsonl)
+
+Indexes: files(ext), files(depth), files(kingdom), files(chamber),
+files(mtime), chambers(depth, subtree_bytes).
+
+chambers keeps the direct file_count/total_bytes of chambers.jsonl and adds
+subtree_files/subtree_bytes (everything below the chamber), with a row for
+every directory - also those holding only subdirectories.
+
+A scan builds the database in <path>.tmp with rows inserted in batched
+transactions and indexes created after the bulk load, then renames it over
+the old one, so readers never see a half-written registry.
+"""
+
+import json
+import os
+import sqlite3
+from collections import defaultdict
+
+from walker import Stage
+from taxonomy_scan import RANKS
+
+BATCH_SIZE = 10_000
+
+SCHEMA = """
+CREATE TABLE files (
+    path     TEXT PRIMARY KEY,
+    name     TEXT NOT NULL,
+    ext      TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    depth    INTEGER NOT NULL,
+    mtime    TEXT NOT NULL,
+    kingdom  TEXT,
+    phylum   TEXT,
+    class    TEXT,
+    chamber  TEXT,
+    schema   TEXT NOT NULL,
+    has_prompts INTEGER NOT NULL
+);
+CREATE TABLE patterns (
+    path    TEXT PRIMARY KEY,
+    schema  TEXT NOT NULL,
+    fields  TEXT NOT NULL
+);
+CREATE TABLE chambers (
+    path        TEXT PRIMARY KEY,
+    rank        TEXT,
+    depth       INTEGER NOT NULL,
+    file_count  INTEGER NOT NULL,
+    total_bytes INTEGER NOT NULL,
+    subtree_files INTEGER NOT NULL,
+    subtree_bytes INTEGER NOT NULL,
+    child_count INTEGER NOT NULL,
+    dominant_species     TEXT NOT NULL,
+    species_distribution TEXT NOT NULL
+);
+CREATE TABLE chains (
+    prompt_file   TEXT NOT NULL,
+    script        TEXT NOT NULL,
+    uses_ffmpeg   INTEGER NOT NULL,
+    uses_drawtext INTEGER NOT NULL,
+    intent        TEXT,
+    sample_prompts TEXT NOT NULL
+);
+"""
+
+INDEXES = """
+CREATE INDEX idx_files_ext ON files(ext);
+CREATE INDEX idx_files_depth ON files(depth);
+CREATE INDEX idx_files_kingdom ON files(kingdom);
+CREATE INDEX idx_files_chamber ON files(chamber);
+CREATE INDEX idx_files_mtime ON files(mtime);
+CREATE INDEX idx_patterns_schema ON patterns(schema);
+CREATE INDEX idx_chambers_depth ON chambers(depth, subtree_bytes);
+CREATE INDEX idx_chains_prompt_file ON chains(prompt_file);
+"""
+
+
+def file_row(artifact):
+    """files row for a primitive record."""
+    dirs = artifact['path'].split(os.sep)[:-1]
+    return (
+        artifact['path'],
+        artifact['name'],
+        artifact['ext'],
+        artifact['size'],
+        artifact['depth'],
+        artifact['mtime'],
+        dirs[0] if len(dirs) > 0 else None,
+        dirs[1] if len(dirs) > 1 else None,
+        dirs[2] if len(dirs) > 2 else None,
+        os.sep.join(dirs) or None,
+        artifact['pattern']['schema'],
+        int(artifact['prompts']['has_prompts'])
+    )
+
+
+class RegistryWriter:
+    """
+    Builds a fresh registry database; close() publishes it atomically.
+    Rows are buffered and inserted BATCH_SIZE at a time, one transaction
+    per batch.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.tmp_path = self.path + '.tmp'
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        self.db = sqlite3.connect(self.tmp_path)
+        # Scratch file until the rename: durability buys nothing here
+        self.db.execute('PRAGMA journal_mode = OFF')
+        self.db.execute('PRAGMA synchronous = OFF')
+        self.db.executescript(SCHEMA)
+        self.files = []
+        self.patterns = []
+        self.file_count = 0
+        self.subtree = defaultdict(lambda: [0, 0])  # chamber -> [files, bytes]
+
+    def add_file(self, artifact):
+        row = file_row(artifact)
+        self.files.append(row)
+        
+        # Roll the file up into every ancestor chamber
+        chamber = row[9]
+        while chamber:
+            totals = self.subtree[chamber]
+            totals[0] += 1
+            totals[1] += artifact['size']
+            chamber = chamber.rpartition(os.sep)[0]
+
+        pattern = artifact['pattern']
+        if pattern['schema'] != 'unknown':
+            fields = {k: v for k, v in pattern.items() if k != 'schema'}
+            self.patterns.append((artifact['path'], pattern['schema'], json.dumps(fields)))
+        if len(self.files) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Insert buffered rows in one transaction."""
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO files VALUES '
+                                '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', self.files)
+            self.db.executemany('INSERT OR REPLACE INTO patterns VALUES (?, ?, ?)',
+                                self.patterns)
+        self.file_count += len(self.files)
+        self.files = []
+        self.patterns = []
+
+    def add_chambers(self, summaries):
+        """Chamber summaries plus subtree totals, one row per directory."""
+        by_path = {s['chamber']: s for s in summaries}
+        children = defaultdict(int)
+        for path in self.subtree:
+            parent = path.rpartition(os.sep)[0]
+            if parent:
+                children[parent] += 1
+        
+        rows = []
+        for path, (subtree_files, subtree_bytes) in self.subtree.items():
+            s = by_path.get(path)
+            depth = path.count(os.sep) + 1
+            if s is None:
+                s = {
+                    'rank': RANKS[depth - 1] if depth <= len(RANKS) else 'species',
+                    'file_count': 0, 'total_bytes': 0, 'child_count': children[path],
+                    'dominant_species': [], 'species_distribution': {}
+                }
+            rows.append((
+                path, s['rank'], depth, s['file_count'], s['total_bytes'],
+                subtree_files, subtree_bytes, s['child_count'],
+                json.dumps(s['dominant_species']), json.dumps(s['species_distribution'])
+            ))
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO chambers VALUES '
+                                '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def add_chains(self, chains):
+        rows = [(
+            c['prompt_file'], c['script'], int(bool(c['uses_ffmpeg'])),
+            int(bool(c['uses_drawtext'])), c['intent'], json.dumps(c['sample_prompts'])
+        ) for c in chains]
+        with self.db:
+            self.db.executemany('INSERT INTO chains VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+    def close(self):
+        """Index, then replace the previous registry."""
+        self.flush()
+        self.db.executescript(INDEXES)
+        self.db.execute('ANALYZE')
+        self.db.close()
+        os.replace(self.tmp_path, self.path)
+
+
+class RegistryStage(Stage):
+    """
+    Walker stage that feeds files into a RegistryWriter. It reads the
+    primitive record from entry.info, so it must come after PrimitiveStage.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def on_file(self, entry):
+        self.writer.add_file(entry.info['primitive'])
+
+
+def connect(path):
+    """Open an existing registry read-only."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found - run a scan with --registry first")
+    db = sqlite3.connect(f'file:{os.fspath(path)}?mode=ro', uri=True)
+    db.row_factory = sqlite3.Row
+    return db
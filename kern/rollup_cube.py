@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+ARKADU Rollup Cube
+File counts and bytes pre-aggregated by
+chamber prefix × depth × species × mtime month.
+
+Viewers and reports that group files by kingdom, depth or extension can
+read sys/cube.json and sum a few thousand cells instead of every record
+of primitive.jsonl. Each cell holds count, bytes and prompts (JSON files
+with operativeEkphrasis prompts) for one combination of:
+
+  chamber   the file's directory, cut to its first PREFIX_DEPTH components
+            ('CAT/WHISKER/MEDIA'; '' for files at the archive root)
+  depth     path components of the file, as in the JSONL records
+  species   extension, as in taxonomy.jsonl ('.png', 'no_ext')
+  bucket    mtime month, 'YYYY-MM' (local time, like the JSONL mtime)
+
+The chamber and its depth together still say which files sit directly in
+a chamber: depth == components of the chamber + 1.
+
+sys/cube.json (one JSON object, dictionary-encoded for the browser):
+  {"kind": "cube", "version": 1, "prefix_depth": 3,
+   "chambers": [...], "species": [...], "buckets": [...],
+   "columns": ["chamber", "depth", "species", "bucket", "count", "bytes", "prompts"],
+   "cells": [[chamber index, depth, species index, bucket index, count, bytes, prompts], ...]}
+
+Usage:
+  python3 ARKADU/kern/fused_scan.py . --cube          # build it during the scan
+  python3 ARKADU/kern/rollup_cube.py                  # or from an existing primitive.jsonl
+  python3 ARKADU/kern/rollup_cube.py --by kingdom species --depth 2
+  python3 ARKADU/kern/analyze.py --cube               # species and summary reports from the cube
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+from walker import Stage
+from jsonl_reader import JsonlReader
+
+VERSION = 1
+PREFIX_DEPTH = 3  # the viewers build chambers down to depth 3
+DIMENSIONS = ('chamber', 'depth', 'species', 'bucket')
+MEASURES = ('count', 'bytes', 'prompts')
+
+# Coarser groupings computed from a cell key
+DERIVED = {
+    'kingdom': lambda key: key[0].split('/')[0],
+    'year': lambda key: key[3][:4],
+}
+
+
+def species_of(name):
+    """Extension the way taxonomy_record() names it."""
+    return Path(name).suffix.lower() or 'no_ext'
+
+
+def matches(dimension, value, wanted):
+    """
+    Does a cell's dimension value pass a filter? wanted may be a value, a
+    set/list/tuple of values, or a predicate. A chamber filter selects the
+    whole subtree: 'CAT' matches 'CAT' and 'CAT/WHISKER'.
+    """
+    if callable(wanted):
+        return wanted(value)
+    if isinstance(wanted, (set, frozenset, list, tuple)):
+        return any(matches(dimension, value, w) for w in wanted)
+    if dimension == 'chamber':
+        return not wanted or value == wanted or value.startswith(wanted + '/')
+    return value == wanted
+
+
+class RollupCube:
+    """
+    Sparse cube: {(chamber, depth, species, bucket): [count, bytes, prompts]}.
+    add() / add_record() build it in one pass; slice() and total() query it.
+    """
+
+    def __init__(self, prefix_depth=PREFIX_DEPTH):
+        self.prefix_depth = prefix_depth
+        self.cells = {}
+
+    def __len__(self):
+        return len(self.cells)
+
+    def add(self, parts, size, bucket, prompts=False):
+        key = ('/'.join(parts[:-1][:self.prefix_depth]), len(parts), species_of(parts[-1]), bucket)
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = [0, 0, 0]
+        cell[0] += 1
+        cell[1] += size
+        cell[2] += bool(prompts)
+
+    def add_record(self, record):
+        """Add a primitive.jsonl record."""
+        self.add(record['path'].split(os.sep), record['size'], record['mtime'][:7],
+                 record['prompts']['has_prompts'])
+
+    def slice(self, by=(), **where):
+        """
+        Measures summed per group: {(value of each `by` dimension): [count,
+        bytes, prompts]}, over the cells passing every filter in where
+        (see matches()). by takes the DIMENSIONS plus 'kingdom' and 'year'.
+        """
+        unknown = [d for d in list(by) + list(where) if d not in DIMENSIONS and d not in DERIVED]
+        if unknown:
+            raise ValueError(f"unknown dimension {unknown[0]!r}")
+        keys = [DERIVED.get(d) or (lambda key, i=DIMENSIONS.index(d): key[i]) for d in by]
+        filters = [(d, DERIVED.get(d) or (lambda key, i=DIMENSIONS.index(d): key[i]), wanted)
+                   for d, wanted in where.items()]
+        groups = {}
+        for key, cell in self.cells.items():
+            if not all(matches(d, value(key), wanted) for d, value, wanted in filters):
+                continue
+            group = tuple(k(key) for k in keys)
+            total = groups.get(group)
+            if total is None:
+                total = groups[group] = [0, 0, 0]
+            total[0] += cell[0]
+            total[1] += cell[1]
+            total[2] += cell[2]
+        return groups
+
+    def total(self, **where):
+        """[count, bytes, prompts] of all files passing the filters."""
+        return self.slice((), **where).get((), [0, 0, 0])
+
+    def values(self, dimension, **where):
+        """Distinct values of one dimension, in first-seen order."""
+        return [group[0] for group in self.slice((dimension,), **where)]
+
+    def to_json(self):
+        codes = {d: {} for d in ('chamber', 'species', 'bucket')}
+        cells = []
+        for (chamber, depth, species, bucket), cell in self.cells.items():
+            cells.append([codes['chamber'].setdefault(chamber, len(codes['chamber'])), depth,
+                          codes['species'].setdefault(species, len(codes['species'])),
+                          codes['bucket'].setdefault(bucket, len(codes['bucket']))] + cell)
+        return {
+            'kind': 'cube', 'version': VERSION, 'prefix_depth': self.prefix_depth,
+            'chambers': list(codes['chamber']), 'species': list(codes['species']),
+            'buckets': list(codes['bucket']),
+            'columns': list(DIMENSIONS + MEASURES), 'cells': cells
+        }
+
+    def save(self, path):
+        """Write the cube as <path>.tmp and rename it into place."""
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.to_json(), f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('kind') != 'cube' or data.get('version') != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} rollup cube")
+        cube = cls(data['prefix_depth'])
+        chambers, species, buckets = data['chambers'], data['species'], data['buckets']
+        for c, depth, s, b, *cell in data['cells']:
+            cube.cells[(chambers[c], depth, species[s], buckets[b])] = cell
+        return cube
+
+
+class CubeStage(Stage):
+    """
+    Walker stage that builds sys/cube.json. It reads the primitive record
+    from entry.info, so it must come after PrimitiveStage.
+    """
+
+    def __init__(self, output_path, prefix_depth=PREFIX_DEPTH):
+        self.output_path = output_path
+        self.cube = RollupCube(prefix_depth)
+
+    def on_file(self, entry):
+        self.cube.add_record(entry.info['primitive'])
+
+    def finish(self):
+        self.cube.save(self.output_path)
+
+
+def build_cube(primitive_path, prefix_depth=PREFIX_DEPTH):
+    """RollupCube of an existing primitive.jsonl (or its .gz/.zst), in one pass."""
+    cube = RollupCube(prefix_depth)
+    for record in JsonlReader(primitive_path, ['path', 'size', 'mtime', 'prompts']):
+        cube.add_record(record)
+    return cube
+
+
+def parse_depth(text):
+    """'3' → 3, '2-4' → a predicate for 2 ≤ depth ≤ 4"""
+    if '-' in text:
+        low, high = (int(x) for x in text.split('-'))
+        return lambda depth: low <= depth <= high
+    return int(text)
+
+
+# Build a cube from primitive.jsonl, or query one
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rollup cube of sys/primitive.jsonl')
+    parser.add_argument('--sys', type=Path, default=Path(__file__).resolve().parent.parent / 'sys',
+                        help='directory holding primitive.jsonl and cube.json')
+    parser.add_argument('--prefix-depth', type=int, default=PREFIX_DEPTH,
+                        help=f'chamber components kept per cell (default: {PREFIX_DEPTH})')
+    parser.add_argument('--by', nargs='+', choices=DIMENSIONS + tuple(DERIVED),
+                        help='query the existing cube.json, grouped by these dimensions')
+    parser.add_argument('--chamber', help='only this chamber subtree (e.g. CAT/WHISKER)')
+    parser.add_argument('--depth', type=parse_depth, help='only this depth (or range, e.g. 2-4)')
+    parser.add_argument('--species', nargs='+', help='only these extensions (e.g. .png .mp4)')
+    parser.add_argument('--bucket', help="only this mtime month ('YYYY-MM')")
+    args = parser.parse_args()
+
+    cube_path = args.sys / 'cube.json'
+    where = {d: getattr(args, d) for d in DIMENSIONS if getattr(args, d) is not None}
+
+    if args.by or where:
+        cube = RollupCube.load(cube_path)
+        groups = cube.slice(args.by or (), **where)
+        for group, (count, size, prompts) in sorted(groups.items(), key=lambda g: g[1][1],
+                                                   reverse=True):
+            label = ' '.join(str(v) or '(root)' for v in group) or 'total'
+            print(f"{label:50s} {count:8d} files  {size / 1024 / 1024 / 1024:8.2f} GB  "
+                  f"{prompts:6d} with prompts")
+    else:
+        print("ARKADU Rollup Cube v1.0")
+        print("=" * 50)
+        start = time.perf_counter()
+        cube = build_cube(args.sys / 'primitive.jsonl', args.prefix_depth)
+        cube.save(cube_path)
+        files, size, _ = cube.total()
+        print(f"✓ Cube: {len(cube)} cells from {files} files "
+              f"({time.perf_counter() - start:.1f}s)")
+        print(f"✓ Output: {cube_path} ({cube_path.stat().st_size / 1024:.1f} KB)")
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+ARKADU Sketches
+Mergeable size and mtime distributions per chamber and species.
+
+Totals and a mean say little about how to provision storage; p50/p95/p99
+file sizes do, but exact quantiles would need every size in memory. The
+taxonomy scan keeps a small histogram per chamber and species instead and
+stores it in chambers.jsonl:
+
+  size    log-bucketed: bucket i holds sizes in (GAMMA^(i-1), GAMMA^i],
+          so a quantile is within ALPHA (1%) of the true size; bucket -1
+          holds empty files
+  mtime   one bucket per day (UTC, seconds since the epoch // DAY)
+
+Histograms of the same kind merge by adding bucket counts, exactly and in
+any order, so a subtree's distribution is the merge of its chambers' and
+removing a file is adding it with n=-1. A chamber record carries its own
+files' sketches (like file_count and total_bytes):
+
+  "sketches": {".png": {"size": [[bucket, files], ...], "mtime": [[day, files], ...]}, ...}
+
+SketchIndex loads them from chambers.jsonl, merges them up the hierarchy
+and answers quantiles for any subtree and species without a rescan.
+
+Usage:
+  python3 ARKADU/kern/fused_scan.py .                           # sketches land in sys/chambers.jsonl
+  python3 ARKADU/kern/sketch.py                                 # p50/p95/p99 per kingdom
+  python3 ARKADU/kern/sketch.py --chamber CAT/WHISKER --by species
+"""
+
+import argparse
+import math
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from jsonl_reader import JsonlReader
+
+ALPHA = 0.01                          # relative error of a size quantile
+GAMMA = (1 + ALPHA) / (1 - ALPHA)
+LOG_GAMMA = math.log(GAMMA)
+DAY = 86400
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """
+    Sparse {bucket: files} histogram. Subclasses map a value to its bucket
+    and a bucket back to a representative value.
+    """
+
+    __slots__ = ('bins',)
+
+    def __init__(self, bins=None):
+        self.bins = dict(bins) if bins else {}
+
+    @staticmethod
+    def bucket(value):
+        raise NotImplementedError
+
+    @staticmethod
+    def value(bucket):
+        raise NotImplementedError
+
+    def add(self, value, n=1):
+        """Count value n times (n=-1 takes one away)."""
+        bucket = self.bucket(value)
+        count = self.bins.get(bucket, 0) + n
+        if count:
+            self.bins[bucket] = count
+        else:
+            del self.bins[bucket]
+
+    def merge(self, other):
+        for bucket, count in other.bins.items():
+            count += self.bins.get(bucket, 0)
+            if count:
+                self.bins[bucket] = count
+            else:
+                del self.bins[bucket]
+        return self
+
+    @property
+    def count(self):
+        return sum(self.bins.values())
+
+    def quantiles(self, qs=QUANTILES):
+        """Values at each quantile in qs (0..1); None for an empty histogram."""
+        count = self.count
+        if not count:
+            return [None] * len(qs)
+        buckets = sorted(self.bins)
+        values = []
+        for q in qs:
+            # The lower of the two middle files, like a nearest-rank quantile
+            rank = min(max(q, 0.0), 1.0) * (count - 1)
+            seen = 0
+            for bucket in buckets:
+                seen += self.bins[bucket]
+                if seen > rank:
+                    break
+            values.append(self.value(bucket))
+        return values
+
+    def quantile(self, q):
+        return self.quantiles((q,))[0]
+
+    def to_json(self):
+        return [[bucket, self.bins[bucket]] for bucket in sorted(self.bins)]
+
+    @classmethod
+    def from_json(cls, pairs):
+        return cls((bucket, count) for bucket, count in pairs)
+
+
+class SizeHistogram(Histogram):
+    """File sizes in bytes, within ALPHA relative error."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def bucket(size):
+        if size <= 0:
+            return -1
+        return math.ceil(math.log(size) / LOG_GAMMA)
+
+    @staticmethod
+    def value(bucket):
+        if bucket < 0:
+            return 0
+        return round(2 * GAMMA ** bucket / (GAMMA + 1))
+
+
+class TimeHistogram(Histogram):
+    """Modification times (seconds since the epoch), to the day."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def bucket(mtime):
+        return int(mtime // DAY)
+
+    @staticmethod
+    def value(bucket):
+        return bucket * DAY
+
+
+class Distribution:
+    """Size and mtime histograms of one group of files."""
+
+    __slots__ = ('size', 'mtime')
+
+    def __init__(self, size=None, mtime=None):
+        self.size = size or SizeHistogram()
+        self.mtime = mtime or TimeHistogram()
+
+    def add(self, size, mtime, n=1):
+        self.size.add(size, n)
+        self.mtime.add(mtime, n)
+
+    def merge(self, other):
+        self.size.merge(other.size)
+        self.mtime.merge(other.mtime)
+        return self
+
+    @property
+    def count(self):
+        return self.size.count
+
+    def to_json(self):
+        return {'size': self.size.to_json(), 'mtime': self.mtime.to_json()}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(SizeHistogram.from_json(data['size']), TimeHistogram.from_json(data['mtime']))
+
+
+def sketches_to_json(sketches):
+    """{species: Distribution} → the 'sketches' value of a chamber record"""
+    return {species: sketches[species].to_json() for species in sorted(sketches)}
+
+
+def sketches_from_json(data):
+    return {species: Distribution.from_json(d) for species, d in data.items()}
+
+
+def merge_sketches(into, sketches):
+    """Merge {species: Distribution} into another one (copying, not sharing)."""
+    for species, distribution in sketches.items():
+        target = into.get(species)
+        if target is None:
+            target = into[species] = Distribution()
+        target.merge(distribution)
+    return into
+
+
+class SketchIndex:
+    """
+    Chamber sketches merged up the hierarchy: every chamber holds the
+    distribution of its whole subtree, '' the whole archive.
+    """
+
+    def __init__(self, chambers):
+        """chambers: {chamber path: {species: Distribution}} of direct files."""
+        self.subtree = {'': {}}
+        for path, sketches in chambers.items():
+            merge_sketches(self.subtree.setdefault(path, {}), sketches)
+            while path:
+                path = path.rpartition(os.sep)[0]
+                if path in self.subtree:
+                    break
+                self.subtree[path] = {}
+        # Deepest first, so a chamber is complete before it merges into its parent
+        for path in sorted(self.subtree, key=lambda p: p.count(os.sep), reverse=True):
+            if path:
+                merge_sketches(self.subtree[path.rpartition(os.sep)[0]], self.subtree[path])
+
+    @classmethod
+    def load(cls, chambers_path):
+        """From chambers.jsonl (or .gz/.zst); chambers without sketches are skipped."""
+        chambers = {}
+        for record in JsonlReader(chambers_path, ['chamber', 'sketches']):
+            if record.get('sketches'):
+                chambers[record['chamber']] = sketches_from_json(record['sketches'])
+        return cls(chambers)
+
+    def chambers(self, depth=None):
+        return [path for path in self.subtree
+                if path and (depth is None or path.count(os.sep) + 1 == depth)]
+
+    def distribution(self, chamber='', species=None):
+        """
+        Distribution of a chamber's subtree ('' for everything), of one
+        species or a list of them (default all); None if the chamber is unknown.
+        """
+        sketches = self.subtree.get(chamber.strip(os.sep))
+        if sketches is None:
+            return None
+        if isinstance(species, str):
+            species = [species]
+        total = Distribution()
+        for s, distribution in sketches.items():
+            if species is None or s in species:
+                total.merge(distribution)
+        return total
+
+    def species(self, chamber=''):
+        return sorted(self.subtree.get(chamber.strip(os.sep), {}))
+
+    def quantiles(self, chamber='', species=None, measure='size', qs=QUANTILES):
+        """Quantiles of 'size' or 'mtime' for a subtree, as distribution() selects it."""
+        distribution = self.distribution(chamber, species)
+        if distribution is None:
+            return [None] * len(qs)
+        return getattr(distribution, measure).quantiles(qs)
+
+
+def format_size(size):
+    if size is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_day(mtime):
+    if mtime is None:
+        return '-'
+    return datetime.fromtimestamp(mtime, timezone.utc).strftime('%Y-%m-%d')
+
+
+# Quantiles of an existing scan's chambers.jsonl
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Size and mtime quantiles from sys/chambers.jsonl')
+    parser.add_argument('--sys', type=Path, default=Path(__file__).resolve().parent.parent / 'sys',
+                        help='directory holding chambers.jsonl')
+    parser.add_argument('--chamber', default='', help='subtree to report (default: whole archive)')
+    parser.add_argument('--species', nargs='+', help='only these extensions (e.g. .png .mp4)')
+    parser.add_argument('--by', choices=['chamber', 'species'], default='chamber',
+                        help='one line per child chamber (default) or per species')
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    index = SketchIndex.load(args.sys / 'chambers.jsonl')
+    chamber = args.chamber.strip(os.sep)
+    if chamber not in index.subtree:
+        parser.error(f"no sketches for chamber {args.chamber!r} (rescan to add them)")
+
+    if args.by == 'species':
+        groups = [(s, chamber, s) for s in index.species(chamber)
+                  if args.species is None or s in args.species]
+    else:
+        depth = chamber.count(os.sep) + 2 if chamber else 1
+        groups = [(path, path, args.species) for path in index.chambers(depth)
+                  if not chamber or path.startswith(chamber + os.sep)]
+    rows = [(label, index.distribution(c, s)) for label, c, s in groups]
+    rows = sorted((row for row in rows if row[1].count), key=lambda row: row[1].count, reverse=True)
+    rows.insert(0, (chamber or '(archive)', index.distribution(chamber, args.species)))
+
+    print(f"{'':40s} {'files':>8s} {'p50':>10s} {'p95':>10s} {'p99':>10s}  {'mtime p50':>10s} {'p99':>10s}")
+    for label, distribution in rows[:args.limit]:
+        sizes = distribution.size.quantiles()
+        days = distribution.mtime.quantiles((0.5, 0.99))
+        print(f"{label:40s} {distribution.count:8d} "
+              + ' '.join(f"{format_size(v):>10s}" for v in sizes)
+              + f"  {format_day(days[0]):>10s} {format_day(days[1]):>10s}")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+ARKADU Stat Cache
+Persistent per-directory listing + per-file stat cache for incremental rescans.
+
+Files are keyed by (path, inode, size, mtime_ns). A file whose key is
+unchanged keeps the results stages stored in its Entry.info (primitive
+record, prompt probe, ...). A directory whose mtime_ns is unchanged is not
+listed again: its cached names and file stats are reused as-is.
+
+On-disk format (JSONL): a header line, then one line per directory:
+  {"dir": "CAT/WHISKER", "mtime_ns": ..., "dirs": [...],
+   "files": {"name": [ino, size, mtime_ns, mtime, info]}}
+"""
+
+import json
+import os
+from collections import namedtuple
+
+CACHE_VERSION = 1
+
+# Stand-in for os.stat_result when a file is served from the cache
+CachedStat = namedtuple('CachedStat', 'st_ino st_size st_mtime_ns st_mtime')
+
+
+class StatCache:
+    """
+    Old listings are read from path on load; the walker records the new
+    listings as it goes and save() replaces the file atomically.
+    """
+
+    def __init__(self, path, root, exclude_patterns=(), trust_dir_mtime=True, extra=None):
+        self.path = os.fspath(path)
+        self.header = {
+            'version': CACHE_VERSION,
+            'root': os.path.abspath(os.fspath(root)),
+            'exclude': list(exclude_patterns)
+        }
+        # Anything else the cached stage results depend on (e.g. pattern config)
+        self.header.update(extra or {})
+        self.trust_dir_mtime = trust_dir_mtime
+        self.old = {}
+        self.new = {}
+        self.old_files = 0
+
+        self.added = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.reused_dirs = 0
+
+        self.load()
+
+    def load(self):
+        """Load the previous run's listings (ignored if root or rules differ)."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            header = json.loads(f.readline() or '{}')
+            if header != self.header:
+                return
+            for line in f:
+                listing = json.loads(line)
+                self.old[listing['dir']] = listing
+                self.old_files += len(listing['files'])
+
+    # Directories
+
+    def peek_listing(self, rel_dir, mtime_ns):
+        """
+        Return the previous listing of rel_dir if its mtime is unchanged.
+        Read-only, so walker threads may call it concurrently.
+        """
+        if not self.trust_dir_mtime:
+            return None
+        listing = self.old.get(rel_dir)
+        if listing is None or listing['mtime_ns'] != mtime_ns:
+            return None
+        return listing
+
+    def reuse_listing(self, rel_dir, listing):
+        """Carry an unchanged listing into the new cache as-is."""
+        self.new[rel_dir] = listing
+        self.reused_dirs += 1
+        self.unchanged += len(listing['files'])
+
+    def begin_listing(self, rel_dir, mtime_ns):
+        """Start recording a fresh listing of rel_dir."""
+        self.new[rel_dir] = {'dir': rel_dir, 'mtime_ns': mtime_ns, 'dirs': [], 'files': {}}
+
+    def add_dir(self, rel_dir, name):
+        self.new[rel_dir]['dirs'].append(name)
+
+    # Files
+
+    def match_file(self, rel_dir, name, st):
+        """
+        Return the cached info for a freshly stat-ed file if its key matches,
+        otherwise an empty dict. Tallies added/changed/unchanged.
+        """
+        listing = self.old.get(rel_dir)
+        cached = listing['files'].get(name) if listing else None
+        if cached is None:
+            self.added += 1
+            return {}
+        ino, size, mtime_ns = cached[:3]
+        if (ino, size, mtime_ns) != (st.st_ino, st.st_size, st.st_mtime_ns):
+            self.changed += 1
+            return {}
+        self.unchanged += 1
+        return cached[4]
+
+    def store_file(self, rel_dir, name, st, info):
+        """Record a file's stat and stage results in the new listing."""
+        self.new[rel_dir]['files'][name] = [
+            st.st_ino, st.st_size, st.st_mtime_ns, st.st_mtime, info
+        ]
+
+    @staticmethod
+    def cached_stat(cached):
+        ino, size, mtime_ns, mtime = cached[:4]
+        return CachedStat(ino, size, mtime_ns, mtime)
+
+    # Reporting / persistence
+
+    @property
+    def removed(self):
+        return self.old_files - self.unchanged - self.changed
+
+    def summary(self):
+        return {
+            'added': self.added,
+            'changed': self.changed,
+            'removed': self.removed,
+            'unchanged': self.unchanged,
+            'reused_dirs': self.reused_dirs
+        }
+
+    def save(self):
+        """Write the new listings, replacing the old cache atomically."""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps(self.header) + '\n')
+            for listing in self.new.values():
+                f.write(json.dumps(listing) + '\n')
+        os.replace(tmp_path, self.path)
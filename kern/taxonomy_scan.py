@@ -5,10 +5,19 @@ Maps Kingdom→Phylum→Class→Order→Family→Genus→Species hierarchy
 Based on actual filesystem structure
 """
 
+import argparse
 import json
 from pathlib import Path
 from collections import defaultdict
 
+from walker import Stage, run_stages
+from primitive_scan import add_walk_args, open_cache, print_cache_summary
+from exclude import rules_from_args
+from artifact_table import ArtifactTable
+from hierarchy import Hierarchy
+from sketch import Distribution, sketches_to_json
+from framed import add_compress_args, framed_path, open_output
+
 # Taxonomic rank names (Linnaean hierarchy)
 RANKS = [
     'kingdom',   # depth 1: ANT, CAT, DOG, etc.
@@ -20,126 +29,197 @@ RANKS = [
     'species'    # file itself (extension)
 ]
 
-def scan_taxonomy(root_path):
+def rank_of(depth):
+    rank_idx = depth - 1
+    return RANKS[rank_idx] if rank_idx < len(RANKS) else 'species'
+
+def chambers_of(hierarchy, species, sketches=None):
     """
-    Walk filesystem and assign taxonomic ranks to each path.
+    Chamber (directory) dicts of a files=False Hierarchy, by path in the
+    order first seen; species maps a directory node to its file types,
+    sketches to their size/mtime Distributions (see sketch.py).
     """
-    root = Path(root_path)
-    
-    # Track chambers (directories) and their contents
-    chambers = defaultdict(lambda: {
-        'path': None,
-        'rank': None,
-        'depth': 0,
-        'file_count': 0,
-        'total_bytes': 0,
-        'species': defaultdict(int),  # file types
-        'children': set()
-    })
-    
-    # Track all files
-    artifacts = []
-    
-    for path in root.rglob('*'):
-        # Skip venv/cache
-        if any(skip in str(path) for skip in ['.venv', 'venv', '__pycache__', '.git', 'node_modules']):
-            continue
-        
-        rel_path = path.relative_to(root)
-        parts = rel_path.parts
-        depth = len(parts)
+    sketches = sketches or {}
+    chambers = {}
+    for node in range(1, len(hierarchy)):
+        chambers[hierarchy.path(node)] = {
+            'path': hierarchy.path(node),
+            'rank': rank_of(hierarchy.depth[node]),
+            'depth': hierarchy.depth[node],
+            'file_count': hierarchy.direct_files[node],
+            'total_bytes': hierarchy.direct_bytes[node],
+            'subtree_files': hierarchy.files[node],
+            'subtree_bytes': hierarchy.bytes[node],
+            'species': species.get(node, {}),  # file types
+            'sketches': sketches.get(node, {}),
+            'children': [hierarchy.path(child) for child in hierarchy.child_nodes(node)]
+        }
+    return chambers
+
+def taxonomy_record(parts, size):
+    """
+    Build the taxonomic record for a file from its path components.
+    """
+    # This is a species (individual file)
+    species = Path(parts[-1]).suffix.lower() or 'no_ext'
+    
+    # Build taxonomic ID
+    tax_components = list(parts[:-1])  # All but filename
+    tax_id_parts = tax_components + [species]
+    tax_id = '.'.join(tax_id_parts)
+    
+    # Determine ranks for each level
+    taxonomy = {}
+    for i, component in enumerate(parts[:-1]):
+        if i < len(RANKS):
+            taxonomy[RANKS[i]] = component
+    taxonomy['species'] = species
+    
+    return {
+        'taxonomic_id': tax_id,
+        'path': str(Path(*parts)),
+        'taxonomy': taxonomy,
+        'depth': len(parts),
+        'size': size,
+        'species': species
+    }
+
+class TaxonomyStage(Stage):
+    """
+    Walker stage that assigns taxonomic ranks and rolls files up into chambers.
+    With output_path set, taxonomy records are streamed to disk (framed
+    gzip/zstd with compression); otherwise files are kept in a compact
+    ArtifactTable and artifacts builds their records on demand.
+    """
+    
+    def __init__(self, output_path=None, compression=None):
+        # Track chambers (directories) and their contents in the shared
+        # hierarchy (kern/hierarchy.py); chambers is filled by finish()
+        self.hierarchy = Hierarchy(files=False)
+        self.species = {}
+        self.sketches = {}
+        self.chambers = {}
         
-        if path.is_file():
-            # This is a species (individual file)
-            species = path.suffix.lower() or 'no_ext'
-            
-            # Build taxonomic ID
-            tax_components = list(parts[:-1])  # All but filename
-            tax_id_parts = tax_components + [species]
-            tax_id = '.'.join(tax_id_parts)
-            
-            # Determine ranks for each level
-            taxonomy = {}
-            for i, component in enumerate(parts[:-1]):
-                if i < len(RANKS):
-                    taxonomy[RANKS[i]] = component
-            taxonomy['species'] = species
-            
-            artifact = {
-                'taxonomic_id': tax_id,
-                'path': str(rel_path),
-                'taxonomy': taxonomy,
-                'depth': depth,
-                'size': path.stat().st_size,
-                'species': species
-            }
-            artifacts.append(artifact)
-            
-            # Update parent chamber stats
-            if len(parts) > 1:
-                chamber_path = str(Path(*parts[:-1]))
-                chambers[chamber_path]['file_count'] += 1
-                chambers[chamber_path]['total_bytes'] += artifact['size']
-                chambers[chamber_path]['species'][species] += 1
+        # Track all files
+        self.table = ArtifactTable()
+        self.artifacts = self.table.records(lambda view: taxonomy_record(view.parts, view.size))
+        self.artifact_count = 0
+        self.output = open_output(output_path, compression) if output_path else None
+    
+    def on_dir(self, entry):
+        # This is a chamber (directory)
+        self.hierarchy.add_dir(entry.parts)
+    
+    def on_file(self, entry):
+        parts = entry.parts
+        self.artifact_count += 1
+        if self.output:
+            artifact = taxonomy_record(parts, entry.size)
+            self.output.write(json.dumps(artifact) + '\n')
+            species = artifact['species']
+        else:
+            species = Path(parts[-1]).suffix.lower() or 'no_ext'
+            self.table.add(parts, entry.size, entry.mtime, ext=species)
         
-        elif path.is_dir():
-            # This is a chamber (directory)
-            chamber_path = str(rel_path)
-            rank_idx = depth - 1
-            rank = RANKS[rank_idx] if rank_idx < len(RANKS) else 'species'
-            
-            chambers[chamber_path]['path'] = chamber_path
-            chambers[chamber_path]['rank'] = rank
-            chambers[chamber_path]['depth'] = depth
+        # Update parent chamber stats
+        chamber = self.hierarchy.add_file(parts, entry.size)
+        if len(parts) > 1:
+            counts = self.species.get(chamber)
+            if counts is None:
+                counts = self.species[chamber] = defaultdict(int)
+            counts[species] += 1
             
-            # Track parent-child relationships
-            if depth > 1:
-                parent_path = str(Path(*parts[:-1]))
-                chambers[parent_path]['children'].add(chamber_path)
+            # Size and mtime distribution per species
+            sketches = self.sketches.get(chamber)
+            if sketches is None:
+                sketches = self.sketches[chamber] = {}
+            distribution = sketches.get(species)
+            if distribution is None:
+                distribution = sketches[species] = Distribution()
+            distribution.add(entry.size, entry.mtime)
     
-    # Convert sets to lists for JSON serialization
-    for chamber in chambers.values():
-        chamber['children'] = list(chamber['children'])
-    
-    return artifacts, dict(chambers)
+    def finish(self):
+        if self.output:
+            self.output.close()
+        
+        # Roll up and turn the hierarchy into chamber dicts
+        self.hierarchy.finish()
+        self.chambers = chambers_of(self.hierarchy, self.species, self.sketches)
+
+def scan_taxonomy(root_path, cache=None, jobs=1, exclude=None):
+    """
+    Walk filesystem and assign taxonomic ranks to each path.
+    """
+    stage = TaxonomyStage()
+    run_stages(root_path, [stage], exclude=exclude, cache=cache, jobs=jobs)
+    return stage.artifacts, dict(stage.chambers)
+
+def dominant_species(species):
+    """Top 3 file types of a {species: files} distribution."""
+    top_species = sorted(species.items(), key=lambda x: x[1], reverse=True)[:3]
+    return [s[0] for s in top_species]
+
+def chamber_summary(chamber_path, data):
+    """
+    Summary record of one chamber (a chambers.jsonl line): its own files,
+    with dominant species and size/mtime sketches (see sketch.py), plus
+    the files and bytes of its whole subtree.
+    """
+    return {
+        'chamber': chamber_path,
+        'rank': data['rank'],
+        'depth': data['depth'],
+        'file_count': data['file_count'],
+        'total_bytes': data['total_bytes'],
+        'total_mb': round(data['total_bytes'] / 1024 / 1024, 2),
+        'dominant_species': dominant_species(data['species']),
+        'species_distribution': dict(data['species']),
+        'child_count': len(data['children']),
+        'subtree_files': data['subtree_files'],
+        'subtree_bytes': data['subtree_bytes'],
+        'sketches': sketches_to_json(data.get('sketches', {}))
+    }
 
 def generate_chamber_summaries(chambers):
     """
-    Generate per-chamber summaries with dominant species.
+    Generate per-chamber summaries (chambers holding files), largest first.
     """
     summaries = []
     
     for chamber_path, data in chambers.items():
         if data['file_count'] > 0:
-            # Find dominant species (top 3 file types)
-            top_species = sorted(
-                data['species'].items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:3]
-            
-            summary = {
-                'chamber': chamber_path,
-                'rank': data['rank'],
-                'depth': data['depth'],
-                'file_count': data['file_count'],
-                'total_bytes': data['total_bytes'],
-                'total_mb': round(data['total_bytes'] / 1024 / 1024, 2),
-                'dominant_species': [s[0] for s in top_species],
-                'species_distribution': dict(data['species']),
-                'child_count': len(data['children'])
-            }
-            summaries.append(summary)
+            summaries.append(chamber_summary(chamber_path, data))
     
     return sorted(summaries, key=lambda x: x['total_bytes'], reverse=True)
 
+def write_chamber_summaries(output_path, summaries, compression=None):
+    """
+    Write chamber summaries as JSONL.
+    """
+    with open_output(output_path, compression) as f:
+        for summary in summaries:
+            f.write(json.dumps(summary) + '\n')
+
 # Run scanner
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ARKADU taxonomy scan')
+    add_walk_args(parser)
+    add_compress_args(parser)
+    args = parser.parse_args()
+    
     print("ARKADU Taxonomy Scanner v1.0")
     print("=" * 50)
     print("Scanning filesystem hierarchy...")
     
-    artifacts, chambers = scan_taxonomy('.')
+    # Create output directory
+    Path('ARKADU/sys').mkdir(parents=True, exist_ok=True)
+    
+    exclude = rules_from_args(args)
+    cache = open_cache(args, 'ARKADU/sys', exclude=exclude)
+    artifacts, chambers = scan_taxonomy('.', cache=cache, jobs=args.jobs, exclude=exclude)
+    if cache:
+        cache.save()
+        print_cache_summary(cache)
     
     print(f"\n✓ Scanned {len(artifacts)} artifacts")
     print(f"✓ Found {len(chambers)} chambers")
@@ -148,22 +228,17 @@ if __name__ == '__main__':
     print("\nGenerating chamber summaries...")
     summaries = generate_chamber_summaries(chambers)
     
-    # Create output directory
-    Path('ARKADU/sys').mkdir(parents=True, exist_ok=True)
-    
     # Write artifacts (taxonomic IDs for each file)
-    with open('ARKADU/sys/taxonomy.jsonl', 'w') as f:
+    with open_output('ARKADU/sys/taxonomy.jsonl', args.compress) as f:
         for artifact in artifacts:
             f.write(json.dumps(artifact) + '\n')
     
-    print(f"✓ Output: ARKADU/sys/taxonomy.jsonl ({len(artifacts)} entries)")
+    print(f"✓ Output: {framed_path('ARKADU/sys/taxonomy.jsonl', args.compress)} ({len(artifacts)} entries)")
     
     # Write chamber summaries
-    with open('ARKADU/sys/chambers.jsonl', 'w') as f:
-        for summary in summaries:
-            f.write(json.dumps(summary) + '\n')
+    write_chamber_summaries('ARKADU/sys/chambers.jsonl', summaries, args.compress)
     
-    print(f"✓ Output: ARKADU/sys/chambers.jsonl ({len(summaries)} entries)")
+    print(f"✓ Output: {framed_path('ARKADU/sys/chambers.jsonl', args.compress)} ({len(summaries)} entries)")
     
     # Show top kingdoms (depth 1)
     print("\n" + "=" * 50)
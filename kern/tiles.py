@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+ARKADU Tiles
+primitive.jsonl split into content-addressed tiles the viewers load lazily.
+
+A viewer that fetches sys/primitive.jsonl has to download and parse every
+record before it can draw anything. The tiled layout lets it start from a
+few KB and fetch a chamber's records only when the user drills into it:
+
+  sys/tiles/index.json     root node: every kingdom with its rollup
+  sys/tiles/<hash>.json    node of a chamber too large for one shard:
+                           its rollup, its direct files' shards, its children
+  sys/tiles/<hash>.jsonl   shard: the primitive records of a whole subtree
+                           of at most --max-files files (or up to that many
+                           of the files directly in a larger chamber)
+
+A child in a node carries its rollup plus either 'shard' (the subtree fits
+in one shard) or 'node' (it is split further). Rollups are count, bytes,
+species ({ext: files}) and dirs (chambers in the subtree) for the subtree,
+and the same for the chamber's own files under 'direct'.
+
+Tiles are named by the SHA-256 of their content (16 hex digits), and a
+node's content names its children, so a tile never changes once written
+and the browser may cache it forever; only index.json is revalidated. An
+unchanged subtree keeps its names from one scan to the next. Tiles no
+index refers to any more are deleted. arkadu-tiles.js loads them.
+
+Usage:
+  python3 ARKADU/kern/fused_scan.py . --tiles         # write sys/tiles/ after the scan
+  python3 ARKADU/kern/tiles.py --max-files 5000       # or tile an existing primitive.jsonl
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+from jsonl_reader import JsonlReader
+
+VERSION = 1
+MAX_FILES = 5000    # records per shard
+OPEN_SPOOLS = 128   # shard files kept open at once while routing records
+
+
+class Chamber:
+    """Rollup of one directory: its subtree and its own files."""
+
+    __slots__ = ('count', 'bytes', 'species', 'direct_count', 'direct_bytes',
+                 'direct_species', 'children', 'dirs')
+
+    def __init__(self):
+        self.count = self.bytes = 0
+        self.species = {}
+        self.direct_count = self.direct_bytes = 0
+        self.direct_species = {}
+        self.children = set()
+        self.dirs = 1
+
+    def rollup(self):
+        return {
+            'count': self.count, 'bytes': self.bytes, 'species': self.species,
+            'dirs': self.dirs,
+            'direct': {'count': self.direct_count, 'bytes': self.direct_bytes,
+                       'species': self.direct_species},
+        }
+
+
+def tile_name(data, suffix):
+    return hashlib.sha256(data).hexdigest()[:16] + suffix
+
+
+class Spools:
+    """
+    Append-only temporary files, one per shard, with at most OPEN_SPOOLS
+    open at a time (a large archive has more shards than file handles).
+    """
+
+    def __init__(self, tmp_dir):
+        self.tmp_dir = Path(tmp_dir)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.paths = {}
+        self.open = OrderedDict()
+
+    def write(self, key, line):
+        f = self.open.get(key)
+        if f is None:
+            path = self.paths.setdefault(key, self.tmp_dir / f'{len(self.paths)}.jsonl')
+            if len(self.open) >= OPEN_SPOOLS:
+                self.open.popitem(last=False)[1].close()
+            f = self.open[key] = open(path, 'a')
+        else:
+            self.open.move_to_end(key)
+        f.write(line)
+
+    def close(self):
+        for f in self.open.values():
+            f.close()
+        self.open.clear()
+
+
+class TileBuilder:
+    """
+    Tiles from primitive records in two passes: count() every record to
+    roll up the directory tree, then route() every record (in the same
+    order) to its shard; finish() names and writes the tiles.
+    """
+
+    def __init__(self, out_dir, max_files=MAX_FILES):
+        self.out = Path(out_dir)
+        self.max_files = max_files
+        self.chambers = {(): Chamber()}
+        self.placed = {}  # directory → files routed into its direct shards
+        self.spools = None
+        self.names = {}   # spool key → tile name
+        self.written = set()
+        self.pruned = 0
+
+    def count(self, record):
+        parts = record['path'].split(os.sep)
+        dirs = tuple(parts[:-1])
+        ext = record['ext']
+        for i in range(len(dirs) + 1):
+            key = dirs[:i]
+            chamber = self.chambers.get(key)
+            if chamber is None:
+                chamber = self.chambers[key] = Chamber()
+                self.chambers[dirs[:i - 1]].children.add(key)
+            chamber.count += 1
+            chamber.bytes += record['size']
+            chamber.species[ext] = chamber.species.get(ext, 0) + 1
+        chamber.direct_count += 1
+        chamber.direct_bytes += record['size']
+        chamber.direct_species[ext] = chamber.direct_species.get(ext, 0) + 1
+
+    def is_shard(self, key):
+        """A chamber whose whole subtree goes into one shard (never the root)."""
+        return bool(key) and self.chambers[key].count <= self.max_files
+
+    def _start_routing(self):
+        self._count_dirs(())
+        self.spools = Spools(self.out / f'.spool-{os.getpid()}')
+
+    def route(self, record):
+        if self.spools is None:
+            self._start_routing()
+        dirs = tuple(record['path'].split(os.sep)[:-1])
+        for i in range(1, len(dirs) + 1):
+            if self.is_shard(dirs[:i]):
+                key = ('subtree', dirs[:i])
+                break
+        else:
+            placed = self.placed.get(dirs, 0)
+            self.placed[dirs] = placed + 1
+            key = ('files', dirs, placed // self.max_files)
+        self.spools.write(key, json.dumps(record) + '\n')
+
+    def _count_dirs(self, key):
+        chamber = self.chambers[key]
+        chamber.dirs = 1 + sum(self._count_dirs(child) for child in chamber.children)
+        return chamber.dirs
+
+    def finish(self):
+        """Write every tile and index.json; returns the set of tile names."""
+        if self.spools is None:
+            self._start_routing()  # no records: an index with an empty root
+        self.spools.close()
+        for key, path in self.spools.paths.items():
+            name = tile_name(path.read_bytes(), '.jsonl')
+            target = self.out / name
+            if target.exists():
+                path.unlink()
+            else:
+                os.replace(path, target)
+            self.names[key] = name
+        self.spools.tmp_dir.rmdir()
+
+        self.written.update(self.names.values())
+        index = self._node(())
+        index.update({'kind': 'tiles', 'version': VERSION, 'max_files': self.max_files,
+                      'generated': datetime.now().isoformat()})
+        tmp = self.out / 'index.json.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(tmp, self.out / 'index.json')
+        return self.written
+
+    def _node(self, key):
+        """Node of a split chamber; its children's tiles are written first."""
+        chamber = self.chambers[key]
+        parts = -(-self.placed.get(key, 0) // self.max_files)
+        node = {'chamber': '/'.join(key), **chamber.rollup(),
+                'files': [self.names[('files', key, i)] for i in range(parts)],
+                'children': []}
+        for child in sorted(chamber.children):
+            summary = {'name': child[-1], 'chamber': '/'.join(child),
+                       **self.chambers[child].rollup()}
+            if self.is_shard(child):
+                summary['shard'] = self.names[('subtree', child)]
+            else:
+                data = json.dumps(self._node(child), separators=(',', ':')).encode('utf-8')
+                name = tile_name(data, '.json')
+                if not (self.out / name).exists():
+                    tmp = self.out / f'{name}.tmp'
+                    tmp.write_bytes(data)
+                    os.replace(tmp, self.out / name)
+                self.written.add(name)
+                summary['node'] = name
+            node['children'].append(summary)
+        return node
+
+
+def prune(out_dir, keep):
+    """Delete tiles not in keep; returns how many went."""
+    removed = 0
+    for path in Path(out_dir).iterdir():
+        if path.suffix in ('.json', '.jsonl') and path.name != 'index.json' and path.name not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def build_tiles(primitive_path, out_dir, max_files=MAX_FILES):
+    """
+    Tile an existing primitive.jsonl (or its .gz/.zst) into out_dir, then
+    delete the tiles left from earlier runs. Returns the TileBuilder.
+    """
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    builder = TileBuilder(out_dir, max_files)
+    records = JsonlReader(primitive_path)
+    for record in records:
+        builder.count(record)
+    for record in records:
+        builder.route(record)
+    builder.pruned = prune(out_dir, builder.finish())
+    return builder
+
+
+def print_tiles_summary(builder, out_dir):
+    nodes = sum(1 for name in builder.written if name.endswith('.json'))
+    index_kb = (Path(out_dir) / 'index.json').stat().st_size / 1024
+    print(f"✓ Tiles:      {out_dir}/ ({len(builder.written) - nodes} shards, {nodes} nodes, "
+          f"index.json {index_kb:.1f} KB, {builder.pruned} stale tiles removed)")
+
+
+# Tile an existing scan
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Content-addressed tiles of sys/primitive.jsonl')
+    parser.add_argument('--sys', type=Path, default=Path(__file__).resolve().parent.parent / 'sys',
+                        help='directory holding primitive.jsonl (tiles go to <sys>/tiles)')
+    parser.add_argument('--max-files', type=int, default=MAX_FILES,
+                        help=f'records per shard (default: {MAX_FILES})')
+    args = parser.parse_args()
+
+    print("ARKADU Tiles v1.0")
+    print("=" * 50)
+    start = time.perf_counter()
+    out_dir = args.sys / 'tiles'
+    builder = build_tiles(args.sys / 'primitive.jsonl', out_dir, args.max_files)
+    print_tiles_summary(builder, out_dir)
+    print(f"✓ {builder.chambers[()].count} records in {time.perf_counter() - start:.1f}s")
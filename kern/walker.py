@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+ARKADU Walker
+Single-pass os.scandir traversal shared by every scanner.
+
+Each directory is listed exactly once and every entry is stat-ed once.
+Entries are streamed to a list of stages (primitive record, taxonomy rollup,
+prompt detection, media catalog, HTML circulation) so one walk can feed
+every output file. Directory listing can run on a thread pool for
+high-latency (SMB/NFS) mounts without changing the output order.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from exclude import default_rules
+
+# Default exclusions (.venv/, node_modules/, .git/, ...) when none are given
+DEFAULT_RULES = default_rules()
+
+
+class Entry:
+    """One filesystem entry seen by the walker (file or directory)."""
+
+    __slots__ = ('path', 'rel', 'parts', 'name', 'is_dir', 'stat', 'info')
+
+    def __init__(self, path, rel, parts, name, is_dir, stat):
+        self.path = path      # path as the caller would open it
+        self.rel = rel        # path relative to the walk root
+        self.parts = parts    # rel split into components
+        self.name = name
+        self.is_dir = is_dir
+        self.stat = stat      # os.stat_result (or CachedStat), taken once
+        self.info = {}        # per-file stage results; persisted by StatCache
+
+    @property
+    def depth(self):
+        return len(self.parts)
+
+    @property
+    def suffix(self):
+        return os.path.splitext(self.name)[1]
+
+    @property
+    def size(self):
+        return self.stat.st_size
+
+    @property
+    def mtime(self):
+        return self.stat.st_mtime
+
+
+class Stage:
+    """
+    Base class for pipeline stages.
+    Stages see every directory and file once, in walk order.
+    """
+
+    def on_dir(self, entry):
+        pass
+
+    def on_file(self, entry):
+        pass
+
+    def finish(self):
+        pass
+
+
+class WalkStats:
+    """Counters for one walk."""
+
+    def __init__(self):
+        self.dirs = 0
+        self.files = 0
+        self.pruned = 0      # excluded directories never descended into
+        self.excluded = 0    # excluded files
+        self.errors = 0
+
+    def as_dict(self):
+        return {
+            'dirs': self.dirs,
+            'files': self.files,
+            'pruned': self.pruned,
+            'excluded': self.excluded,
+            'errors': self.errors
+        }
+
+
+# Indirection so benchmarks can substitute slow (network-like) syscalls
+_scandir = os.scandir
+_stat = os.stat
+
+
+class Listing:
+    """
+    One directory's contents, read by _read_dir (possibly on a worker thread).
+    items are (rel, name, is_dir, stat, cached) sorted by name; cached is the
+    StatCache entry for files replayed from an unchanged directory.
+    """
+
+    __slots__ = ('rel_dir', 'mtime_ns', 'items', 'reused', 'pruned', 'excluded', 'errors')
+
+    def __init__(self, rel_dir, mtime_ns, reused=None):
+        self.rel_dir = rel_dir
+        self.mtime_ns = mtime_ns
+        self.items = []
+        self.reused = reused      # cached listing replayed instead of scandir
+        self.pruned = 0
+        self.excluded = 0
+        self.errors = 0
+
+
+def _stat_dirent(dirent):
+    if dirent.is_dir(follow_symlinks=False):
+        return dirent.stat(follow_symlinks=False)
+    return dirent.stat()
+
+
+def _read_dir(root, rel_dir, mtime_ns, exclude, cache, stat_many=None):
+    """
+    List one directory and stat its entries exactly once.
+    Only reads shared state, so it is safe to run on worker threads.
+    stat_many, if given, stats a list of DirEntry objects concurrently.
+    """
+    def path_of(rel):
+        return rel if root in ('.', '') else os.path.join(root, rel)
+
+    def child(name):
+        return os.path.join(rel_dir, name) if rel_dir else name
+
+    cached_listing = cache.peek_listing(rel_dir, mtime_ns) if cache else None
+    listing = Listing(rel_dir, mtime_ns, cached_listing)
+
+    if cached_listing is not None:
+        # Unchanged directory: replay the cached listing without stat-ing files
+        for name in cached_listing['dirs']:
+            rel = child(name)
+            try:
+                st = _stat(path_of(rel), follow_symlinks=False)
+            except OSError:
+                listing.errors += 1
+                continue
+            listing.items.append((rel, name, True, st, None))
+        for name, cached in cached_listing['files'].items():
+            listing.items.append((child(name), name, False, cache.cached_stat(cached), cached))
+        listing.items.sort(key=lambda item: item[1])
+        return listing
+
+    try:
+        it = _scandir(path_of(rel_dir) if rel_dir else root)
+    except OSError:
+        listing.errors += 1
+        return listing
+
+    # Entry types come from the listing itself; only stat() costs a round trip
+    wanted = []
+    with it:
+        for dirent in it:
+            try:
+                is_dir = dirent.is_dir(follow_symlinks=False)
+                if not is_dir and not dirent.is_file():
+                    continue
+            except OSError:
+                listing.errors += 1
+                continue
+            # Prune before descending: excluded directories are never listed
+            if exclude.match(child(dirent.name), is_dir):
+                if is_dir:
+                    listing.pruned += 1
+                else:
+                    listing.excluded += 1
+                continue
+            wanted.append(dirent)
+
+    if stat_many and len(wanted) > STAT_CHUNK:
+        stats = stat_many(wanted)
+    else:
+        stats = []
+        for dirent in wanted:
+            try:
+                stats.append(_stat_dirent(dirent))
+            except OSError:
+                stats.append(None)
+
+    for dirent, st in zip(wanted, stats):
+        if st is None:
+            listing.errors += 1
+            continue
+        is_dir = dirent.is_dir(follow_symlinks=False)
+        listing.items.append((child(dirent.name), dirent.name, is_dir, st, None))
+
+    listing.items.sort(key=lambda item: item[1])
+    return listing
+
+
+# Directories with more entries than this have their stats split across the pool
+STAT_CHUNK = 64
+
+
+class _ParallelReader:
+    """
+    Thread pools that list directories ahead of the walk.
+
+    A finished listing immediately queues its subdirectories, so workers
+    fan out across the tree instead of waiting for the consumer to reach
+    each parent. Read-ahead stops at `budget` unconsumed listings to keep
+    memory bounded; the consumer then requests directories on demand.
+    Large directories have their stats split across a second pool (stat
+    tasks never wait on other tasks, so the pools cannot deadlock).
+    """
+
+    def __init__(self, root, exclude, cache, jobs):
+        self.root = root
+        self.exclude = exclude
+        self.cache = cache
+        self.list_pool = ThreadPoolExecutor(max_workers=jobs)
+        self.stat_pool = ThreadPoolExecutor(max_workers=jobs)
+        self.budget = jobs * 64
+        self.in_flight = 0
+        self.futures = {}
+        self.lock = threading.Lock()
+
+    def _stat_chunk(self, dirents):
+        stats = []
+        for dirent in dirents:
+            try:
+                stats.append(_stat_dirent(dirent))
+            except OSError:
+                stats.append(None)
+        return stats
+
+    def stat_many(self, dirents):
+        chunks = [dirents[i:i + STAT_CHUNK] for i in range(0, len(dirents), STAT_CHUNK)]
+        stats = []
+        for result in self.stat_pool.map(self._stat_chunk, chunks):
+            stats.extend(result)
+        return stats
+
+    def _task(self, rel_dir, mtime_ns):
+        listing = _read_dir(self.root, rel_dir, mtime_ns, self.exclude, self.cache,
+                            stat_many=self.stat_many)
+        for rel, name, is_dir, st, cached in listing.items:
+            if is_dir:
+                self.submit(rel, st.st_mtime_ns)
+        return listing
+
+    def submit(self, rel_dir, mtime_ns, force=False):
+        with self.lock:
+            if rel_dir in self.futures:
+                return
+            if not force and self.in_flight >= self.budget:
+                return
+            self.in_flight += 1
+            self.futures[rel_dir] = self.list_pool.submit(self._task, rel_dir, mtime_ns)
+
+    def get(self, rel_dir, mtime_ns):
+        self.submit(rel_dir, mtime_ns, force=True)
+        with self.lock:
+            future = self.futures.pop(rel_dir)
+        listing = future.result()
+        with self.lock:
+            self.in_flight -= 1
+        return listing
+
+    def shutdown(self):
+        self.list_pool.shutdown(wait=False, cancel_futures=True)
+        self.stat_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def walk(root_path, exclude=None, stats=None, cache=None, jobs=1):
+    """
+    Walk root_path once, yielding an Entry for every directory and file.
+    Directories matching the ExcludeRules (default: DEFAULT_RULES) are
+    pruned before they are listed.
+    With a StatCache, unchanged directories are not listed again and
+    unchanged files come back with the Entry.info stages stored last run.
+    With jobs > 1, thread pools list and stat directories ahead of the
+    consumer; entries are still yielded in the same (sorted, depth-first)
+    order as a serial walk.
+    """
+    root = os.fspath(root_path)
+    exclude = DEFAULT_RULES if exclude is None else exclude
+    stats = stats if stats is not None else WalkStats()
+
+    # Mirror pathlib: Path('.') / 'x' renders as 'x'
+    def join(rel):
+        return rel if root in ('.', '') else os.path.join(root, rel)
+
+    try:
+        root_mtime_ns = _stat(root).st_mtime_ns
+    except OSError:
+        stats.errors += 1
+        return
+
+    reader = _ParallelReader(root, exclude, cache, jobs) if jobs > 1 else None
+
+    # Stack of (rel_dir, mtime_ns); the top is visited next
+    stack = [('', root_mtime_ns)]
+    try:
+        while stack:
+            rel_dir, mtime_ns = stack.pop()
+            if reader:
+                listing = reader.get(rel_dir, mtime_ns)
+            else:
+                listing = _read_dir(root, rel_dir, mtime_ns, exclude, cache)
+
+            stats.pruned += listing.pruned
+            stats.excluded += listing.excluded
+            stats.errors += listing.errors
+            if cache:
+                if listing.reused is not None:
+                    cache.reuse_listing(rel_dir, listing.reused)
+                else:
+                    cache.begin_listing(rel_dir, mtime_ns)
+
+            subdirs = []
+            for rel, name, is_dir, st, cached in listing.items:
+                entry = Entry(join(rel), rel, tuple(rel.split(os.sep)), name, is_dir, st)
+                if is_dir:
+                    stats.dirs += 1
+                    subdirs.append((rel, st.st_mtime_ns))
+                    if cache and listing.reused is None:
+                        cache.add_dir(rel_dir, name)
+                    yield entry
+                    continue
+
+                stats.files += 1
+                if cached is not None:
+                    entry.info = cached[4]
+                    yield entry
+                elif cache:
+                    entry.info = cache.match_file(rel_dir, name, st)
+                    yield entry
+                    # Stages have run by now; persist what they stored
+                    cache.store_file(rel_dir, name, st, entry.info)
+                else:
+                    yield entry
+
+            # Reverse so subdirectories are visited in sorted order
+            stack.extend(reversed(subdirs))
+    finally:
+        if reader:
+            reader.shutdown()
+
+
+def run_stages(root_path, stages, exclude=None, stats=None, cache=None, jobs=1):
+    """
+    Walk root_path once and feed every entry to each stage in order.
+    Returns the WalkStats for the walk.
+    """
+    stats = stats if stats is not None else WalkStats()
+
+    for entry in walk(root_path, exclude=exclude, stats=stats, cache=cache, jobs=jobs):
+        if entry.is_dir:
+            for stage in stages:
+                stage.on_dir(entry)
+        else:
+            for stage in stages:
+                stage.on_file(entry)
+
+    for stage in stages:
+        stage.finish()
+
+    return stats
@@ -2,7 +2,7 @@
 """
 ARKADU SCALE - Measure Volume (count) and Mass (bytes) by Species
 
-Reads primitive.jsonl and calculates:
+Reads primitive.jsonl (or primitive.parquet, see kern/columnar.py) and calculates:
 - VOLUME: Number of files per species (media type)
 - MASS: Total bytes per species
 - At every level: ROOT → Kingdom → Phylum → Class → ... → File
@@ -10,21 +10,68 @@ Reads primitive.jsonl and calculates:
 Outputs verification data to compare against voronoi-depth-test.html
 """
 
-import json
+import argparse
 import sys
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from array import array
+from typing import Callable, Dict, List, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'kern'))
+from jsonl_reader import JsonlReader
+from framed import resolve
+from hierarchy import Hierarchy, load_hierarchy
+from manifest import ManifestWriter
+
+class SpeciesCounter:
+    """
+    Volume and mass per species id (one slot per species in the table),
+    plus the order species were first added in, which is the key order of
+    the territory's species in the JSON.
+    """
+    
+    __slots__ = ('volumes', 'masses', 'order')
+    
+    def __init__(self, n_species: int):
+        self.volumes = array('q', bytes(8 * n_species))
+        self.masses = array('q', bytes(8 * n_species))
+        self.order = []
+    
+    def add(self, species: int, volume: int, mass: int):
+        if not self.volumes[species]:
+            self.order.append(species)
+        self.volumes[species] += volume
+        self.masses[species] += mass
+    
+    def merge(self, other: 'SpeciesCounter'):
+        for species in other.order:
+            self.add(species, other.volumes[species], other.masses[species])
+
+def species_name(ext) -> str:
+    """Species of a record's ext field: '.PNG' → 'png', none → 'unknown'"""
+    return (ext or '').lower().lstrip('.') or 'unknown'
 
 class TerritoryScale:
     """Measures volume and mass of file territories"""
     
-    def __init__(self):
-        self.measurements = {}
+    def __init__(self, hierarchy: Hierarchy = None):
+        self.hierarchy = hierarchy  # tree being measured (kern/hierarchy.py)
         self.total_files = 0
         self.total_bytes = 0
         self.species_totals = defaultdict(lambda: {'volume': 0, 'mass': 0})
         
+        # Species id of each of the hierarchy's ext ids
+        self.species_names = []
+        self.species = []
+        if hierarchy is not None:
+            ids = {}
+            for ext in hierarchy.exts:
+                name = species_name(ext)
+                if name not in ids:
+                    ids[name] = len(self.species_names)
+                    self.species_names.append(name)
+                self.species.append(ids[name])
+        
     def measure_file(self, filepath: str, size: int) -> Tuple[str, int, int]:
         """Measure a single file - returns (species, volume=1, mass=bytes)"""
         ext = Path(filepath).suffix.lower().lstrip('.')
@@ -38,14 +85,30 @@ class TerritoryScale:
         
         return (ext, 1, size)
     
-    def aggregate_territory(self, territory_path: str, files: List[Tuple[str, int, int]]) -> Dict:
-        """Aggregate measurements for a territory (folder)"""
-        species_data = defaultdict(lambda: {'volume': 0, 'mass': 0, 'files': []})
-        
-        for ext, volume, mass in files:
-            species_data[ext]['volume'] += volume
-            species_data[ext]['mass'] += mass
-            species_data[ext]['files'].append({'volume': volume, 'mass': mass})
+    def file_territory(self, path: str, node: int, depth: int) -> Dict:
+        """The measurement of a single file (a hierarchy file node)"""
+        ext = species_name(self.hierarchy.ext_of(node))
+        size = self.hierarchy.bytes[node]
+        dominant = ext if size > 0 else None
+        return {
+            'path': path,
+            'total_volume': 1,
+            'total_mass': size,
+            'species': {ext: {'volume': 1, 'mass': size}},
+            'dominant_species': dominant,
+            'dominant_pct': 100.0 if dominant else 0,
+            'depth': depth,
+            'direct_files': 1,
+            'children': []
+        }
+    
+    def aggregate_territory(self, territory_path: str, counter: SpeciesCounter) -> Dict:
+        """Measurement of a territory (folder) from its merged species counter"""
+        species_data = {
+            self.species_names[species]: {'volume': counter.volumes[species],
+                                          'mass': counter.masses[species]}
+            for species in counter.order
+        }
         
         # Calculate totals
         total_volume = sum(s['volume'] for s in species_data.values())
@@ -60,102 +123,61 @@ class TerritoryScale:
                 max_weight = weight
                 dominant = ext
         
-        result = {
+        return {
             'path': territory_path,
             'total_volume': total_volume,
             'total_mass': total_mass,
-            'species': dict(species_data),
+            'species': species_data,
             'dominant_species': dominant,
             'dominant_pct': (species_data[dominant]['volume'] / total_volume * 100) if dominant else 0
         }
-        
-        self.measurements[territory_path] = result
-        return result
 
-def parse_path_hierarchy(filepath: str) -> List[str]:
-    """Parse file path into hierarchy levels"""
-    path = Path(filepath)
-    # Remove leading 'resurrecting atlantis/' if present
-    parts = list(path.parts)
-    if parts and 'resurrecting atlantis' in parts[0]:
-        parts = parts[1:]
-    
-    return parts
-
-def build_hierarchy_tree(primitives_data: List[Dict]) -> Dict:
-    """Build hierarchical tree structure from flat primitive data"""
-    tree = {}
-    file_measurements = []
-    
-    for item in primitives_data:
-        # All items in primitive.jsonl are files
-        filepath = item.get('path', '')
-        size = item.get('size', 0)
-        
-        if not filepath:
-            continue
+def measure_tree(hierarchy: Hierarchy, scale: TerritoryScale,
+                 emit: Callable[[str, Dict], None]) -> List[Dict]:
+    """
+    Measure every territory in one post-order pass over the hierarchy. A
+    folder's species counter is the merge of its children's, so each file
+    is counted once, where it sits. emit(path, measurement) receives every
+    file and folder in post-order; only the open folders' counters and
+    child lists are kept. Returns the top-level (depth 0) measurements.
+    """
+    n_species = len(scale.species_names)
+    counters = {}   # open folder → counter of its children measured so far
+    children = {}   # open folder → their paths
+    top = []
+    
+    for node in hierarchy.post_order():
+        path = hierarchy.path(node, '/')
+        depth = hierarchy.depth[node] - 1
+        parent = hierarchy.parent[node]
         
-        # Get extension from item or filename
-        ext = item.get('ext', '').lower().lstrip('.') or 'unknown'
+        if hierarchy.is_file(node):
+            result = scale.file_territory(path, node, depth)
+            counter = None
+        else:
+            counter = counters.pop(node, None) or SpeciesCounter(n_species)
+            result = scale.aggregate_territory(path, counter)
+            result['depth'] = depth
+            result['direct_files'] = 0  # files are children with their own measurement
+            result['children'] = children.pop(node, [])
         
-        # Parse hierarchy
-        parts = parse_path_hierarchy(filepath)
-        if not parts:
+        emit(path, result)
+        if depth == 0:
+            top.append(result)
             continue
         
-        # Build nested dict
-        current = tree
-        for part in parts[:-1]:  # All but filename
-            if part not in current:
-                current[part] = {'_files': [], '_children': {}}
-            current = current[part]['_children']
-        
-        # Add file to leaf
-        filename = parts[-1]
-        
-        if filename not in current:
-            current[filename] = {'_files': [], '_children': {}}
-        
-        current[filename]['_files'].append({
-            'path': filepath,
-            'size': size,
-            'species': ext
-        })
-        
-        file_measurements.append((filepath, size, ext))
-    
-    return tree, file_measurements
-
-def measure_tree_recursive(node: Dict, path: str, scale: TerritoryScale, depth: int = 0) -> Dict:
-    """Recursively measure all nodes in tree"""
-    
-    # Measure files at this level
-    file_data = []
-    for file_info in node.get('_files', []):
-        ext = file_info['species']
-        size = file_info['size']
-        file_data.append((ext, 1, size))
-    
-    # Recursively measure children
-    child_measurements = []
-    for child_name, child_node in node.get('_children', {}).items():
-        child_path = f"{path}/{child_name}" if path else child_name
-        child_result = measure_tree_recursive(child_node, child_path, scale, depth + 1)
-        child_measurements.append(child_result)
-    
-    # Aggregate all measurements (files + children)
-    all_measurements = file_data.copy()
-    for child in child_measurements:
-        for ext, data in child['species'].items():
-            all_measurements.append((ext, data['volume'], data['mass']))
-    
-    # Aggregate for this territory
-    result = scale.aggregate_territory(path or 'ROOT', all_measurements)
-    result['depth'] = depth
-    result['direct_files'] = len(file_data)
-    result['children'] = [c['path'] for c in child_measurements]
-    
-    return result
+        # Roll up into the parent folder
+        if counter is None:
+            if parent not in counters:
+                counters[parent] = SpeciesCounter(n_species)
+            counters[parent].add(scale.species[hierarchy.ext[node]], 1, hierarchy.bytes[node])
+        elif parent in counters:
+            counters[parent].merge(counter)
+        else:
+            counters[parent] = counter
+        children.setdefault(parent, []).append(path)
+    
+    return top
 
 def format_bytes(bytes_val: int) -> str:
     """Format bytes as human readable"""
@@ -194,9 +216,28 @@ def print_territory_report(measurement: Dict, indent: int = 0):
     
     print()
 
-def main():
+def load_primitives(primitive_path: Path) -> Sequence[Dict]:
+    """Primitive records (JSONL or Parquet), decoding only path/size/ext"""
+    fields = ['path', 'size', 'ext']
+    if primitive_path.suffix == '.parquet':
+        from columnar import read_records
+        return list(read_records(primitive_path, fields))
+    
+    return JsonlReader(primitive_path, fields)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ARKADU volume & mass verification')
+    parser.add_argument('--primitive', type=Path,
+                        default=Path(__file__).parent / 'sys' / 'primitive.jsonl',
+                        help='primitive.jsonl or primitive.parquet to measure '
+                             '(default: sys/primitive.jsonl)')
+    parser.add_argument('--output', type=Path,
+                        default=Path(__file__).parent / 'sys' / 'scale-verification.json',
+                        help='verification JSON to write (default: sys/scale-verification.json)')
+    args = parser.parse_args(argv)
+    
     # Load primitive.jsonl
-    primitive_path = Path(__file__).parent / 'sys' / 'primitive.jsonl'
+    primitive_path = Path(resolve(args.primitive))
     
     if not primitive_path.exists():
         print(f"❌ Error: {primitive_path} not found")
@@ -207,49 +248,38 @@ def main():
     print("=" * 60)
     print()
     
-    # Load data
-    primitives = []
-    with open(primitive_path, 'r') as f:
-        for line in f:
-            if line.strip():
-                primitives.append(json.loads(line))
+    # Load the shared hierarchy (built from the records on first use)
+    hierarchy = load_hierarchy(primitive_path, read=load_primitives)
     
-    print(f"✅ Loaded {len(primitives)} artifacts from primitive.jsonl")
+    print(f"✅ Loaded {hierarchy.records} artifacts from {primitive_path.name}")
     print()
     
-    # Build hierarchy tree
     print("🌳 Building hierarchy tree...")
-    tree, file_measurements = build_hierarchy_tree(primitives)
-    print(f"✅ Built tree with {len(file_measurements)} files")
+    print(f"✅ Built tree with {hierarchy.files[0]} files")
     print()
     
     # Measure everything
     print("⚖️  Measuring volumes and masses...")
-    scale = TerritoryScale()
+    scale = TerritoryScale(hierarchy)
     
     # Measure each file
-    for filepath, size, ext in file_measurements:
-        scale.measure_file(filepath, size)
-    
-    # Measure tree recursively - need to iterate top-level keys
-    # Each top-level key in tree is either a folder or a file
-    root_children = []
-    for key in tree.keys():
-        child_result = measure_tree_recursive(tree[key], key, scale, depth=0)
-        root_children.append(child_result)
-    
-    # Create synthetic ROOT measurement
-    root_measurement = {
-        'path': 'ROOT',
-        'total_volume': scale.total_files,
-        'total_mass': scale.total_bytes,
-        'species': dict(scale.species_totals),
-        'dominant_species': None,
-        'dominant_pct': 0,
-        'depth': -1,
-        'direct_files': 0,
-        'children': [c['path'] for c in root_children]
-    }
+    for node in range(len(hierarchy)):
+        if hierarchy.is_file(node):
+            scale.measure_file(hierarchy.name_of(node), hierarchy.bytes[node])
+    
+    # Measure every territory in one bottom-up pass, streaming each
+    # measurement into the verification JSON as it is made
+    with ManifestWriter(args.output, indent=2) as writer:
+        writer.field('total_files', scale.total_files)
+        writer.field('total_bytes', scale.total_bytes)
+        writer.field('global_species', dict(scale.species_totals))
+        writer.begin_object('territories')
+        top_territories = measure_tree(hierarchy, scale, writer.field)
+        writer.end()
+        
+        # Top-level territories (kingdoms - direct children of root)
+        top_territories.sort(key=lambda x: x['total_mass'], reverse=True)
+        writer.field('top_territories', [t['path'] for t in top_territories])
     
     print(f"✅ Measured {scale.total_files} files, {format_bytes(scale.total_bytes)} total")
     print()
@@ -275,38 +305,10 @@ def main():
     print("🗺️  TOP-LEVEL TERRITORIES (KINGDOMS)")
     print("-" * 60)
     
-    # Get top-level territories (kingdoms - direct children of root)
-    top_territories = []
-    for path, measurement in scale.measurements.items():
-        # Top level = paths with no '/' separator (just kingdom name)
-        if '/' not in path and path != 'ROOT' and path:
-            top_territories.append(measurement)
-    
-    top_territories.sort(key=lambda x: x['total_mass'], reverse=True)
-    
-    if not top_territories:
-        # Fallback: show all depth 1
-        for path, measurement in scale.measurements.items():
-            if measurement.get('depth', 99) == 1:
-                top_territories.append(measurement)
-        top_territories.sort(key=lambda x: x['total_mass'], reverse=True)
-    
     for territory in top_territories:
         print_territory_report(territory, indent=0)
     
-    # Export verification JSON
-    export_path = Path(__file__).parent / 'sys' / 'scale-verification.json'
-    export_data = {
-        'total_files': scale.total_files,
-        'total_bytes': scale.total_bytes,
-        'global_species': dict(scale.species_totals),
-        'territories': scale.measurements,
-        'top_territories': [t['path'] for t in top_territories]
-    }
-    
-    with open(export_path, 'w') as f:
-        json.dump(export_data, f, indent=2)
-    
+    export_path = writer.path
     print(f"💾 Verification data exported to: {export_path}")
     print()
     print("✅ Scale verification complete!")